@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Local fake of the GitHub, Trello and Spotify endpoints the plugins call.
+
+One HTTP server answers all three APIs under a path prefix, with payloads
+shaped like the real responses (see benchmarks/records_memory.py):
+
+    {url}/github      -> FETCHER_ENDPOINT_GITHUB_URL
+    {url}/trello/1    -> FETCHER_ENDPOINT_TRELLO_URL
+    {url}/spotify/v1  -> FETCHER_ENDPOINT_SPOTIFY_URL
+
+Latency, collection sizes, GitHub rate-limit headers and injected errors are
+configurable, so benchmarks run against predictable upstream behaviour.
+
+Usage:
+    python3 -m benchmarks.fake_upstream [--port 8900] [--latency-ms 20] [--items 500]
+"""
+
+import argparse
+import calendar
+import functools
+import http.server
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.records_memory import _user, make_card, make_issue, make_playlist, make_repo, make_track
+
+
+class UpstreamConfig:
+    """Behaviour of the fake upstream, adjustable while it runs."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, items=250, error_rate=0.0,
+                 rate_limit=5000, rate_window=60, seed=0, poll_interval=0, private_repos=None,
+                 search_rate_limit=30):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.items = items
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        # search/* has its own, much smaller window per token
+        self.search_rate_limit = search_rate_limit
+        self.random = random.Random(seed)
+        # X-Poll-Interval sent with GitHub events (0 = header omitted)
+        self.poll_interval = poll_interval
+        # owner/repo -> the only GitHub token that sees it (404 for the others)
+        self.private_repos = private_repos or {}
+
+
+def _make_comment(i):
+    """Comment i of a repository-wide listing: two per issue, some by the issue author."""
+    number = i // 2
+    return {
+        'id': 5000000 + i,
+        'issue_url': f"https://api.github.com/repos/owner/repo/issues/{number}",
+        'user': _user(number if i % 3 == 0 else i + 1),
+        'body': f"Comment {i}",
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1704067200 + 3600 * (1 + i % 48))),
+        'updated_at': '2024-01-03T00:00:00Z'
+    }
+
+
+@functools.lru_cache(maxsize=1024)
+def _encoded(kind, start, stop):
+    """JSON for items [start, stop) of a synthetic collection."""
+    factory = {'issue': make_issue, 'repo': make_repo, 'card': make_card,
+               'track': make_track, 'playlist': make_playlist, 'comment': _make_comment}[kind]
+    return json.dumps([factory(i) for i in range(start, stop)])
+
+
+def _card_id(i):
+    # Trello ids are hex and sort by creation time
+    return f"{i:024x}"
+
+
+@functools.lru_cache(maxsize=4)
+def _card_flow(items, now):
+    """Card-flow actions (oldest first) of `items` cards over the 60 days before `now`.
+
+    Cards start in List 0 and move right through Lists 1-3 after a few days;
+    some stop early and every tenth card is archived.
+    """
+    day = 86400
+    events = []
+    for c in range(items):
+        card = {'id': f"card{c:020d}", 'name': f"Card {c}"}
+        lists = [{'id': f"list{i:020d}", 'name': f"List {i}"} for i in range(4)]
+        at = now - 60 * day + c * 50 * day // max(items, 1)
+        events.append((at, 'createCard', {'card': card, 'list': lists[0]}))
+        path = 3 if c % 4 < 2 else 2 if c % 4 == 2 else 1
+        for step in range(1, path + 1):
+            at += (c % 5 + 1) * day if step == 1 else (c % 3 + 1) * day
+            events.append((at, 'updateCard', {'card': dict(card, idList=lists[step]['id']), 'old': {'idList': lists[step - 1]['id']},
+                                              'listBefore': lists[step - 1], 'listAfter': lists[step]}))
+        if c % 10 == 9:
+            events.append((at + 2 * day, 'updateCard', {'card': dict(card, closed=True), 'old': {'closed': False},
+                                                        'list': lists[path]}))
+    events = sorted((event for event in events if event[0] <= now), key=lambda event: event[0])
+    return [
+        {'id': f"{at:08x}{k:016x}", 'type': kind, 'date': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(at)),
+         'memberCreator': {'fullName': f"Member {k % 3}"}, 'data': dict(data, board={'name': 'Bench board'})}
+        for k, (at, kind, data) in enumerate(events)
+    ]
+
+
+class FakeUpstream:
+    """Threaded fake API server; use as a context manager or start()/stop()."""
+
+    def __init__(self, host='127.0.0.1', port=0, config=None):
+        self.config = config or UpstreamConfig()
+        self.requests = {}
+        self.activity = 0
+        self._activity_times = []
+        self._started = time.time()
+        self._lock = threading.Lock()
+        # GitHub rate-limit windows per (Authorization header, resource): [remaining, reset]
+        self._rate = {}
+        self.server = http.server.ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment variables pointing the plugins at this server."""
+        return {
+            'FETCHER_ENDPOINT_GITHUB_URL': f"{self.url}/github",
+            'GITHUB_TOKEN': 'bench-token',
+            'FETCHER_ENDPOINT_TRELLO_URL': f"{self.url}/trello/1",
+            'TRELLO_API_KEY': 'bench-key',
+            'TRELLO_TOKEN': 'bench-token',
+            'FETCHER_ENDPOINT_SPOTIFY_URL': f"{self.url}/spotify/v1",
+            'FETCHER_ENDPOINT_SPOTIFY_ACCOUNTS_URL': f"{self.url}/spotify-accounts",
+            'SPOTIFY_CLIENT_ID': 'bench-client',
+            'SPOTIFY_CLIENT_SECRET': 'bench-secret',
+            'SPOTIFY_ACCESS_TOKEN': 'bench-token',
+            'SPOTIFY_TOKEN_EXPIRY': '2999-01-01T00:00:00',
+            # Not served here, but the LinkedIn plugins refuse to load without them
+            'LINKEDIN_CLIENT_ID': 'bench-client',
+            'LINKEDIN_CLIENT_SECRET': 'bench-secret',
+            'LINKEDIN_EMAIL': 'bench@example.com',
+            'LINKEDIN_PASSWORD': 'bench-password'
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def request_count(self):
+        with self._lock:
+            return sum(self.requests.values())
+
+    def _count(self, route):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def _rate_limit(self, resource):
+        return self.config.search_rate_limit if resource == 'search' else self.config.rate_limit
+
+    def _rate_window(self, authorization, resource, now):
+        window = self._rate.get((authorization, resource))
+        if window is None or now >= window[1]:
+            window = self._rate[(authorization, resource)] = [self._rate_limit(resource), now + self.config.rate_window]
+        return window
+
+    def _take_rate_limit(self, authorization=None, resource='core', count=True):
+        """Consume one request from the GitHub rate-limit window of a token and resource."""
+        with self._lock:
+            window = self._rate_window(authorization, resource, time.time())
+            allowed = window[0] > 0
+            if allowed and count:
+                window[0] -= 1
+            return allowed, window[0], int(window[1])
+
+    def _rate_status(self, authorization):
+        """The /rate_limit resources of a token."""
+        with self._lock:
+            now = time.time()
+            return {
+                resource: {'limit': self._rate_limit(resource), 'remaining': window[0], 'reset': int(window[1])}
+                for resource in ('core', 'search')
+                for window in [self._rate_window(authorization, resource, now)]
+            }
+
+    def _handler_class(self):
+        upstream = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def do_PUT(self):
+                self._dispatch('PUT')
+
+            def _dispatch(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+
+                config = upstream.config
+                if config.latency_ms or config.jitter_ms:
+                    time.sleep(max(0.0, config.latency_ms + config.random.uniform(-1, 1) * config.jitter_ms) / 1000)
+
+                parsed = urllib.parse.urlparse(self.path)
+                query = {key: values[-1] for key, values in urllib.parse.parse_qs(parsed.query).items()}
+                headers = {}
+
+                if parsed.path.startswith('/github/'):
+                    resource = 'search' if parsed.path.startswith('/github/search/') else 'core'
+                    allowed, remaining, reset = upstream._take_rate_limit(
+                        self.headers.get('Authorization'), resource, count=parsed.path != '/github/rate_limit')
+                    headers.update({
+                        'X-RateLimit-Limit': str(upstream._rate_limit(resource)),
+                        'X-RateLimit-Remaining': str(remaining),
+                        'X-RateLimit-Reset': str(reset),
+                        'X-RateLimit-Resource': resource
+                    })
+                    if not allowed:
+                        upstream._count('github rate_limited')
+                        return self._send(403, '{"message": "API rate limit exceeded"}', headers)
+                    repo = re.match(r'/github/repos/([^/]+/[^/]+)', parsed.path)
+                    owner = config.private_repos.get(repo.group(1)) if repo else None
+                    if owner is not None and self.headers.get('Authorization') != f"token {owner}":
+                        upstream._count('github not_found')
+                        return self._send(404, '{"message": "Not Found"}', headers)
+
+                if config.error_rate and config.random.random() < config.error_rate:
+                    upstream._count('error')
+                    return self._send(500, '{"message": "Injected error"}', headers)
+
+                route, status, body = upstream._route(method, parsed.path, query, headers, self._base(),
+                                                      self.headers.get('If-None-Match'),
+                                                      self.headers.get('Authorization'))
+                upstream._count(route)
+                self._send(status, body, headers)
+
+            def _base(self):
+                return f"http://{self.headers.get('Host')}"
+
+            def _send(self, status, body, headers):
+                data = body.encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def touch(self, count=1):
+        """Simulate activity: each touch adds a GitHub issue comment event and a Trello action."""
+        with self._lock:
+            self.activity += count
+            self._activity_times.extend([time.time()] * count)
+
+    def _github_events(self, query, headers, etag):
+        """Events feed with ETag/304 support; one IssueCommentEvent per touch()."""
+        activity = self.activity
+        headers['ETag'] = f'"events-{activity}"'
+        if self.config.poll_interval:
+            headers['X-Poll-Interval'] = str(self.config.poll_interval)
+        if etag == headers['ETag']:
+            return 'github events not_modified', 304, ''
+        events = [
+            {'id': str(1000 + k), 'type': 'IssueCommentEvent', 'actor': _user(k),
+             'payload': {'action': 'created', 'issue': {'number': k % 5 + 1}},
+             'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+            for k in range(activity, max(activity - int(query.get('per_page', 30)), 0), -1)
+        ]
+        return 'github events', 200, json.dumps(events)
+
+    def _github_updated_issues(self):
+        """Issues touched by activity, as returned for `since=` queries."""
+        now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        return json.dumps([
+            dict(make_issue(number), comments=number % 5 + self.activity, updated_at=now)
+            for number in range(1, min(self.activity, 5) + 1)
+        ])
+
+    def _trello_actions(self, board_id, query):
+        """Board actions newest first, filtered by `since`/`before` action ids."""
+        if 'filter' in query:
+            return self._trello_flow_actions(query)
+        newest = self.activity
+        since = query.get('since', '0')
+        if '-' in since:
+            # A date: the actions made after it
+            cutoff = calendar.timegm(time.strptime(since, '%Y-%m-%dT%H:%M:%SZ'))
+            since = sum(1 for stamp in self._activity_times if stamp < cutoff)
+        else:
+            since = int(since, 16)
+        before = int(query['before'], 16) if 'before' in query else newest + 1
+        limit = int(query.get('limit', 50))
+        ids = [k for k in range(min(newest, before - 1), since, -1)][:limit]
+        return json.dumps([
+            {'id': _card_id(k), 'type': 'commentCard',
+             'date': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self._activity_times[k - 1])),
+             'memberCreator': {'fullName': f"Member {k % 3}"},
+             'data': {'text': f"Comment {k}", 'card': {'name': f"Card {k % 7}"}, 'board': {'name': 'Bench board'}}}
+            for k in ids
+        ])
+
+    def _trello_flow_actions(self, query):
+        """Card-flow actions (the `filter`ed feed) newest first, paged with `since`/`before` ids."""
+        # Anchored to the day, so ids stay the same across fake servers
+        actions = _card_flow(self.config.items, int(self._started) // 86400 * 86400)
+        since, before = query.get('since', ''), query.get('before')
+        selected = [action for action in actions if action['id'] > since and (not before or action['id'] < before)]
+        return json.dumps(selected[::-1][:min(int(query.get('limit', 50)), 1000)])
+
+    def _route(self, method, path, query, headers, base, etag=None, authorization=None):
+        """Return (route name, status, JSON body) for a request."""
+        items = self.config.items
+
+        if path.startswith('/github/'):
+            path = path[len('/github'):]
+            if path == '/user':
+                return 'github user', 200, json.dumps(dict(_user(0), name='Bench User', public_repos=items))
+            if path == '/rate_limit':
+                resources = self._rate_status(authorization)
+                return 'github rate_limit', 200, json.dumps({'resources': resources, 'rate': resources['core']})
+            if re.fullmatch(r'/(users|orgs)/[^/]+/repos', path):
+                return 'github repos', 200, self._github_page('repo', path, query, headers, base)
+            if path == '/search/repositories':
+                page = json.loads(self._github_page('repo', path, query, headers, base))
+                return 'github search', 200, json.dumps({'total_count': items, 'incomplete_results': False, 'items': page})
+            if re.fullmatch(r'/repos/[^/]+/[^/]+/events', path):
+                return self._github_events(query, headers, etag)
+            if re.fullmatch(r'/repos/[^/]+/[^/]+/issues/comments', path):
+                return 'github repo comments', 200, self._github_page('comment', path, query, headers, base)
+            if re.fullmatch(r'/repos/[^/]+/[^/]+/issues', path) and 'since' in query:
+                return 'github issues since', 200, self._github_updated_issues()
+            match = re.fullmatch(r'/repos/([^/]+)/([^/]+)(/issues(?:/(\d+)(/comments)?)?)?', path)
+            if match:
+                owner, repo, issues, number, comments = match.groups()
+                if not issues:
+                    return 'github repo', 200, json.dumps(dict(make_repo(0), name=repo, full_name=f"{owner}/{repo}"))
+                if method == 'POST' and not number:
+                    return 'github create_issue', 201, json.dumps(make_issue(items + 1))
+                if comments:
+                    return 'github comments', 200, json.dumps([
+                        {'id': i, 'user': _user(i), 'body': f"Comment {i}", 'created_at': '2024-01-02T00:00:00Z',
+                         'updated_at': '2024-01-02T00:00:00Z'}
+                        for i in range(int(number) % 5)
+                    ])
+                if number:
+                    return 'github issue', 200, json.dumps(make_issue(int(number)))
+                return 'github issues', 200, self._github_page('issue', path, query, headers, base)
+
+        elif path.startswith('/trello/1/'):
+            path = path[len('/trello/1'):]
+            if path == '/members/me':
+                return 'trello me', 200, json.dumps({'id': 'me', 'username': 'bench', 'fullName': 'Bench User'})
+            if path == '/members/me/boards':
+                return 'trello boards', 200, json.dumps([
+                    {'id': f"board{i:020d}", 'name': f"Board {i}", 'desc': '', 'url': f"https://trello.com/b/{i}"}
+                    for i in range(10)
+                ])
+            match = re.fullmatch(r'/boards/([^/]+)/actions', path)
+            if match:
+                return 'trello actions', 200, self._trello_actions(match.group(1), query)
+            if re.fullmatch(r'/boards/[^/]+/lists', path):
+                return 'trello board lists', 200, json.dumps([
+                    {'id': f"list{i:020d}", 'name': f"List {i}", 'pos': (i + 1) * 16384, 'closed': False} for i in range(8)
+                ])
+            match = re.fullmatch(r'/(boards|lists)/([^/]+)/cards', path)
+            if match:
+                return f"trello {match.group(1)} cards", 200, self._trello_cards(query)
+            match = re.fullmatch(r'/(boards|lists|cards)/([^/]+)(/.*)?', path)
+            if match:
+                kind, item_id, rest = match.groups()
+                if kind == 'cards':
+                    return 'trello card', 200, json.dumps(dict(make_card(0), id=item_id))
+                if rest or method != 'GET':
+                    return f"trello {kind} write", 200, json.dumps({'id': item_id})
+                cards = json.loads(self._trello_cards({'limit': min(items, 1000)}))
+                data = {'id': item_id, 'name': f"Bench {kind[:-1]}", 'desc': '', 'url': f"https://trello.com/b/{item_id}",
+                        'cards': cards}
+                if kind == 'boards':
+                    data['lists'] = [{'id': f"list{i:020d}", 'name': f"List {i}"} for i in range(8)]
+                return f"trello {kind[:-1]}", 200, json.dumps(data)
+
+        elif path.startswith('/spotify/v1/'):
+            path = path[len('/spotify/v1'):]
+            limit = min(items, 50)
+            if path == '/me':
+                return 'spotify me', 200, json.dumps({
+                    'id': 'bench', 'display_name': 'Bench User', 'email': 'bench@example.com',
+                    'country': 'BR', 'product': 'premium', 'followers': {'total': 1}, 'images': []
+                })
+            if path == '/me/playlists':
+                return 'spotify playlists', 200, json.dumps({'items': json.loads(_encoded('playlist', 0, limit)), 'total': items})
+            if path.startswith('/playlists/'):
+                return 'spotify playlist', 200, json.dumps(make_playlist(0))
+            if path == '/me/player/recently-played':
+                return 'spotify recent', 200, json.dumps({'items': [
+                    {'track': track, 'played_at': '2024-01-01T00:00:00Z'}
+                    for track in json.loads(_encoded('track', 0, limit))
+                ]})
+            if path.startswith('/me/top/'):
+                return 'spotify top', 200, json.dumps({'items': json.loads(_encoded('track', 0, limit))})
+            if path == '/me/following':
+                return 'spotify following', 200, json.dumps({'artists': {'items': [
+                    {'id': f"artist{i}", 'name': f"Artist {i}", 'genres': ['rock'], 'followers': {'total': i}}
+                    for i in range(limit)
+                ]}})
+
+        return 'not_found', 404, json.dumps({'message': 'Not Found', 'path': path})
+
+    def _github_page(self, kind, path, query, headers, base):
+        """Return one page of a GitHub collection and set its Link header."""
+        items = self.config.items
+        per_page = min(int(query.get('per_page', 30)), 100)
+        page = max(int(query.get('page', 1)), 1)
+        last = max(1, -(-items // per_page))
+
+        def link(number):
+            params = dict(query, per_page=per_page, page=number)
+            return f"<{base}/github{path}?{urllib.parse.urlencode(params)}>"
+
+        links = []
+        if page < last:
+            links.append(f'{link(page + 1)}; rel="next"')
+            links.append(f'{link(last)}; rel="last"')
+        if page > 1:
+            links.append(f'{link(1)}; rel="first"')
+            links.append(f'{link(page - 1)}; rel="prev"')
+        if links:
+            headers['Link'] = ', '.join(links)
+
+        start = (page - 1) * per_page
+        return _encoded(kind, min(start, items), min(start + per_page, items))
+
+    def _trello_cards(self, query):
+        """Return cards newest first, paginated backwards with `before`."""
+        limit = min(int(query.get('limit', 50)), 1000)
+        top = int(query['before'], 16) if 'before' in query else self.config.items
+        indexes = range(top - 1, max(top - 1 - limit, -1), -1)
+        return json.dumps([dict(make_card(i), id=_card_id(i)) for i in indexes])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake GitHub/Trello/Spotify upstream")
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--items', type=int, default=250, help="size of every paginated collection")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument('--rate-limit', type=int, default=5000, help="GitHub requests per window")
+    parser.add_argument('--rate-window', type=int, default=60, help="GitHub rate-limit window in seconds")
+    options = parser.parse_args()
+
+    config = UpstreamConfig(options.latency_ms, options.jitter_ms, options.items, options.error_rate,
+                            options.rate_limit, options.rate_window)
+    upstream = FakeUpstream(port=options.port, config=config)
+    print(f"🧪 Fake upstream on {upstream.url}")
+    for key, value in upstream.env().items():
+        print(f"export {key}={value}")
+    try:
+        upstream.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: raw API dicts vs. slotted records.
+
+Builds synthetic GitHub issue, repository, Spotify track/playlist and Trello
+card payloads shaped like the real API responses, decodes them page by page
+with json.loads (as the plugins do) and compares the memory held by the raw
+dicts against the records from plugins/records.py.
+
+Usage:
+    python3 -m benchmarks.records_memory [count]
+"""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plugins.records import Card, Issue, Playlist, Repo, Track
+
+PAGE_SIZE = 100
+LOGINS = [f"user{i}" for i in range(200)]
+LABELS = ["bug", "enhancement", "documentation", "good first issue", "help wanted", "question"]
+
+
+def _user(i):
+    login = LOGINS[i % len(LOGINS)]
+    return {
+        "login": login,
+        "id": i % len(LOGINS),
+        "node_id": f"MDQ6VXNlcj{i % len(LOGINS)}",
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{i % len(LOGINS)}?v=4",
+        "url": f"https://api.github.com/users/{login}",
+        "html_url": f"https://github.com/{login}",
+        "type": "User",
+        "site_admin": False
+    }
+
+
+def make_issue(i):
+    return {
+        "url": f"https://api.github.com/repos/owner/repo/issues/{i}",
+        "repository_url": "https://api.github.com/repos/owner/repo",
+        "html_url": f"https://github.com/owner/repo/issues/{i}",
+        "id": 1000000 + i,
+        "node_id": f"I_kwDOA{i}",
+        "number": i,
+        "title": f"Issue number {i} about something",
+        "user": _user(i),
+        "labels": [
+            {"id": j, "name": LABELS[j], "color": "d73a4a", "default": False, "description": ""}
+            for j in range(i % 3)
+        ],
+        "state": "open" if i % 4 else "closed",
+        "locked": False,
+        "assignee": _user(i + 7) if i % 2 else None,
+        "assignees": [_user(i + 7)] if i % 2 else [],
+        "milestone": None,
+        "comments": i % 5,
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-02-01T00:00:00Z",
+        "closed_at": None if i % 4 else "2024-03-01T00:00:00Z",
+        "author_association": "CONTRIBUTOR",
+        "body": "Steps to reproduce: run the command and observe the output. " * 2,
+        "reactions": {"url": "", "total_count": 0, "+1": 0, "-1": 0, "laugh": 0},
+        "timeline_url": f"https://api.github.com/repos/owner/repo/issues/{i}/timeline"
+    }
+
+
+def make_repo(i):
+    return {
+        "id": i,
+        "name": f"repo-{i}",
+        "full_name": f"{LOGINS[i % len(LOGINS)]}/repo-{i}",
+        "owner": _user(i),
+        "private": False,
+        "html_url": f"https://github.com/{LOGINS[i % len(LOGINS)]}/repo-{i}",
+        "description": "A repository used for benchmarking",
+        "fork": False,
+        "language": "Python",
+        "stargazers_count": i,
+        "watchers_count": i,
+        "forks_count": i % 10,
+        "open_issues_count": i % 30,
+        "topics": ["cli", "python"],
+        "license": {"key": "mit", "name": "MIT License", "spdx_id": "MIT"},
+        "default_branch": "main",
+        "created_at": "2020-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+        "pushed_at": "2024-01-01T00:00:00Z"
+    }
+
+
+def make_track(i):
+    return {
+        "id": f"track{i}",
+        "name": f"Track {i}",
+        "artists": [{"id": f"artist{i % 50}", "name": f"Artist {i % 50}", "type": "artist"}],
+        "album": {"id": f"album{i % 100}", "name": f"Album {i % 100}", "album_type": "album"},
+        "duration_ms": 180000 + i,
+        "explicit": False,
+        "popularity": i % 100,
+        "external_urls": {"spotify": f"https://open.spotify.com/track/track{i}"},
+        "uri": f"spotify:track:track{i}"
+    }
+
+
+def make_playlist(i):
+    return {
+        "id": f"playlist{i}",
+        "name": f"Playlist {i}",
+        "description": "Benchmark playlist",
+        "owner": {"id": "owner", "display_name": "Owner"},
+        "external_urls": {"spotify": f"https://open.spotify.com/playlist/playlist{i}"},
+        "tracks": {"total": 5, "items": [{"track": make_track(i * 5 + j)} for j in range(5)]}
+    }
+
+
+def make_card(i):
+    return {
+        "id": f"card{i:020d}",
+        "name": f"Card {i}",
+        "desc": "Card description for benchmarking",
+        "idList": f"list{i % 8:020d}",
+        "idBoard": "board0000000000000000",
+        "labels": [{"id": "l1", "name": LABELS[i % len(LABELS)], "color": "green"}],
+        "due": None,
+        "closed": False,
+        "dateLastActivity": "2024-01-01T00:00:00.000Z",
+        "url": f"https://trello.com/c/card{i}"
+    }
+
+
+def decode_pages(factory, count):
+    """Serialize payloads page by page and decode them back like the plugins do."""
+    items = []
+    for start in range(0, count, PAGE_SIZE):
+        page = json.dumps([factory(i) for i in range(start, min(start + PAGE_SIZE, count))])
+        items.extend(json.loads(page))
+    return items
+
+
+def measure(build):
+    """Return the bytes still allocated after build() returns its result."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    cases = [
+        ("Issue", make_issue, lambda item: Issue.from_api(item, repo="owner/repo"), count),
+        ("Repo", make_repo, Repo.from_api, count // 10),
+        ("Track", make_track, Track.from_api, count),
+        ("Playlist", make_playlist, Playlist.from_api, count // 10),
+        ("Card", make_card, Card.from_api, count)
+    ]
+
+    results = []
+    print(f"{'Entity':<10} {'Count':>8} {'Dicts (MB)':>12} {'Records (MB)':>14} {'Ratio':>7}")
+    print("-" * 55)
+    for name, factory, convert, n in cases:
+        dict_bytes = measure(lambda: decode_pages(factory, n))
+        record_bytes = measure(lambda: [convert(item) for item in decode_pages(factory, n)])
+        ratio = dict_bytes / record_bytes if record_bytes else 0
+        results.append({"entity": name, "count": n, "dict_bytes": dict_bytes,
+                        "record_bytes": record_bytes, "ratio": round(ratio, 2)})
+        print(f"{name:<10} {n:>8} {dict_bytes / 1e6:>12.1f} {record_bytes / 1e6:>14.1f} {ratio:>6.1f}x")
+
+    if os.getenv('BENCH_JSON'):
+        print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
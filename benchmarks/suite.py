@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmarks against a local fake upstream.
+
+Every scenario runs the real entry points (fetcher.py, mcp_server.py) as
+subprocesses with the plugins pointed at benchmarks/fake_upstream.py, so
+no live API is touched:
+
+    cli_cold_start     fetcher.py github repo, a new process per sample
+    mcp_tools_list     tools/list on a warm MCP server
+    mcp_single_call    one tools/call at a time (GitHub, Trello, Spotify)
+    mcp_burst          --concurrency tools/call requests sent at once
+    large_pagination   github/trello export of --items rows to CSV
+
+Results are written as JSON and can be compared with a previous run; the
+exit code is 1 when a scenario's p50 regressed by more than --threshold.
+
+Usage:
+    python3 -m benchmarks.suite [--scenarios a,b] [--repeat 20] [--latency-ms 20]
+                                [--output results.json] [--compare baseline.json]
+    python3 -m benchmarks.suite compare baseline.json results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fake_upstream import FakeUpstream, UpstreamConfig
+
+SINGLE_CALLS = [
+    ("github_repo", ["bench/repo"]),
+    ("github_issues", ["bench/repo", "open"]),
+    ("trello_boards", []),
+    ("trello_board", ["board00000000000000000000"]),
+    ("spotify_playlists", []),
+    ("spotify_recent", [])
+]
+
+
+def _summary(samples, errors=0, **extra):
+    """Latency statistics in milliseconds."""
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3) if ordered else None
+
+    result = {
+        "samples": len(ordered),
+        "errors": errors,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None,
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else None
+    }
+    result.update(extra)
+    return result
+
+
+class MCPClient:
+    """Drive mcp_server.py over stdio."""
+
+    def __init__(self, env):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "mcp_server.py")],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1, cwd=ROOT, env=env
+        )
+        self._next_id = 0
+
+    def send(self, method, params=None):
+        self._next_id += 1
+        request = {"jsonrpc": "2.0", "id": str(self._next_id), "method": method, "params": params or {}}
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        return str(self._next_id)
+
+    def receive(self, ids):
+        """Read responses until every id in `ids` has arrived; return {id: response}."""
+        pending, responses = set(ids), {}
+        while pending:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("MCP server exited")
+            if not line.startswith("{"):
+                continue
+            response = json.loads(line)
+            if response.get("id") in pending:
+                pending.discard(response["id"])
+                responses[response["id"]] = response
+        return responses
+
+    def call(self, method, params=None):
+        request_id = self.send(method, params)
+        return self.receive([request_id])[request_id]
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait(timeout=10)
+
+
+def _failed(response):
+    return bool(response.get("error") or (response.get("result") or {}).get("isError"))
+
+
+def cli_cold_start(env, options):
+    samples, errors = [], 0
+    for _ in range(options.repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, os.path.join(ROOT, "fetcher.py"), "github", "repo", "bench/repo"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        samples.append(time.perf_counter() - start)
+        errors += result.returncode != 0
+    return _summary(samples, errors)
+
+
+def _with_server(env, run):
+    start = time.perf_counter()
+    client = MCPClient(env)
+    try:
+        client.call("initialize", {"protocolVersion": "2024-11-05", "capabilities": {}})
+        startup = time.perf_counter() - start
+        return run(client), startup
+    finally:
+        client.close()
+
+
+def mcp_tools_list(env, options):
+    def run(client):
+        samples, errors = [], 0
+        for _ in range(options.repeat):
+            start = time.perf_counter()
+            errors += _failed(client.call("tools/list"))
+            samples.append(time.perf_counter() - start)
+        return samples, errors
+
+    (samples, errors), startup = _with_server(env, run)
+    return _summary(samples, errors, startup_ms=round(startup * 1000, 3))
+
+
+def mcp_single_call(env, options):
+    def run(client):
+        per_tool = {}
+        for name, args in SINGLE_CALLS:
+            samples, errors = [], 0
+            for _ in range(options.repeat):
+                start = time.perf_counter()
+                errors += _failed(client.call("tools/call", {"name": name, "args": args}))
+                samples.append(time.perf_counter() - start)
+            per_tool[name] = (samples, errors)
+        return per_tool
+
+    per_tool, _ = _with_server(env, run)
+    samples = [sample for tool_samples, _ in per_tool.values() for sample in tool_samples]
+    errors = sum(tool_errors for _, tool_errors in per_tool.values())
+    return _summary(samples, errors, tools={name: _summary(s, e) for name, (s, e) in per_tool.items()})
+
+
+def mcp_burst(env, options):
+    def run(client):
+        waves, errors = [], 0
+        for _ in range(options.repeat):
+            start = time.perf_counter()
+            ids = [
+                client.send("tools/call", {"name": name, "args": args})
+                for name, args in (SINGLE_CALLS * options.concurrency)[:options.concurrency]
+            ]
+            responses = client.receive(ids)
+            waves.append(time.perf_counter() - start)
+            errors += sum(_failed(response) for response in responses.values())
+        return waves, errors
+
+    (waves, errors), _ = _with_server(env, run)
+    calls = len(waves) * options.concurrency
+    return _summary(waves, errors, concurrency=options.concurrency,
+                    calls_per_second=round(calls / sum(waves), 2) if waves else None)
+
+
+def large_pagination(env, options):
+    def run(client):
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, args in [
+                ("github_export", ["issues", "bench/repo", os.path.join(tmp, "issues.csv"), "all"]),
+                ("trello_export", ["board", "board00000000000000000000", os.path.join(tmp, "cards.csv")])
+            ]:
+                samples, errors = [], 0
+                for _ in range(max(1, options.repeat // 5)):
+                    start = time.perf_counter()
+                    errors += _failed(client.call("tools/call", {"name": name, "args": args}))
+                    samples.append(time.perf_counter() - start)
+                results[name] = (samples, errors)
+        return results
+
+    results, _ = _with_server(env, run)
+    return {
+        name: _summary(samples, errors, rows=options.items,
+                       rows_per_second=round(options.items / (sum(samples) / len(samples)), 1))
+        for name, (samples, errors) in results.items()
+    }
+
+
+SCENARIOS = {
+    "cli_cold_start": cli_cold_start,
+    "mcp_tools_list": mcp_tools_list,
+    "mcp_single_call": mcp_single_call,
+    "mcp_burst": mcp_burst,
+    "large_pagination": large_pagination
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _flatten(results, prefix=""):
+    """Yield (name, summary) for every summary in a results tree."""
+    for name, value in results.items():
+        if isinstance(value, dict) and "p50_ms" in value:
+            yield prefix + name, value
+            for tool, summary in value.get("tools", {}).items():
+                yield f"{prefix}{name}.{tool}", summary
+        elif isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{name}.")
+
+
+def compare(baseline, current, threshold):
+    """Print p50 changes per scenario and return the names that regressed."""
+    base = dict(_flatten(baseline["scenarios"]))
+    regressions = []
+    print(f"\n{'Scenario':<40} {'Base p50':>10} {'New p50':>10} {'Change':>8}")
+    print("-" * 71)
+    for name, summary in _flatten(current["scenarios"]):
+        old = base.get(name, {}).get("p50_ms")
+        new = summary.get("p50_ms")
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = " ⚠️"
+        print(f"{name:<40} {old:>10.1f} {new:>10.1f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "compare":
+        with open(sys.argv[2]) as f:
+            baseline = json.load(f)
+        with open(sys.argv[3]) as f:
+            current = json.load(f)
+        sys.exit(1 if compare(baseline, current, 0.10) else 0)
+
+    parser = argparse.ArgumentParser(description="Fetcher benchmark suite")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenario names")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=5000, help="rows in paginated collections")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p50 regression (0.10 = 10%%)")
+    options = parser.parse_args()
+
+    names = [name.strip() for name in options.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    config = UpstreamConfig(options.latency_ms, options.jitter_ms, options.items, options.error_rate)
+    results = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "options": vars(options)
+        },
+        "scenarios": {}
+    }
+
+    with FakeUpstream(config=config) as upstream, tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, **upstream.env(), FETCHER_NO_DAEMON="1", FETCHER_CACHE_DIR=cache_dir)
+        for name in names:
+            print(f"⏱️  {name}...", file=sys.stderr)
+            results["scenarios"][name] = SCENARIOS[name](env, options)
+        results["meta"]["upstream_requests"] = upstream.requests
+
+    print(f"\n{'Scenario':<40} {'p50 ms':>10} {'p95 ms':>10} {'Errors':>7}")
+    print("-" * 70)
+    for name, summary in _flatten(results["scenarios"]):
+        print(f"{name:<40} {summary['p50_ms']:>10.1f} {summary['p95_ms']:>10.1f} {summary['errors']:>7}")
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {options.output}")
+
+    if options.compare:
+        with open(options.compare) as f:
+            regressions = compare(json.load(f), results, options.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {options.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
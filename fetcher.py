@@ -2,26 +2,93 @@
 Fetcher - A plugin-based CLI tool for fetching and managing information from multiple services.
 
 Usage:
-    python fetcher.py [plugin_name] [command] [args...]
+    python fetcher.py [--profile] [plugin_name] [command] [args...]
+    python fetcher.py many [--timeout S] "plugin command [args...]" ...
+
+When a fetcher daemon is running (python fetcher_daemon.py start), the
+command is forwarded to it and its output streamed back; otherwise it runs
+in-process. Set FETCHER_NO_DAEMON=1 to always run in-process.
+
+--profile records a cProfile of the command (see plugins/profiling.py).
 
 """
 
 import sys
-from plugins.plugin_manager import manager
 
-def main():
-    if len(sys.argv) < 2:
+import fetcher_daemon
+
+
+def run(argv, manager):
+    """Execute a CLI invocation against a plugin manager and return the exit code."""
+    from plugins.profiling import profile_call, should_profile
+
+    profile = bool(argv) and argv[0] == "--profile"
+    if profile:
+        argv = argv[1:]
+    if len(argv) < 1:
         print("Usage: python fetcher.py [plugin_name] [command] [args...]")
         print("\nAvailable plugins:")
         for name in manager.plugins:
             print(f"  - {name}")
-        sys.exit(1)
+        return 1
+
+    if argv[0] == "many":
+        return run_many(argv[1:], manager)
 
-    plugin_name = sys.argv[1]
-    command = sys.argv[2] if len(sys.argv) > 2 else None
-    args = sys.argv[3:] if len(sys.argv) > 3 else []
-    
-    manager.run_plugin(plugin_name, command, *args)
+    plugin_name = argv[0]
+    command = argv[1] if len(argv) > 1 else None
+    args = argv[2:] if len(argv) > 2 else []
+
+    try:
+        if not should_profile(profile):
+            manager.run_plugin(plugin_name, command, *args)
+            return 0
+
+        with profile_call(f"{plugin_name}_{command}") as result:
+            manager.run_plugin(plugin_name, command, *args)
+    except RuntimeError as e:
+        # Upstream failures a command could not complete without (e.g. a failed page)
+        print(f"❌ {e}")
+        return 1
+    if result.path:
+        print(f"\n📊 Profile saved to {result.path}")
+        print(result.summary)
+    return 0
+
+def run_many(argv, manager):
+    """fetcher.py many [--timeout S] "plugin command args..." ...: run commands concurrently."""
+    import shlex
+
+    timeout = None
+    if len(argv) > 1 and argv[0] == "--timeout":
+        timeout = float(argv[1])
+        argv = argv[2:]
+    calls = [shlex.split(entry) for entry in argv]
+    calls = [(call[0], call[1], call[2:]) for call in calls if len(call) >= 2]
+    if not calls:
+        print('Usage: python fetcher.py many [--timeout S] "plugin command [args...]" ...')
+        return 1
+
+    kwargs = {"timeout": timeout} if timeout is not None else {}
+    failed = 0
+    for done, result in enumerate(manager.run_many(calls, **kwargs), 1):
+        label = " ".join([result["plugin"], result["command"], *result["args"]])
+        icon = {"ok": "✅", "timeout": "⏱️"}.get(result["status"], "❌")
+        print(f"\n{icon} [{done}/{len(calls)}] {label} ({result['elapsed']}s)")
+        if result["output"].strip():
+            print(result["output"].rstrip())
+        if result["status"] != "ok":
+            failed += 1
+            print(f"   {result['error']}")
+    return 1 if failed else 0
+
+def main():
+    exit_code = fetcher_daemon.forward(sys.argv[1:])
+    if exit_code is None:
+        # No daemon running, load the plugins in this process
+        from plugins.plugin_manager import manager
+        exit_code = run(sys.argv[1:], manager)
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Fetcher daemon - keeps plugins warm behind a Unix domain socket.
+
+Every `python fetcher.py ...` normally pays for interpreter start, importing
+requests/dotenv, parsing .env, instantiating every plugin and a fresh TLS
+handshake. The daemon does that once and keeps the PluginManager, plugin
+instances, caches and connection pools alive; fetcher.py forwards its argv
+and streams the output back.
+
+Usage:
+    python fetcher_daemon.py start    # start in the background
+    python fetcher_daemon.py serve    # run in the foreground
+    python fetcher_daemon.py status
+    python fetcher_daemon.py stop
+
+Protocol: the client sends one JSON line {"argv": [...], "cwd": ..., "env":
+digest} and receives JSON lines {"out": "..."} followed by a final
+{"exit": code}. The daemon runs every command in its own working directory
+and environment, so when the client's differ (relative paths such as
+`@repos.txt` or an export file would resolve elsewhere, per-call switches
+such as FETCHER_PROFILE would be ignored) it answers {"fallback": reason}
+instead and the client runs the command in-process. Only a digest of the
+environment crosses the socket, never tokens or secrets.
+
+The socket lives in a directory only its owner can enter, is created 0600,
+and clients refuse to talk to a socket (or directory) owned by another user
+or open to others.
+
+This module is imported by fetcher.py on every invocation, so it must only
+import the standard library at module level.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import threading
+import time
+
+# Environment variables that change what a command does
+CALL_ENV_PREFIXES = ('FETCHER_', 'GITHUB_', 'TRELLO_', 'SPOTIFY_', 'LINKEDIN_', 'RATE_LIMIT_')
+# ...except the ones that only decide whether the daemon is used
+DAEMON_ENV = ('FETCHER_DAEMON_SOCKET', 'FETCHER_NO_DAEMON')
+
+
+def call_environment():
+    """Digest of the environment variables a forwarded call must share with the daemon.
+
+    The values include tokens and passwords, so only their hash is compared.
+    """
+    env = sorted(
+        (name, value) for name, value in os.environ.items()
+        if name.startswith(CALL_ENV_PREFIXES) and name not in DAEMON_ENV
+    )
+    return hashlib.sha256(json.dumps(env).encode('utf-8')).hexdigest()
+
+
+def socket_path():
+    """Return the daemon socket path (FETCHER_DAEMON_SOCKET overrides it)."""
+    if os.getenv('FETCHER_DAEMON_SOCKET'):
+        return os.environ['FETCHER_DAEMON_SOCKET']
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime_dir, f"fetcher-{os.getuid()}", "daemon.sock")
+
+
+def _trusted(path):
+    """Whether `path` is our own socket that no other user can replace or open."""
+    try:
+        info = os.lstat(path)
+        parent = os.stat(os.path.dirname(os.path.abspath(path)))
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        return False
+    # Others must not be able to swap the socket: a directory of ours (or root's) that is
+    # not writable by others, or a sticky one such as /tmp
+    if parent.st_uid not in (os.getuid(), 0):
+        return False
+    return not parent.st_mode & 0o022 or bool(parent.st_mode & stat.S_ISVTX)
+
+
+def _private_directory(path):
+    """Create the socket's directory as 0700, refusing one that someone else owns."""
+    directory = os.path.dirname(os.path.abspath(path))
+    if os.getenv('FETCHER_DAEMON_SOCKET'):
+        os.makedirs(directory, exist_ok=True)
+        return
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{directory} is not a directory owned by this user")
+    os.chmod(directory, 0o700)
+
+
+def _connect(timeout=None):
+    """Connect to the daemon, returning None when it is not running."""
+    # Record/replay runs stay in-process so the client's cassette settings apply
+    if os.getenv('FETCHER_NO_DAEMON') or os.getenv('FETCHER_HTTP_MODE', 'live') != 'live' \
+            or not hasattr(socket, 'AF_UNIX'):
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+    if not _trusted(path):
+        print(f"⚠️ Ignoring daemon socket {path}: not owned by this user or open to others", file=sys.stderr)
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _request(message, timeout=None):
+    """Send a control message and return the decoded response lines."""
+    sock = _connect(timeout)
+    if sock is None:
+        return None
+    try:
+        with sock, sock.makefile('rw', encoding='utf-8') as stream:
+            stream.write(json.dumps(message) + "\n")
+            stream.flush()
+            return [json.loads(line) for line in stream]
+    except (OSError, ValueError):
+        return None
+
+
+def forward(argv):
+    """Run a CLI invocation on the daemon, streaming its output to stdout.
+
+    Returns the exit code, or None when no daemon is available so the caller
+    can fall back to running in-process.
+    """
+    sock = _connect()
+    if sock is None:
+        return None
+    started = False
+    try:
+        with sock, sock.makefile('rw', encoding='utf-8') as stream:
+            stream.write(json.dumps({"argv": argv, "cwd": os.getcwd(), "env": call_environment()}) + "\n")
+            stream.flush()
+            for line in stream:
+                message = json.loads(line)
+                if "fallback" in message:
+                    # Different working directory or environment: run in-process
+                    return None
+                started = True
+                if "out" in message:
+                    sys.stdout.write(message["out"])
+                    sys.stdout.flush()
+                elif "exit" in message:
+                    return message["exit"]
+    except (OSError, ValueError):
+        pass
+    # Daemon went away: fall back if nothing ran yet, otherwise report failure
+    return 1 if started else None
+
+
+class _SocketWriter:
+    """File-like object that streams complete lines to the client socket."""
+
+    def __init__(self, wfile):
+        self._wfile = wfile
+        self._buffer = ""
+
+    def write(self, text):
+        self._buffer += text
+        if "\n" in self._buffer:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            self._send({"out": self._buffer})
+            self._buffer = ""
+
+    def _send(self, message):
+        self._wfile.write((json.dumps(message) + "\n").encode('utf-8'))
+        self._wfile.flush()
+
+
+def serve():
+    """Load the plugins and serve requests until stopped."""
+    import socketserver
+
+    # Taken before the plugins load .env, so it compares like a client's environment
+    cwd, environment = os.getcwd(), call_environment()
+
+    from fetcher import run
+    from plugins.output_capture import capture_output
+    from plugins.plugin_manager import manager
+
+    path = socket_path()
+
+    def mismatch(message):
+        """Why a call cannot run here, or None."""
+        if message.get("cwd") != cwd:
+            return f"working directory differs from the daemon's ({cwd})"
+        if message.get("env") != environment:
+            return "environment differs from the daemon's"
+        return None
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            writer = _SocketWriter(self.wfile)
+
+            if message.get("control") == "ping":
+                writer._send({"pid": os.getpid(), "plugins": list(manager.plugins)})
+                return
+            if message.get("control") == "stop":
+                writer._send({"exit": 0})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+            reason = mismatch(message)
+            if reason:
+                writer._send({"fallback": reason})
+                return
+
+            try:
+                with capture_output(writer):
+                    exit_code = run(message.get("argv", []), manager)
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except Exception as e:
+                with capture_output(writer):
+                    print(f"❌ Error: {e}")
+                exit_code = 1
+            writer.flush()
+            writer._send({"exit": exit_code})
+
+    _private_directory(path)
+    if os.path.exists(path):
+        if _connect(timeout=1) is not None:
+            print(f"Daemon already running on {path}")
+            return 1
+        os.unlink(path)
+
+    # The socket is created 0600: no window in which others can connect
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    finally:
+        os.umask(umask)
+    server.daemon_threads = True
+    print(f"🚀 Fetcher daemon listening on {path} (plugins: {list(manager.plugins)})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+    return 0
+
+
+def start():
+    """Start the daemon in the background and wait until it answers."""
+    if _request({"control": "ping"}, timeout=1):
+        print(f"Daemon already running on {socket_path()}")
+        return 0
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    for _ in range(100):
+        time.sleep(0.1)
+        if _request({"control": "ping"}, timeout=1):
+            print(f"✅ Daemon started on {socket_path()}")
+            return 0
+    print("❌ Daemon did not start. Run `python fetcher_daemon.py serve` to see errors.")
+    return 1
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command == "serve":
+        sys.exit(serve())
+    elif command == "start":
+        sys.exit(start())
+    elif command == "stop":
+        response = _request({"control": "stop"}, timeout=5)
+        print("🛑 Daemon stopped" if response else "Daemon is not running")
+    elif command == "status":
+        response = _request({"control": "ping"}, timeout=1)
+        if response:
+            info = response[0]
+            print(f"✅ Daemon running (pid {info['pid']}) on {socket_path()}, plugins: {info['plugins']}")
+        else:
+            print("Daemon is not running")
+    else:
+        print("Usage: python fetcher_daemon.py [start|serve|status|stop]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
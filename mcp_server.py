@@ -4,16 +4,27 @@ MCP Server for Fetcher - Allows LLMs to interact with Fetcher plugins through MC
 """
 
 import asyncio
-import contextlib
+import http.server
 import io
 import json
 import logging
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Union
 
+from plugins.context import bind_context
+from plugins.deadline import CallCancelled, Deadline, deadline_scope
+from plugins.metrics import registry
+from plugins.output_capture import capture_output, route_uncaptured
 from plugins.plugin_manager import PluginManager
+from plugins.profiling import profile_call, should_profile
+from plugins.storage import atomic_write
+from plugins.tracing import tracer
+from plugins.webhooks import start_receiver as start_webhook_receiver
 
 # Configure logging based on environment variable
 log_level = os.getenv('MCP_LOG_LEVEL', 'INFO').upper()
@@ -65,6 +76,12 @@ def print_startup_info():
     print("   MCP_LOG_LEVEL=DEBUG python3 mcp_server.py", file=sys.stderr)
     print("", file=sys.stderr)
     
+    print("📈 Métricas / Metrics:", file=sys.stderr)
+    print("   MCP method: metrics", file=sys.stderr)
+    print("   MCP_METRICS_FILE=/path/fetcher.prom (Prometheus text file)", file=sys.stderr)
+    print("   MCP_METRICS_PORT=9464 (Prometheus endpoint at /metrics)", file=sys.stderr)
+    print("", file=sys.stderr)
+    
     print("⚙️  Variáveis de ambiente / Environment variables:", file=sys.stderr)
     env_vars = ['GITHUB_TOKEN', 'SPOTIFY_CLIENT_ID', 'TRELLO_API_KEY', 'TRELLO_TOKEN']
     for var in env_vars:
@@ -90,10 +107,47 @@ class MCPResponse:
     result: Optional[Any] = None
     error: Optional[Dict[str, Any]] = None
 
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """Serve the metrics registry in the Prometheus text format."""
+    
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Keep scrapes out of the server log
+        pass
+
+def start_metrics_endpoint(port: int):
+    """Expose /metrics over HTTP on a background thread."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info(f"📈 Métricas em / Metrics at http://127.0.0.1:{port}/metrics")
+    return server
+
 class MCPServer:
     """MCP Server implementation for Fetcher."""
     
     def __init__(self):
+        self.metrics_file = os.getenv('MCP_METRICS_FILE')
+        # Tool calls run here so a slow call (or a pending OAuth flow) never blocks the loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('MCP_TOOL_WORKERS', '8')),
+            thread_name_prefix='mcp-tool'
+        )
+        # Default per-call deadline in seconds (0 = none); cancellable by request id
+        self.tool_timeout = float(os.getenv('MCP_TOOL_TIMEOUT', '0'))
+        self.active_calls = {}
+
         self.plugin_manager = PluginManager()
         logger.info("🔌 Carregando plugins / Loading plugins...")
         self.plugin_manager.load_plugins()
@@ -115,7 +169,14 @@ class MCPServer:
         logger.info("🎯 Servidor MCP pronto para receber requisições / MCP Server ready for requests")
         
     async def handle_request(self, request_data: str) -> str:
-        """Handle incoming MCP request."""
+        """Handle incoming MCP request inside a root tracing span."""
+        with tracer.start_span("mcp.request") as span:
+            return await self._handle_request(request_data, span)
+    
+    async def _handle_request(self, request_data: str, span) -> str:
+        """Route an MCP request and serialize its response."""
+        start = time.perf_counter()
+        tool_name = None
         try:
             logger.debug(f"📨 Requisição recebida / Received request: {request_data}")
             
@@ -127,6 +188,10 @@ class MCPServer:
             )
             
             logger.info(f"🔄 Processando método / Processing method: {request.method}")
+            if span:
+                span.name = f"mcp {request.method}"
+                span.set_attribute("mcp.method", request.method)
+                span.set_attribute("mcp.request_id", str(request.id))
             
             # Route request to appropriate handler
             if request.method == "initialize":
@@ -135,6 +200,9 @@ class MCPServer:
                 # Notification - no response needed, but acknowledge it
                 logger.info("✅ Cliente inicializado / Client initialized")
                 return ""  # Return empty string for notifications
+            elif request.method == "notifications/cancelled":
+                self._cancel_request(request.params)
+                return ""
             elif request.method.startswith("notifications/"):
                 # Handle other notifications
                 logger.info(f"📢 Notificação recebida / Notification received: {request.method}")
@@ -143,8 +211,14 @@ class MCPServer:
                 result = await self._tools_list(request.params)
             elif request.method == "tools/call":
                 tool_name = request.params.get("name", "unknown")
+                if span:
+                    span.set_attribute("mcp.tool", tool_name)
                 logger.info(f"🛠️  Executando ferramenta / Executing tool: {tool_name}")
-                result = await self._tools_call(request.params)
+                result = await self._tools_call(request.params, request.id)
+            elif request.method == "run_many":
+                result = await self._run_many(request.params)
+            elif request.method == "metrics":
+                result = await self._metrics(request.params)
             elif request.method == "list_plugins":
                 result = await self._list_plugins()
             elif request.method == "get_plugin_info":
@@ -155,13 +229,21 @@ class MCPServer:
             response = MCPResponse(id=request.id, result=result)
             logger.debug(f"✅ Resposta / Response: {response}")
             
+        except CallCancelled:
+            # Cancelled requests get no response (MCP notifications/cancelled)
+            logger.info(f"🚫 Requisição cancelada / Request cancelled: {request.id}")
+            return ""
         except Exception as e:
             logger.error(f"❌ Erro ao processar requisição / Error handling request: {e}")
+            if span:
+                span.status = "error"
+                span.error = str(e)
             response = MCPResponse(
                 id=request_json.get("id") if 'request_json' in locals() else None,
                 error={"code": -1, "message": str(e)}
             )
             
+        serialize_start = time.perf_counter()
         response_str = json.dumps({
             "jsonrpc": "2.0",
             "id": response.id,
@@ -169,9 +251,65 @@ class MCPServer:
             "error": response.error
         })
         
+        if tool_name:
+            end = time.perf_counter()
+            registry.observe('fetcher_tool_duration_seconds', end - serialize_start, tool=tool_name, phase='serialization')
+            registry.observe('fetcher_tool_duration_seconds', end - start, tool=tool_name, phase='total')
+        self._write_metrics_file()
+        
         logger.debug(f"📤 Enviando resposta / Sending response: {response_str}")
         return response_str
     
+    def _write_metrics_file(self):
+        """Refresh the Prometheus text file if MCP_METRICS_FILE is set."""
+        if not self.metrics_file:
+            return
+        try:
+            atomic_write(self.metrics_file, registry.render_prometheus())
+        except OSError as e:
+            logger.warning(f"⚠️  Falha ao gravar métricas / Failed to write metrics file: {e}")
+    
+    async def _run_many(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run several plugin commands concurrently.
+        
+        params.calls: [{"plugin": "github", "command": "repo", "args": ["owner/repo"]},
+                       {"name": "trello_board", "args": ["board_id"], "timeout": 10}, ...]
+        Results are listed in completion order, each with the index of its call.
+        """
+        calls = []
+        for call in params.get("calls") or []:
+            call = dict(call)
+            if "name" in call:
+                call["plugin"], call["command"] = call.pop("name").split("_", 1)
+            calls.append(call)
+        if not calls:
+            raise ValueError("Nenhuma chamada fornecida / No calls provided")
+        
+        kwargs = {key: params[key] for key in ("timeout", "max_per_plugin") if key in params}
+        logger.info(f"🧩 Executando {len(calls)} chamadas em paralelo / Running {len(calls)} calls concurrently")
+        
+        def run():
+            return list(self.plugin_manager.run_many(calls, **kwargs))
+        
+        results = await asyncio.get_running_loop().run_in_executor(self.executor, bind_context(run))
+        return {"results": results}
+    
+    async def _metrics(self, params: Dict[str, Any] = None) -> Any:
+        """Return collected metrics (JSON by default, or Prometheus text)."""
+        if params and params.get("format") == "prometheus":
+            return {"text": registry.render_prometheus()}
+        return registry.snapshot()
+    
+    def _record_tool_call(self, tool_name: str, status: str, timings, elapsed: float):
+        """Record a tool call and split its latency into phases."""
+        upstream = timings.get('upstream_wait')
+        decode = timings.get('json_decode')
+        registry.inc('fetcher_tool_calls_total', tool=tool_name, status=status)
+        registry.observe('fetcher_tool_duration_seconds', upstream, tool=tool_name, phase='upstream_wait')
+        registry.observe('fetcher_tool_duration_seconds', decode, tool=tool_name, phase='json_decode')
+        registry.observe('fetcher_tool_duration_seconds', max(0.0, elapsed - upstream - decode),
+                         tool=tool_name, phase='formatting')
+    
     async def _initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Initialize the MCP server - required by MCP protocol."""
         logger.info("🤝 Inicializando servidor MCP / Initializing MCP server")
@@ -485,7 +623,7 @@ class MCPServer:
             # Capture stdout to prevent plugin output from interfering with JSON response
             captured_output = io.StringIO()
             
-            with contextlib.redirect_stdout(captured_output):
+            with capture_output(captured_output):
                 # Execute the command
                 if command == "test":
                     result = plugin.test()
@@ -527,7 +665,7 @@ class MCPServer:
                 "isError": True
             }
     
-    async def _tools_call(self, params: Dict[str, Any]) -> Any:
+    async def _tools_call(self, params: Dict[str, Any], request_id: Any = None) -> Any:
         """Call a specific tool (MCP standard method)."""
         tool_name = params.get("name")
         # Support both 'arguments' (MCP standard) and 'args' (compatibility)
@@ -550,11 +688,80 @@ class MCPServer:
         
         plugin = self.plugin_manager.plugins[plugin_name]
         
+        meta = params.get("_meta") or {}
+        deadline = self._deadline_for(meta)
+        if request_id is not None:
+            self.active_calls[request_id] = deadline
+        
+        # Plugins block (HTTP calls, OAuth waits), so they run in a worker thread
+        # with a copy of this request's context while the loop keeps serving
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.executor,
+            bind_context(self._execute_tool),
+            plugin, tool_name, command, arguments, args, meta, deadline
+        )
+        try:
+            result = await asyncio.wait_for(future, timeout=deadline.remaining())
+        except asyncio.TimeoutError:
+            # Stop the worker at its next HTTP call or deadline-aware wait
+            deadline.cancel("deadline exceeded")
+            logger.warning(f"⏱️  Prazo esgotado / Deadline exceeded: {tool_name}")
+            return {
+                "content": [{"type": "text", "text": "Error executing command: deadline exceeded"}],
+                "isError": True
+            }
+        finally:
+            self.active_calls.pop(request_id, None)
+        
+        if deadline.cancelled:
+            raise CallCancelled(deadline.reason)
+        return result
+    
+    def _deadline_for(self, meta: Dict[str, Any]) -> Deadline:
+        """Deadline from _meta.timeout (seconds) or _meta.deadline (Unix time), else MCP_TOOL_TIMEOUT."""
+        if meta.get("deadline"):
+            return Deadline.at(float(meta["deadline"]))
+        timeout = meta.get("timeout") or self.tool_timeout
+        return Deadline(timeout=float(timeout) if timeout else None)
+    
+    def _cancel_request(self, params: Dict[str, Any]):
+        """Handle notifications/cancelled for an in-flight tools/call."""
+        deadline = self.active_calls.get(params.get("requestId"))
+        if deadline is not None:
+            logger.info(f"🚫 Cancelando / Cancelling request {params.get('requestId')}: {params.get('reason', '')}")
+            deadline.cancel(params.get("reason") or "cancelled by client")
+    
+    def _execute_tool(self, plugin, tool_name, command, arguments, args, meta, deadline):
+        """Run a tool in the current (worker) thread under its deadline, optionally profiled."""
+        with deadline_scope(deadline):
+            return self._execute_profiled(plugin, tool_name, command, arguments, args, meta)
+    
+    def _execute_profiled(self, plugin, tool_name, command, arguments, args, meta):
+        """Run a tool with metrics, under cProfile when requested."""
+        if not should_profile(meta.get("profile")):
+            start = time.perf_counter()
+            with registry.track_call() as timings:
+                return self._run_tool(plugin, tool_name, command, arguments, args, timings, start)
+        
+        with profile_call(tool_name) as profile:
+            start = time.perf_counter()
+            with registry.track_call() as timings:
+                result = self._run_tool(plugin, tool_name, command, arguments, args, timings, start)
+        if profile.path:
+            logger.info(f"📊 Perfil salvo / Profile saved: {profile.path}")
+            result["_meta"] = {"profile": profile.path}
+        return result
+    
+    def _run_tool(self, plugin, tool_name, command, arguments, args, timings, start):
+        """Execute a tool, recording its metrics."""
         try:
             # Capture stdout to prevent plugin output from interfering with JSON response
             captured_output = io.StringIO()
             
-            with contextlib.redirect_stdout(captured_output):
+            plugin_name = tool_name.split("_", 1)[0]
+            with capture_output(captured_output), \
+                    tracer.start_span(f"{plugin_name}.{command}", **{"fetcher.plugin": plugin_name, "fetcher.command": command}):
                 # Execute the command
                 if command == "test":
                     result = plugin.test()
@@ -582,6 +789,8 @@ class MCPServer:
             else:
                 final_result = result if result is not None else "Command completed successfully"
             
+            self._record_tool_call(tool_name, "ok", timings, time.perf_counter() - start)
+            
             # Return the result in MCP-compliant format
             return {
                 "content": [
@@ -595,6 +804,7 @@ class MCPServer:
             
         except Exception as e:
             logger.error(f"❌ Erro na execução / Execution error: {e}")
+            self._record_tool_call(tool_name, "error", timings, time.perf_counter() - start)
             return {
                 "content": [
                     {
@@ -654,20 +864,42 @@ class MCPServer:
 
 async def main():
     """Main server loop."""
+    # stdout carries only JSON-RPC: stray prints (threads outside a tool call's capture) go to stderr
+    protocol_out = route_uncaptured(sys.stderr)
+    
     # Print startup information
     print_startup_info()
     
     server = MCPServer()
     
+    metrics_port = os.getenv('MCP_METRICS_PORT')
+    if metrics_port:
+        start_metrics_endpoint(int(metrics_port))
+    
+    webhook_port = os.getenv('FETCHER_WEBHOOK_PORT')
+    if webhook_port:
+        receiver = start_webhook_receiver(int(webhook_port), server.plugin_manager)
+        logger.info(f"🪝 Webhooks em / Webhooks at {receiver.url}/github, {receiver.url}/trello")
+    
     logger.info("🌟 MCP Server para Fetcher iniciado / MCP Server for Fetcher started")
     logger.info(f"📦 Plugins carregados / Loaded plugins: {list(server.plugin_manager.plugins.keys())}")
     
+    loop = asyncio.get_running_loop()
+    pending = set()
+    
+    async def respond(line: str):
+        response = await server.handle_request(line)
+        # Write response to stdout (only if not empty)
+        if response:
+            protocol_out.write(response + "\n")
+            protocol_out.flush()
+    
     try:
         logger.info("⏳ Aguardando requisições via stdin / Waiting for requests via stdin...")
         
         while True:
-            # Read from stdin
-            line = sys.stdin.readline()
+            # Read from stdin in a thread so running requests keep progressing
+            line = await loop.run_in_executor(None, sys.stdin.readline)
             if not line:
                 logger.info("📛 EOF recebido, encerrando servidor / EOF received, shutting down server")
                 break
@@ -676,19 +908,21 @@ async def main():
             if not line:
                 continue
                 
-            # Process request
-            response = await server.handle_request(line)
-            
-            # Write response to stdout (only if not empty)
-            if response:
-                print(response)
-                sys.stdout.flush()
+            # Process request concurrently; responses are matched by id
+            task = asyncio.create_task(respond(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        if pending:
+            await asyncio.gather(*pending)
             
     except KeyboardInterrupt:
         logger.info("🛑 Servidor sendo encerrado por interrupção / Server shutting down due to interrupt...")
     except Exception as e:
         logger.error(f"❌ Erro no servidor / Server error: {e}")
         raise
+    finally:
+        server.executor.shutdown(wait=False)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,168 @@
+"""
+Local store of the Trello board actions that move cards.
+
+Board and list lookups only say where cards are now; lead and cycle times
+need every card's history. That history is in the board's actions feed,
+which the API pages backwards from the newest action. The store keeps the
+card-flow actions of a board as compact positional rows in a JSON Lines file
+under the cache directory, oldest first, and a sync only asks for actions
+newer than the last stored one - after the first sync that is usually a
+single request.
+
+Rows: [id, date, type, card, list_before, list_after, closed]
+    list_before - list the card left (None when it was created or arrived)
+    list_after  - list the card is in afterwards (None when it left the board)
+    closed      - True/False for archive/unarchive actions, None otherwise
+
+Usage:
+    store = ActionStore(board_id)
+    added = store.sync(plugin.fetch)
+    rows = store.rows
+"""
+
+import json
+import os
+import threading
+
+from .deadline import current_deadline
+from .storage import atomic_write, cache_path
+
+STORE_VERSION = 1
+FIELDS = ('id', 'date', 'type', 'card', 'list_before', 'list_after', 'closed')
+
+# Card-flow actions only; comments and checklist edits never move a card
+ACTION_FILTER = ','.join((
+    'createCard', 'copyCard', 'convertToCardFromCheckItem', 'moveCardToBoard',
+    'updateCard:idList', 'updateCard:closed', 'moveCardFromBoard', 'deleteCard'
+))
+
+# Largest page the actions endpoint returns
+PAGE_SIZE = 1000
+
+_lock = threading.Lock()
+
+
+def action_row(action):
+    """Compact row of a card-flow action, or None for actions that do not move a card."""
+    data = action.get('data') or {}
+    card = (data.get('card') or {}).get('id')
+    if not card:
+        return None
+    kind = action.get('type')
+    list_id = (data.get('list') or {}).get('id')
+    before = after = closed = None
+    if kind == 'updateCard':
+        old = data.get('old') or {}
+        if 'idList' in old or data.get('listAfter'):
+            before = (data.get('listBefore') or {}).get('id') or old.get('idList')
+            after = (data.get('listAfter') or {}).get('id') or data['card'].get('idList')
+        elif 'closed' in old:
+            before = after = list_id
+            closed = bool(data['card'].get('closed'))
+        else:
+            return None
+    elif kind in ('deleteCard', 'moveCardFromBoard'):
+        before = list_id
+    else:
+        # Created, copied, converted from a checklist item or moved in from another board
+        after = list_id
+    return [action['id'], action.get('date'), kind, card, before, after, closed]
+
+
+class ActionStore:
+    """Card-flow actions of one board, appended as they are synced."""
+
+    def __init__(self, board_id, path=None):
+        self.board_id = board_id
+        self.path = path or cache_path('trello', 'actions', f"{board_id}.jsonl")
+        self.rows = []
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                lines = f.read().split('\n')
+        except OSError:
+            return
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            header = None
+        if not header or header.get('version') != STORE_VERSION or header.get('fields') != list(FIELDS):
+            return
+
+        intact = lines[-1] == ''
+        for line in lines[1:]:
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # Torn append (crash mid-write): drop it and resync from the last good row
+                intact = False
+                continue
+            # Ids grow with time, so anything not newer is a duplicate from a concurrent sync
+            if self.rows and row[0] <= self.rows[-1][0]:
+                continue
+            self.rows.append(row)
+        if not intact:
+            self._rewrite()
+
+    def _rewrite(self):
+        atomic_write(self.path, self._header() + ''.join(json.dumps(row) + '\n' for row in self.rows))
+
+    @staticmethod
+    def _header():
+        return json.dumps({'version': STORE_VERSION, 'fields': list(FIELDS)}) + '\n'
+
+    def append(self, rows):
+        """Persist rows newer than the stored ones (in id order)."""
+        rows = [row for row in rows if not self.rows or row[0] > self.rows[-1][0]]
+        if not rows:
+            return 0
+        if not os.path.exists(self.path):
+            self.rows.extend(rows)
+            self._rewrite()
+            return len(rows)
+        with open(self.path, 'a') as f:
+            f.write(''.join(json.dumps(row) + '\n' for row in rows))
+            f.flush()
+            os.fsync(f.fileno())
+        self.rows.extend(rows)
+        return len(rows)
+
+    @property
+    def newest(self):
+        """Id of the newest stored action (the `since` cursor), or None before the first sync."""
+        return self.rows[-1][0] if self.rows else None
+
+    def sync(self, fetch):
+        """Fetch the actions newer than the stored ones; returns how many rows were added.
+
+        `fetch(endpoint, params)` returns a page of actions or None on errors.
+        Pages arrive newest first, so nothing is written until the last page is
+        in: an interrupted sync never leaves a gap behind the cursor.
+        """
+        with _lock:
+            newest = self.newest
+            params = {'filter': ACTION_FILTER, 'limit': PAGE_SIZE}
+            if newest:
+                params['since'] = newest
+            deadline = current_deadline()
+            actions = []
+            while True:
+                if deadline is not None:
+                    deadline.check()
+                page = fetch(f"boards/{self.board_id}/actions", params)
+                if page is None:
+                    raise RuntimeError(f"failed to fetch actions of board {self.board_id}")
+                actions.extend(page)
+                if len(page) < PAGE_SIZE:
+                    break
+                params['before'] = min(action['id'] for action in page)
+
+            rows = sorted(row for row in map(action_row, actions) if row)
+            return self.append(rows)
+
+    def __len__(self):
+        return len(self.rows)
@@ -0,0 +1,283 @@
+"""
+Vectorized statistics over fetched issue histories and Trello card flow.
+
+Records are loaded once into NumPy columns: timestamps as int64 epoch
+seconds (MISSING when absent) and repeated strings (repositories, logins,
+labels, cards, lists) as integer codes into a vocabulary. Ages, close rates,
+response times, label counts, list dwell times, throughput and WIP over
+tens of thousands of records are then a handful of array operations
+instead of loops over dicts.
+
+NumPy is optional for the rest of fetcher; the analytics commands need it
+(pip install numpy).
+
+Usage:
+    columns = IssueColumns.build(issues, comments)
+    for repo, kind, stats in issue_report(columns, now=time.time()):
+        ...
+
+    flow = CardFlow.build(ActionStore(board_id).rows, now=time.time())
+    report = flow_report(flow, since=time.time() - 30 * DAY, done=flow.lists.codes[done_list_id])
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Epoch value of a missing timestamp
+MISSING = -1
+
+DAY = 86400.0
+WEEK = 7 * DAY
+
+
+def require_numpy():
+    """Raise a helpful error when NumPy is not installed."""
+    if np is None:
+        raise RuntimeError("analytics needs NumPy: pip install numpy")
+
+
+def epoch_seconds(values):
+    """int64 epoch seconds of ISO-8601 timestamps (None/empty -> MISSING)."""
+    # datetime64 parses the ISO text itself; the UTC 'Z' suffix is cut off first
+    stamps = np.array([value[:19] if value else 'NaT' for value in values], dtype='datetime64[s]')
+    seconds = stamps.astype(np.int64)
+    seconds[np.isnat(stamps)] = MISSING
+    return seconds
+
+
+class Vocabulary:
+    """Maps repeated strings to dense integer codes."""
+
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+
+    def code(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def encode(self, names):
+        return np.fromiter((self.code(name) for name in names), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class IssueColumns:
+    """Issues (and pull requests) of many repositories as parallel arrays."""
+
+    __slots__ = ('repo', 'number', 'is_pr', 'closed', 'author', 'created', 'closed_at',
+                 'first_response', 'label_row', 'label', 'repos', 'authors', 'labels')
+
+    @classmethod
+    def build(cls, issues, comments=()):
+        """Load Issue records and (repo, number, login, created_at) comment tuples."""
+        require_numpy()
+        issues = list(issues)
+        self = cls()
+        self.repos, self.authors, self.labels = Vocabulary(), Vocabulary(), Vocabulary()
+        self.repo = self.repos.encode(issue.repo for issue in issues)
+        self.number = np.fromiter((issue.number for issue in issues), dtype=np.int64, count=len(issues))
+        self.is_pr = np.fromiter((issue.is_pull_request for issue in issues), dtype=bool, count=len(issues))
+        self.closed = np.fromiter((issue.state == 'closed' for issue in issues), dtype=bool, count=len(issues))
+        self.author = self.authors.encode(issue.user for issue in issues)
+        self.created = epoch_seconds([issue.created_at for issue in issues])
+        self.closed_at = epoch_seconds([issue.closed_at for issue in issues])
+
+        # Label membership as (row, label) pairs, so counts are one bincount
+        pairs = [(row, label) for row, issue in enumerate(issues) for label in issue.labels or ()]
+        self.label_row = np.fromiter((row for row, _ in pairs), dtype=np.int64, count=len(pairs))
+        self.label = self.labels.encode(label for _, label in pairs)
+
+        self.first_response = np.full(len(issues), MISSING, dtype=np.int64)
+        rows = {(issue.repo, issue.number): row for row, issue in enumerate(issues)}
+        comments = [(rows.get((repo, number)), login, created) for repo, number, login, created in comments]
+        comments = [comment for comment in comments if comment[0] is not None]
+        if comments:
+            row = np.fromiter((row for row, _, _ in comments), dtype=np.int64, count=len(comments))
+            author = self.authors.encode(login for _, login, _ in comments)
+            created = epoch_seconds([created for _, _, created in comments])
+            # A response is the earliest comment by someone other than the issue author
+            others = (author != self.author[row]) & (created != MISSING)
+            first = np.full(len(issues), np.iinfo(np.int64).max, dtype=np.int64)
+            np.minimum.at(first, row[others], created[others])
+            responded = first != np.iinfo(np.int64).max
+            self.first_response[responded] = first[responded]
+        return self
+
+    def __len__(self):
+        return len(self.number)
+
+
+def summarize(seconds):
+    """Count, median, p90 and mean (in days) of a duration array."""
+    if not len(seconds):
+        return {'count': 0, 'median_days': None, 'p90_days': None, 'mean_days': None}
+    median, p90 = np.percentile(seconds, [50, 90]) / DAY
+    return {
+        'count': int(len(seconds)),
+        'median_days': round(float(median), 2),
+        'p90_days': round(float(p90), 2),
+        'mean_days': round(float(seconds.mean()) / DAY, 2)
+    }
+
+
+def issue_stats(columns, mask, now, since=None, top_labels=5):
+    """Statistics of the issues selected by a boolean mask.
+
+    With `since` (epoch seconds), open issues count whatever their age but
+    closed issues only when they were closed after it. Response times only
+    count issues created after `since`, because comments older than the
+    fetched window are not loaded.
+    """
+    if since:
+        mask = mask & (~columns.closed | (columns.closed_at >= since))
+    total = int(mask.sum())
+    closed = mask & columns.closed
+    open_ = mask & ~columns.closed
+    closed_known = closed & (columns.closed_at != MISSING) & (columns.created != MISSING)
+    window = mask & (columns.created != MISSING)
+    if since:
+        window &= columns.created >= since
+    responded = window & (columns.first_response != MISSING)
+
+    label_counts = np.bincount(columns.label[mask[columns.label_row]], minlength=len(columns.labels))
+    top = np.argsort(label_counts)[::-1][:top_labels]
+    return {
+        'total': total,
+        'open': int(open_.sum()),
+        'closed': int(closed.sum()),
+        'close_rate': round(float(closed.sum()) / total, 3) if total else None,
+        'open_age': summarize(now - columns.created[open_ & (columns.created != MISSING)]),
+        'time_to_close': summarize(columns.closed_at[closed_known] - columns.created[closed_known]),
+        'first_response': summarize(columns.first_response[responded] - columns.created[responded]),
+        'response_rate': round(float(responded.sum() / window.sum()), 3) if window.any() else None,
+        'labels': {columns.labels.names[i]: int(label_counts[i]) for i in top if label_counts[i]}
+    }
+
+
+def issue_report(columns, now, since=None):
+    """Yield (repo or '*', 'issues'|'pulls', stats) for every repository and for all together."""
+    groups = [('*', np.ones(len(columns), dtype=bool))] if len(columns.repos) > 1 else []
+    groups += [(name, columns.repo == code) for name, code in columns.repos.codes.items()]
+    for name, selected in groups:
+        for kind, kind_mask in (('issues', ~columns.is_pr), ('pulls', columns.is_pr)):
+            mask = selected & kind_mask
+            if mask.any():
+                yield name, kind, issue_stats(columns, mask, now, since)
+
+
+class CardFlow:
+    """Visits of Trello cards to lists, from action store rows (see action_store).
+
+    Every row starts a visit to the list the card is in afterwards; the visit
+    ends at the card's next row, or is still open at `now`. Archived cards and
+    cards that left the board are in no list (MISSING).
+    """
+
+    __slots__ = ('card', 'list', 'start', 'end', 'open', 'now', 'cards', 'lists')
+
+    @classmethod
+    def build(cls, rows, now):
+        require_numpy()
+        rows = list(rows)
+        self = cls()
+        self.now = int(now)
+        self.cards, self.lists = Vocabulary(), Vocabulary()
+        card = self.cards.encode(row[3] for row in rows)
+        start = epoch_seconds([row[1] for row in rows])
+        where = np.fromiter(
+            (self.lists.code(row[5]) if row[5] is not None and row[6] is not True else MISSING for row in rows),
+            dtype=np.int32, count=len(rows)
+        )
+
+        # Rows come in action order; a stable sort by card keeps each card's rows in time order
+        order = np.lexsort((start, card))
+        card, start, where = card[order], start[order], where[order]
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = card[1:] != card[:-1]
+        end = np.empty_like(start)
+        end[:-1] = start[1:]
+        end[last] = self.now
+
+        visit = (where != MISSING) & (start != MISSING)
+        self.card, self.list, self.start, self.end = card[visit], where[visit], start[visit], end[visit]
+        self.open = last[visit]
+        return self
+
+    def __len__(self):
+        return len(self.card)
+
+
+def list_stats(flow, since):
+    """Per list code: WIP now, average WIP, completed visit dwell times and open visit ages."""
+    lists = len(flow.lists)
+    now = flow.now
+    wip = np.bincount(flow.list[flow.open], minlength=lists)
+    # Average WIP over the window is the card-time spent in the list divided by its length
+    overlap = np.clip(flow.end, since, now) - np.clip(flow.start, since, now)
+    average = np.bincount(flow.list, weights=overlap, minlength=lists) / max(now - since, 1)
+    left = ~flow.open & (flow.end >= since)
+    dwell = flow.end - flow.start
+
+    stats = {}
+    for code in range(lists):
+        in_list = flow.list == code
+        stats[code] = {
+            'wip': int(wip[code]),
+            'average_wip': round(float(average[code]), 2),
+            'dwell': summarize(dwell[in_list & left]),
+            'age': summarize(now - flow.start[in_list & flow.open])
+        }
+    return stats
+
+
+def throughput(flow, since, done):
+    """Lead, cycle and weekly throughput of cards first reaching the `done` list code after `since`.
+
+    Lead time runs from a card's first action on the board; cycle time from
+    when it first entered a list other than the one it started in.
+    """
+    never = np.iinfo(np.int64).max
+    cards = len(flow.cards)
+    created = np.full(cards, never, dtype=np.int64)
+    np.minimum.at(created, flow.card, flow.start)
+
+    # Visits are sorted by card and time, so a card's first visit is where the card changes
+    first = np.ones(len(flow), dtype=bool)
+    first[1:] = flow.card[1:] != flow.card[:-1]
+    first_list = np.full(cards, MISSING, dtype=np.int32)
+    first_list[flow.card[first]] = flow.list[first]
+    started = np.full(cards, never, dtype=np.int64)
+    moved = flow.list != first_list[flow.card]
+    np.minimum.at(started, flow.card[moved], flow.start[moved])
+
+    finished = np.full(cards, never, dtype=np.int64)
+    arrived = flow.list == done
+    np.minimum.at(finished, flow.card[arrived], flow.start[arrived])
+
+    window = (finished != never) & (finished >= since)
+    cycled = window & (started != never) & (started <= finished)
+    weeks = int(np.ceil((flow.now - since) / WEEK)) or 1
+    weekly = np.bincount(((finished[window] - since) // WEEK).astype(np.int64), minlength=weeks)[:weeks]
+    return {
+        'done': int(window.sum()),
+        'per_week': round(float(window.sum()) / ((flow.now - since) / WEEK), 2) if flow.now > since else None,
+        'weekly': [int(count) for count in weekly],
+        'lead_time': summarize(finished[window] - created[window]),
+        'cycle_time': summarize(finished[cycled] - started[cycled])
+    }
+
+
+def flow_report(flow, since, done=None):
+    """List statistics and, when a done list code is given, throughput of a CardFlow."""
+    return {
+        'cards': len(flow.cards),
+        'lists': list_stats(flow, since),
+        'throughput': throughput(flow, since, done) if done is not None else None
+    }
@@ -0,0 +1,209 @@
+"""
+HTTP record/replay for offline, deterministic plugin runs.
+
+create_session() mounts one of these transport adapters according to
+FETCHER_HTTP_MODE:
+
+    live     (default) real network
+    record   real network; every request/response pair is appended to the cassette
+    replay   no network; responses come from the cassette
+
+A cassette is JSON Lines, gzip-compressed when the name ends in .gz
+(FETCHER_CASSETTE, default <cache dir>/cassettes/fetcher.jsonl.gz). Each
+line holds the method, the URL without credential parameters, the status,
+the response headers and body, and the recorded elapsed time. Tokens in
+JSON responses (access_token, refresh_token) are redacted. Recording
+appends, so several commands can go into one cassette; delete the file to
+record from scratch.
+
+Replay matches on method + URL; repeated requests get the recorded
+responses in order, and the last one once they run out. An unrecorded
+request fails with a ConnectionError. FETCHER_REPLAY_LATENCY simulates
+upstream time: "recorded" sleeps the recorded elapsed time, a number sleeps
+that many milliseconds, 0 (default) answers at once.
+
+Usage:
+    FETCHER_HTTP_MODE=record FETCHER_CASSETTE=github.jsonl.gz python3 fetcher.py github repo owner/repo
+    FETCHER_HTTP_MODE=replay FETCHER_CASSETTE=github.jsonl.gz python3 fetcher.py github repo owner/repo
+"""
+
+import atexit
+import base64
+import gzip
+import io
+import json
+import os
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .deadline import sleep as deadline_sleep
+from .storage import cache_path
+
+# Query parameters and JSON fields never written to a cassette
+SECRET_PARAMS = {'key', 'token', 'access_token', 'client_secret', 'api_key'}
+SECRET_FIELDS = {'access_token', 'refresh_token', 'id_token'}
+# The body is stored decoded, so these no longer describe it
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'set-cookie'}
+
+
+def http_mode():
+    """live, record or replay (from FETCHER_HTTP_MODE)."""
+    mode = os.getenv('FETCHER_HTTP_MODE', 'live').lower()
+    if mode not in ('live', 'record', 'replay'):
+        raise ValueError(f"FETCHER_HTTP_MODE must be live, record or replay, not {mode!r}")
+    return mode
+
+
+def match_key(method, url):
+    """Request identity in a cassette: method plus URL without secrets, query sorted."""
+    parsed = urllib.parse.urlsplit(url)
+    query = sorted((name, value) for name, value in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+                   if name not in SECRET_PARAMS)
+    return f"{method.upper()} {urllib.parse.urlunsplit(parsed._replace(query=urllib.parse.urlencode(query)))}"
+
+
+def _redact(body):
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if not isinstance(data, dict) or not SECRET_FIELDS & data.keys():
+        return body
+    return json.dumps({key: 'REDACTED' if key in SECRET_FIELDS else value for key, value in data.items()})
+
+
+class Cassette:
+    """Request/response pairs stored in a (gzipped) JSON Lines file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._entries = None
+        self._positions = {}
+
+    def _open(self, mode):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, mode + 't', encoding='utf-8')
+        return open(self.path, mode, encoding='utf-8')
+
+    def record(self, request, response, elapsed):
+        content = response.content
+        try:
+            body = {'text': _redact(content.decode('utf-8'))}
+        except UnicodeDecodeError:
+            body = {'base64': base64.b64encode(content).decode('ascii')}
+        entry = {
+            'request': match_key(request.method, request.url),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: value for name, value in response.headers.items()
+                        if name.lower() not in DROPPED_HEADERS},
+            'elapsed_ms': round(elapsed * 1000, 1),
+            **body
+        }
+        with self._lock:
+            if self._file is None:
+                # Appending lets several commands share one cassette (gzip members concatenate)
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = self._open('a')
+                atexit.register(self.close)
+            self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def lookup(self, method, url):
+        """The next recorded entry for this request, or None."""
+        key = match_key(method, url)
+        with self._lock:
+            if self._entries is None:
+                self._entries = {}
+                if not os.path.exists(self.path):
+                    return None
+                with self._open('r') as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._entries.setdefault(entry['request'], []).append(entry)
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path=None):
+    """The process-wide Cassette for `path` (default FETCHER_CASSETTE)."""
+    path = path or os.getenv('FETCHER_CASSETTE') or cache_path('cassettes', 'fetcher.jsonl.gz')
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that appends every exchange to a cassette."""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # Reading the body here also covers streamed requests
+        response.content
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter answering from a cassette, never touching the network."""
+
+    def __init__(self, cassette, latency=None):
+        super().__init__()
+        self.cassette = cassette
+        self.latency = os.getenv('FETCHER_REPLAY_LATENCY', '0') if latency is None else str(latency)
+
+    def send(self, request, **kwargs):
+        entry = self.cassette.lookup(request.method, request.url)
+        if entry is None:
+            raise requests.ConnectionError(
+                f"Sem resposta gravada / No recorded response for {match_key(request.method, request.url)} "
+                f"in {self.cassette.path}", request=request)
+
+        delay = entry.get('elapsed_ms', 0) if self.latency == 'recorded' else float(self.latency)
+        if delay:
+            deadline_sleep(delay / 1000)
+
+        body = base64.b64decode(entry['base64']) if 'base64' in entry else entry['text'].encode('utf-8')
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,26 @@
+"""
+Context propagation for worker threads.
+
+Per-call state (metrics phase timings, and anything else kept in context
+variables) does not follow work submitted to a ThreadPoolExecutor. Wrap the
+function with bind_context() at submit time so it runs in a copy of the
+caller's context.
+
+Usage:
+    executor.submit(bind_context(self._repo_summary), repo)
+"""
+
+import contextvars
+import functools
+
+
+def bind_context(fn):
+    """Return fn wrapped to run in a copy of the current context."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        # Each call gets its own copy so concurrent calls never share one
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
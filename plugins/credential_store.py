@@ -0,0 +1,170 @@
+"""
+Shared token persistence for plugins.
+
+Plugins used to rewrite the whole .env file synchronously on every token
+refresh. The global `credentials` store keeps tokens in memory instead:
+
+- set() updates memory and os.environ at once and schedules a write;
+  writes are debounced so a burst of refreshes becomes one write, off the
+  request path.
+- A write re-reads .env under an exclusive file lock, merges the pending
+  keys into it and replaces it atomically (temp file + rename), so
+  concurrent processes never lose each other's updates.
+- get() notices when another process rewrote .env (mtime change) and picks
+  up its refreshed tokens, so a second MCP session does not re-authorize.
+
+Usage:
+    credentials.set(SPOTIFY_ACCESS_TOKEN=token, SPOTIFY_TOKEN_EXPIRY=expiry)
+    token = credentials.get('SPOTIFY_ACCESS_TOKEN')
+"""
+
+import atexit
+import contextlib
+import os
+import threading
+
+from .storage import atomic_write
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
+
+# Seconds to wait for more updates before writing them out together
+WRITE_DELAY = float(os.getenv('FETCHER_CREDENTIAL_WRITE_DELAY', '0.5'))
+
+
+def _parse_line(line):
+    """Return (key, value) for a KEY=VALUE line, or None."""
+    stripped = line.strip()
+    if not stripped or stripped.startswith('#') or '=' not in stripped:
+        return None
+    key, value = stripped.split('=', 1)
+    key = key.strip()
+    if key.startswith('export '):
+        key = key[len('export '):].strip()
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        value = value[1:-1]
+    return key, value
+
+
+class CredentialStore:
+    """In-memory tokens backed by a .env file shared between processes."""
+
+    def __init__(self, path=ENV_PATH, delay=WRITE_DELAY):
+        self.path = path
+        self.delay = delay
+        self._values = {}
+        self._pending = {}
+        self._mtime = None
+        self._timer = None
+        self._lock = threading.RLock()
+        # Serializes writes, so an older snapshot never lands after a newer one
+        self._write_lock = threading.Lock()
+        self._reload()
+        atexit.register(self.flush)
+
+    def _stat_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self):
+        """Return the .env lines, or [] if it does not exist."""
+        try:
+            with open(self.path) as f:
+                return f.readlines()
+        except FileNotFoundError:
+            return []
+
+    def _reload(self):
+        """Load values from disk, keeping updates not yet written."""
+        self._mtime = self._stat_mtime()
+        values = {}
+        for line in self._read():
+            parsed = _parse_line(line)
+            if parsed:
+                values[parsed[0]] = parsed[1]
+        values.update(self._pending)
+        self._values = values
+
+    def get(self, key, default=None):
+        """Return the freshest known value of `key`.
+
+        Falls back to the process environment for values that are not in
+        the file (e.g. exported in the shell).
+        """
+        with self._lock:
+            if self._stat_mtime() != self._mtime:
+                self._reload()
+            value = self._values.get(key)
+        if value is None:
+            return os.getenv(key, default)
+        return value
+
+    def set(self, **values):
+        """Update tokens in memory now and persist them shortly after."""
+        values = {key: str(value) for key, value in values.items() if value is not None}
+        with self._lock:
+            self._values.update(values)
+            self._pending.update(values)
+            os.environ.update(values)
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process writing this file."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def flush(self):
+        """Write pending updates to disk now.
+
+        Only the snapshot of pending updates is taken under the in-process
+        lock, so get() and set() never wait for the file lock or the write.
+        The written keys stay pending until the write succeeds, so a failed
+        write loses nothing and is retried by the next flush.
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._pending:
+                    return
+                pending = dict(self._pending)
+
+            with self._file_lock():
+                # Merge into the current file so other processes' keys survive
+                lines = self._read()
+                remaining = dict(pending)
+                for i, line in enumerate(lines):
+                    parsed = _parse_line(line)
+                    if parsed and parsed[0] in remaining:
+                        lines[i] = f"{parsed[0]}={remaining.pop(parsed[0])}\n"
+                if lines and not lines[-1].endswith('\n'):
+                    lines[-1] += '\n'
+                lines.extend(f"{key}={value}\n" for key, value in remaining.items())
+                atomic_write(self.path, ''.join(lines))
+
+            with self._lock:
+                for key, value in pending.items():
+                    if self._pending.get(key) == value:
+                        del self._pending[key]
+                self._reload()
+
+credentials = CredentialStore()
@@ -0,0 +1,143 @@
+"""
+Per-call deadlines and cancellation.
+
+A Deadline is installed in a context variable for the duration of a call
+(MCP tools/call, a run_many entry) and follows the work into worker threads
+through bind_context. The shared HTTP session reads it to derive connect and
+read timeouts for every request, and refuses to start new requests once the
+call is cancelled or out of time. Cancelling closes the responses being read
+so their pooled connections are released right away.
+
+Usage:
+    with deadline_scope(Deadline(timeout=30)) as deadline:
+        plugin.run(command, *args)
+    # elsewhere: deadline.cancel("client cancelled")
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+
+_current = contextvars.ContextVar('fetcher_deadline', default=None)
+
+
+class CallCancelled(Exception):
+    """The call was cancelled before it finished."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call ran out of time."""
+
+
+class Deadline:
+    """Expiry time plus a cancellation flag shared by everything a call does."""
+
+    def __init__(self, timeout=None, expires_at=None, parent=None):
+        expiries = [value for value in (
+            time.monotonic() + timeout if timeout else None,
+            expires_at,
+            parent.expires_at if parent else None
+        ) if value is not None]
+        self.expires_at = min(expiries) if expiries else None
+        self.reason = None
+        self._cancelled = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._parent = parent
+        self._parent_callback = None
+        if parent is not None:
+            self._parent_callback = lambda: self.cancel(parent.reason)
+            parent.on_cancel(self._parent_callback)
+
+    @classmethod
+    def at(cls, epoch_seconds, parent=None):
+        """Deadline from a wall-clock (Unix epoch) time."""
+        return cls(expires_at=time.monotonic() + (epoch_seconds - time.time()), parent=parent)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self):
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def remaining(self):
+        """Seconds left, or None when there is no expiry."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self):
+        """Raise if the call was cancelled or is out of time."""
+        if self.cancelled:
+            raise CallCancelled(self.reason or "cancelled")
+        if self.expired:
+            raise DeadlineExceeded("deadline exceeded")
+
+    def on_cancel(self, callback):
+        """Run callback when the call is cancelled (at once if it already was)."""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def detach(self):
+        """Stop following the parent's cancellation (once the call has finished)."""
+        if self._parent is not None:
+            self._parent.remove_callback(self._parent_callback)
+            self._parent = self._parent_callback = None
+
+    def cancel(self, reason="cancelled"):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.reason = reason
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def sleep(self, seconds):
+        """Sleep, waking early (and raising) on cancellation or expiry."""
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            self._cancelled.wait(remaining)
+            self.check()
+            raise DeadlineExceeded("deadline exceeded")
+        self._cancelled.wait(seconds)
+        self.check()
+
+
+def current_deadline():
+    """The active call's Deadline, or None."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def deadline_scope(deadline):
+    """Make `deadline` the active deadline inside the block."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def sleep(seconds):
+    """time.sleep that honours the active deadline."""
+    deadline = current_deadline()
+    if deadline is None:
+        time.sleep(seconds)
+    else:
+        deadline.sleep(seconds)
@@ -0,0 +1,131 @@
+"""
+Registry of upstream base URLs with per-endpoint connection settings.
+
+Plugins build their request URLs from `endpoints.url(name)` instead of
+hardcoding hosts, so a deployment can point them at GitHub Enterprise, a
+caching reverse proxy or a local mock. Each endpoint also carries optional
+connection pool and timeout settings, applied by create_session() to every
+request under its base URL.
+
+Settings, highest priority first:
+
+    FETCHER_ENDPOINT_<NAME>_URL / _POOL_MAXSIZE / _CONNECT_TIMEOUT / _READ_TIMEOUT
+    legacy URL variables (GITHUB_API_URL, TRELLO_BASE_URL, SPOTIFY_BASE_URL, SPOTIFY_ACCOUNTS_URL)
+    FETCHER_ENDPOINTS_FILE, a JSON object such as
+        {"github": {"url": "https://ghe.example.com/api/v3", "pool_maxsize": 32, "read_timeout": 10}}
+    the defaults below
+
+Usage:
+    self.api_url = endpoints.url('github')
+    self.session = create_session('github', endpoints=('github',))
+"""
+
+import json
+import os
+import threading
+
+from dotenv import load_dotenv
+
+DEFAULT_URLS = {
+    'github': 'https://api.github.com',
+    'trello': 'https://api.trello.com/1',
+    'spotify': 'https://api.spotify.com/v1',
+    'spotify_accounts': 'https://accounts.spotify.com',
+    'spotify_web': 'https://open.spotify.com',
+    'spotify_clienttoken': 'https://clienttoken.spotify.com/v1',
+    'spotify_spclient': 'https://spclient.wg.spotify.com',
+    'linkedin': 'https://api.linkedin.com/v2',
+    'linkedin_oauth': 'https://www.linkedin.com/oauth/v2',
+    'linkedinweb': 'https://www.linkedin.com'
+}
+
+# Variables that configured base URLs before the registry existed
+LEGACY_URL_VARS = {
+    'github': 'GITHUB_API_URL',
+    'trello': 'TRELLO_BASE_URL',
+    'spotify': 'SPOTIFY_BASE_URL',
+    'spotify_accounts': 'SPOTIFY_ACCOUNTS_URL'
+}
+
+SETTINGS = {'pool_maxsize': int, 'connect_timeout': float, 'read_timeout': float}
+
+
+class Endpoint:
+    """Base URL of an upstream plus its connection settings (None = session default)."""
+
+    __slots__ = ('name', 'url', 'pool_maxsize', 'connect_timeout', 'read_timeout')
+
+    def __init__(self, name, url, pool_maxsize=None, connect_timeout=None, read_timeout=None):
+        self.name = name
+        self.url = url.rstrip('/')
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    def __repr__(self):
+        return f"Endpoint({self.name!r}, {self.url!r})"
+
+
+class EndpointRegistry:
+    """Named endpoints, resolved once from defaults, the JSON file and the environment."""
+
+    def __init__(self, defaults=DEFAULT_URLS):
+        self._defaults = dict(defaults)
+        self._endpoints = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Plugins that never load .env themselves still get its endpoint settings
+        load_dotenv()
+        configured = {}
+        path = os.getenv('FETCHER_ENDPOINTS_FILE')
+        if path:
+            with open(path) as f:
+                configured = json.load(f)
+
+        endpoints = {}
+        for name in set(self._defaults) | set(configured):
+            settings = dict(configured.get(name, {}))
+            prefix = f"FETCHER_ENDPOINT_{name.upper()}_"
+            url = (os.getenv(prefix + 'URL') or os.getenv(LEGACY_URL_VARS.get(name, ''))
+                   or settings.pop('url', None) or self._defaults.get(name))
+            settings.pop('url', None)
+            if not url:
+                raise ValueError(f"Endpoint {name!r} has no url")
+            for setting, convert in SETTINGS.items():
+                value = os.getenv(prefix + setting.upper(), settings.get(setting))
+                settings[setting] = convert(value) if value not in (None, '') else None
+            endpoints[name] = Endpoint(name, url, **settings)
+        return endpoints
+
+    def _all(self):
+        if self._endpoints is None:
+            with self._lock:
+                if self._endpoints is None:
+                    self._endpoints = self._load()
+        return self._endpoints
+
+    def get(self, name):
+        try:
+            return self._all()[name]
+        except KeyError:
+            raise KeyError(f"Unknown endpoint {name!r}") from None
+
+    def url(self, name, path=''):
+        """Base URL of an endpoint, optionally joined with a path."""
+        base = self.get(name).url
+        return f"{base}/{path.lstrip('/')}" if path else base
+
+    def for_url(self, url):
+        """The endpoint whose base URL is the longest prefix of `url`, or None."""
+        matches = [endpoint for endpoint in self._all().values()
+                   if url == endpoint.url or url.startswith(endpoint.url + '/')]
+        return max(matches, key=lambda endpoint: len(endpoint.url), default=None)
+
+    def reload(self):
+        """Re-read the configuration (after changing the environment)."""
+        with self._lock:
+            self._endpoints = None
+
+
+endpoints = EndpointRegistry()
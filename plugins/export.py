@@ -0,0 +1,175 @@
+"""
+Columnar export of plugin result sets.
+
+Writes paginated results straight to Parquet or Arrow IPC files when pyarrow
+is installed, and to CSV otherwise. Rows are written batch by batch as pages
+arrive, so an export never has to hold the whole result set in memory.
+
+Usage:
+    with ResultExporter("issues.parquet") as exporter:
+        for page in plugin.fetch_pages("repos/owner/repo/issues"):
+            exporter.write_batch(Issue.from_api(item) for item in page)
+"""
+
+import csv
+import os
+
+from .records import Record
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+FORMATS = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+    '.csv': 'csv'
+}
+
+# Fields that hold nested records and do not fit a flat column layout
+NESTED_FIELDS = ('tracks',)
+
+
+def _row(item):
+    """Convert a record or dict into a flat row dict."""
+    if isinstance(item, Record):
+        return {name: getattr(item, name) for name in item.__slots__ if name not in NESTED_FIELDS}
+    return {key: value for key, value in item.items() if key not in NESTED_FIELDS}
+
+
+def _arrow_type(values):
+    """Infer an Arrow type from the first non-null Python value of a column."""
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return pa.bool_()
+        if isinstance(value, int):
+            return pa.int64()
+        if isinstance(value, float):
+            return pa.float64()
+        if isinstance(value, (tuple, list)):
+            return pa.list_(pa.string())
+        return pa.string()
+    return pa.string()
+
+
+class ResultExporter:
+    """Stream batches of rows into a Parquet, Arrow IPC or CSV file."""
+
+    def __init__(self, path, file_format=None):
+        extension = os.path.splitext(path)[1].lower()
+        self.format = file_format or FORMATS.get(extension, 'csv')
+
+        if self.format in ('parquet', 'arrow') and pa is None:
+            print(f"⚠️ pyarrow not installed, exporting {self.format} as CSV instead")
+            self.format = 'csv'
+            path = os.path.splitext(path)[0] + '.csv'
+
+        self.path = path
+        self.rows_written = 0
+        self._columns = None
+        self._schema = None
+        self._writer = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write_batch(self, items):
+        """Write one batch (typically one API page) of records or dicts."""
+        rows = [_row(item) for item in items]
+        if not rows:
+            return 0
+
+        if self._columns is None:
+            self._columns = list(rows[0].keys())
+
+        if self.format == 'csv':
+            self._write_csv(rows)
+        else:
+            self._write_arrow(rows)
+
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def _write_csv(self, rows):
+        if self._writer is None:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=self._columns, extrasaction='ignore')
+            self._writer.writeheader()
+
+        for row in rows:
+            self._writer.writerow({
+                key: ';'.join(value) if isinstance(value, (tuple, list)) else value
+                for key, value in row.items()
+            })
+        self._file.flush()
+
+    def _write_arrow(self, rows):
+        if self._schema is None:
+            self._schema = pa.schema([
+                (column, _arrow_type(row.get(column) for row in rows))
+                for column in self._columns
+            ])
+            if self.format == 'parquet':
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._file = pa.OSFile(self.path, 'wb')
+                self._writer = pa_ipc.new_file(self._file, self._schema)
+
+        arrays = [
+            pa.array(
+                [list(value) if isinstance(value, tuple) else value
+                 for value in (row.get(field.name) for row in rows)],
+                type=field.type
+            )
+            for field in self._schema
+        ]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+
+        if self.format == 'parquet':
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self):
+        """Finish the file."""
+        if self._writer is not None and self.format != 'csv':
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        self._writer = None
+        self._file = None
+
+
+def export_pages(pages, path, build=None, file_format=None):
+    """Export an iterable of pages, converting each item with `build` if given.
+
+    Returns the exporter so callers can report `path` and `rows_written`.
+    When fetching a page fails the rows written so far are moved to
+    `<path>.partial`, so `path` never holds a truncated export, and the
+    error is raised again.
+    """
+    exporter = ResultExporter(path, file_format)
+    try:
+        with exporter:
+            for page in pages:
+                items = (build(item) for item in page) if build else page
+                written = exporter.write_batch(items)
+                print(f"  📦 {exporter.rows_written} rows written (+{written})")
+    except Exception:
+        if os.path.exists(exporter.path):
+            partial = exporter.path + '.partial'
+            os.replace(exporter.path, partial)
+            print(f"⚠️ Export incomplete, {exporter.rows_written} rows kept in {partial}")
+        raise
+    return exporter
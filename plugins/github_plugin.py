@@ -9,22 +9,182 @@ Commands:
     search - Search for repositories
     test - Test GitHub plugin
     me - Show authenticated user information
+    export - Export issues or repositories to Parquet/Arrow/CSV
+    fanout - Fetch issue summaries from many repositories concurrently
+    org - List every repository of an organization
+    watch - Stream issue and event changes of repositories (conditional polling)
+    limits - Show the rate limit budget of every pooled token per resource
+    analytics - Issue/PR statistics across repositories (needs NumPy)
 """
 
-import json
+import email.utils
 import os
+import re
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
-
+from . import analytics
+from .context import bind_context
+from .endpoints import endpoints
+from .export import export_pages
+from .http_session import create_session
+from .metrics import registry
 from .plugin_interface import PluginInterface
+from .records import Issue, Repo
+from .repo_index import RepoIndex
+from .search_index import comment_doc, get_index, index_pages, issue_doc
+from .swr_cache import swr
+from .token_pool import BULK, pool_from_env, priority
+from .watch import Watcher, change_printer
+
+
+# Concurrent requests used by fan-out commands (also the connection pool size)
+FANOUT_WORKERS = int(os.getenv('GITHUB_FANOUT_WORKERS', '8'))
+
+# Requests of each rate limit window that bulk commands leave to interactive ones
+RATE_LIMIT_RESERVE = 10
+
+# Seconds a repository index entry answers `repo` lookups without refetching
+REPO_INDEX_TTL = int(os.getenv('GITHUB_REPO_INDEX_TTL', '3600'))
+
+# Event types whose changes are reported through the issue diff instead
+ISSUE_EVENTS = {'IssuesEvent', 'IssueCommentEvent'}
+
+_SEARCH_TERM = re.compile(r'-?\w*:?"[^"]*"|\S+')
+
+
+def normalize_search_query(query):
+    """Canonical form of a search query, so equivalent queries share one cache entry.
+
+    Whitespace and case are folded (quoted phrases keep their case) and the
+    terms are sorted; queries with AND/OR/NOT keep their order.
+    """
+    terms = _SEARCH_TERM.findall(query.strip())
+    if any(term in ('AND', 'OR', 'NOT') for term in terms):
+        return " ".join(terms)
+    return " ".join(sorted(term if '"' in term else term.lower() for term in terms))
+
+
+class RepoWatch:
+    """Watch source for one repository: events and issues polled with ETags.
+
+    The events feed is requested with If-None-Match, so an idle repository
+    costs a 304 that does not count against the rate limit. Issues are only
+    fetched (with since=) when an issue event arrived, and are diffed against
+    the last seen state.
+    """
+
+    source = 'github'
+
+    def __init__(self, plugin, repo):
+        self.plugin = plugin
+        self.repo = repo
+        self.name = repo
+        self.min_interval = 0
+        self._etags = {}
+        self._last_event_id = None
+        self._since = None
+        self._started = None
+        self._issues = {}
+
+    def _conditional_get(self, endpoint, params=None):
+        """GET with the stored ETag; returns None on 304 Not Modified."""
+        url = f"{self.plugin.api_url}/{endpoint}"
+        key = (url, tuple(sorted((params or {}).items())))
+        headers = dict(self.plugin.headers)
+        if key in self._etags:
+            headers['If-None-Match'] = self._etags[key]
+        response = self.plugin.session.get(url, params=params, headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        if response.headers.get('ETag'):
+            self._etags[key] = response.headers['ETag']
+        return response
+
+    def _change(self, kind, summary, **extra):
+        return dict({'source': 'github', 'target': self.repo, 'kind': kind, 'summary': summary}, **extra)
+
+    def poll(self):
+        response = self._conditional_get(f"repos/{self.repo}/events", {'per_page': 100})
+        if response is None:
+            return []
+        self.min_interval = int(response.headers.get('X-Poll-Interval', 0))
+        events = response.json()
+        newest = max((int(event['id']) for event in events), default=self._last_event_id)
+
+        if self._started is None:
+            # Baseline: issues updated from now on are reported
+            date = response.headers.get('Date')
+            stamp = email.utils.parsedate_to_datetime(date) if date else None
+            self._started = self._since = (
+                stamp.strftime('%Y-%m-%dT%H:%M:%SZ') if stamp else time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            )
+            self._last_event_id = newest
+            return []
+
+        last = self._last_event_id or 0
+        new = sorted((event for event in events if int(event['id']) > last), key=lambda event: int(event['id']))
+        self._last_event_id = newest
+
+        changes = []
+        for event in new:
+            if event['type'] in ISSUE_EVENTS:
+                continue
+            payload = event.get('payload') or {}
+            detail = payload.get('action') or payload.get('ref') or ''
+            actor = (event.get('actor') or {}).get('login')
+            changes.append(self._change('event', f"{event['type']} {detail} by {actor}".replace('  ', ' '),
+                                        id=event['id'], at=event.get('created_at')))
+        if any(event['type'] in ISSUE_EVENTS for event in new):
+            changes.extend(self._issue_changes())
+        return changes
+
+    def _issue_changes(self):
+        """Diff the issues updated since the last poll against their last seen state."""
+        changes = []
+        issues = []
+        for page in self.plugin.fetch_pages(f"repos/{self.repo}/issues",
+                                            {'state': 'all', 'since': self._since, 'sort': 'updated', 'direction': 'asc'}):
+            issues.extend(Issue.from_api(item, repo=self.repo) for item in page)
+
+        for issue in issues:
+            snapshot = {'state': issue.state, 'title': issue.title, 'comments': issue.comments,
+                        'labels': issue.labels, 'assignee': issue.assignee, 'updated_at': issue.updated_at}
+            previous = self._issues.get(issue.number)
+            self._issues[issue.number] = snapshot
+            if previous == snapshot:
+                continue
+            extra = {'id': issue.number, 'url': issue.html_url, 'at': issue.updated_at}
+            if previous is not None:
+                diffs = [f"{field} {previous[field]!r} → {snapshot[field]!r}"
+                         for field in ('state', 'title', 'comments', 'labels', 'assignee')
+                         if previous[field] != snapshot[field]]
+                if diffs:
+                    changes.append(self._change('issue_changed', f"#{issue.number} " + ", ".join(diffs), **extra))
+            elif (issue.created_at or '') >= self._started:
+                changes.append(self._change('issue_opened', f"#{issue.number} opened by {issue.user}: {issue.title}", **extra))
+            else:
+                changes.append(self._change('issue_updated', f"#{issue.number} updated: {issue.title}", **extra))
+            self._since = max(self._since, issue.updated_at or self._since)
+
+        if issues:
+            get_index().add(issue_doc(issue) for issue in issues)
+        return changes
 
 
 class Plugin(PluginInterface):
     def __init__(self):
-        self.api_url = "https://api.github.com"
+        self.api_url = endpoints.url('github')
         self.headers = {}
-        if 'GITHUB_TOKEN' in os.environ:
-            self.headers['Authorization'] = f'token {os.environ["GITHUB_TOKEN"]}'
+        
+        # Pooled connections shared by every request, sized for fan-out workers
+        self.session = create_session('github', pool_maxsize=FANOUT_WORKERS, endpoints=('github',))
+        # Every request is authorized by the token with the most rate limit headroom
+        self.tokens = pool_from_env(self.session, self.api_url, reserve=RATE_LIMIT_RESERVE)
+        self.session.auth = self.tokens
+        self._repo_index = None
         self._commands = {
             "test": "Run basic plugin tests",
             "list": "List repositories for a user: list [username]",
@@ -32,48 +192,145 @@ class Plugin(PluginInterface):
             "fetch": "Fetch data from a specific endpoint: fetch [endpoint]",
             "me": "Show authenticated user information",
             "repo": "Get repository information: repo [owner/repo]",
-            "issues": "List repository issues: issues [owner/repo]",
+            "issues": "List repository issues: issues [owner/repo] [state] [--with-comments]",
             "issue": "Get specific issue details: issue [owner/repo] [issue_number]",
-            "create_issue": "Create new issue: create_issue [owner/repo] [title] [body]"
+            "create_issue": "Create new issue: create_issue [owner/repo] [title] [body]",
+            "export": "Export to Parquet/Arrow/CSV: export [issues|repos] [owner/repo|username] [path] [state]",
+            "fanout": "Issue summaries across repositories: fanout [owner/repo,...|org:name|@file] [state] [limit]",
+            "org": "List every repository of an organization: org [org_name]",
+            "watch": "Stream issue/event changes: watch [owner/repo,...|org:name|@file] [seconds] [text|json]",
+            "limits": "Show rate limit budgets per token and resource (core, search, graphql)",
+            "analytics": "Issue/PR age, close rate, response time, labels: analytics [owner/repo,...|org:name|@file] [days]"
         }
 
+    @property
+    def repo_index(self):
+        """Repository index, loaded from disk on first use."""
+        if self._repo_index is None:
+            self._repo_index = RepoIndex(ttl=REPO_INDEX_TTL)
+        return self._repo_index
+
     def list_commands(self):
         """List all available plugin commands."""
         print("Available commands:")
         for cmd, desc in self._commands.items():
             print(f"  - {cmd}: {desc}")
 
-    def fetch(self, endpoint, params=None):
-        url = f"{self.api_url}/{endpoint}"
-        response = requests.get(url, params=params, headers=self.headers)
+    def _get(self, url, params=None):
+        """Make a GET request, returning the response or None on error."""
+        response = self.session.get(url, params=params, headers=self.headers)
         
         if response.status_code == 200:
-            return json.loads(response.text)
+            return response
         else:
             print(f"Error fetching data from {url}: {response.status_code}")
             if response.status_code == 401:
-                print("Authentication error. Please check if GITHUB_TOKEN environment variable is properly set.")
+                print("Authentication error. Please check if GITHUB_TOKEN / GITHUB_TOKENS are properly set.")
             return None
 
+    def fetch(self, endpoint, params=None):
+        response = self._get(f"{self.api_url}/{endpoint}", params)
+        if response is not None:
+            return response.json()
+        return None
+
+    def fetch_pages(self, endpoint, params=None, per_page=100):
+        """Yield every page of a paginated endpoint, following the Link header.
+
+        Raises RuntimeError when a page fails, so callers never mistake the
+        pages before it for the whole collection.
+        """
+        params = dict(params or {}, per_page=per_page)
+        url = f"{self.api_url}/{endpoint}"
+        
+        while url:
+            response = self._get(url, params)
+            if response is None:
+                raise RuntimeError(f"failed to fetch a page of {endpoint}")
+            yield response.json()
+            # The next link already carries the query string
+            url = response.links.get('next', {}).get('url')
+            params = None
+
     def list_repos(self, username):
         """List repositories for a given username."""
         repos = self.fetch(f"users/{username}/repos")
         if repos:
+            repos = [Repo.from_api(repo) for repo in repos]
+            self.repo_index.update(repos)
+            for repo in repos:
+                print(f"- {repo.name}: {repo.description}")
+            return repos
+        return None
+
+    def fetch_org_repos(self, org, per_page=100):
+        """Enumerate every repository of an organization.
+
+        The first response's Link header reveals the last page, so the
+        remaining pages are requested in parallel instead of one by one.
+        Raises RuntimeError when any of them fails rather than returning
+        (and indexing) a shortened list.
+        """
+        endpoint = f"orgs/{org}/repos"
+        first = self._get(f"{self.api_url}/{endpoint}", {"per_page": per_page, "page": 1})
+        if first is None:
+            return None
+        
+        pages = [first.json()]
+        last_url = first.links.get('last', {}).get('url')
+        if last_url:
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(last_url).query)
+            last_page = int(query.get('page', ['1'])[0])
+            with ThreadPoolExecutor(max_workers=FANOUT_WORKERS) as executor:
+                pages.extend(executor.map(
+                    bind_context(lambda page: self.fetch(endpoint, {"per_page": per_page, "page": page})),
+                    range(2, last_page + 1)
+                ))
+            failed = [number for number, page in enumerate(pages, 1) if page is None]
+            if failed:
+                raise RuntimeError(f"failed to fetch page(s) {', '.join(map(str, failed))} of {last_page} "
+                                   f"of {org} repositories")
+        
+        repos = [Repo.from_api(item) for page in pages for item in page]
+        self.repo_index.update(repos)
+        return repos
+
+    def list_org_repos(self, org):
+        """List every repository of an organization."""
+        try:
+            repos = self.fetch_org_repos(org)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return None
+        if repos:
+            print(f"\n🏢 {org}: {len(repos)} repositories")
             for repo in repos:
-                print(f"- {repo['name']}: {repo['description']}")
+                print(f"- {repo.full_name}: {repo.description}")
+            return repos
+        return None
+
+    def _search(self, query):
+        data = self.fetch("search/repositories", {"q": query})
+        if data and 'items' in data:
+            return [Repo.from_api(repo) for repo in data['items']]
+        return None
 
     def search_repos(self, query):
-        """Search GitHub repositories."""
-        repos = self.fetch("search/repositories", {"q": query})
-        if repos and 'items' in repos:
-            for repo in repos['items']:
-                print(f"- {repo['full_name']}: {repo['description']}")
+        """Search GitHub repositories (cached per normalized query)."""
+        query = normalize_search_query(query)
+        repos = swr.get('github.search', lambda: self._search(query), query)
+        if repos:
+            for repo in repos:
+                print(f"- {repo.full_name}: {repo.description}")
+            return repos
+        return None
 
     def test(self):
         """Run basic plugin tests."""
         print("Testing GitHub plugin...")
         
         print("\nTesting authentication:")
+        print(f"🔑 Tokens: {', '.join(token.name for token in self.tokens.tokens)}")
         user_data = self.get_user_info()
         
         if user_data:
@@ -87,8 +344,8 @@ class Plugin(PluginInterface):
         self.search_repos("python fetcher")
 
     def get_user_info(self):
-        """Get authenticated user information."""
-        user_data = self.fetch("user")
+        """Get authenticated user information (stale-while-revalidate cached)."""
+        user_data = swr.get('github.me', lambda: self.fetch("user"))
         if user_data:
             print("\nUser Information:")
             print(f"  Name: {user_data.get('name', 'N/A')}")
@@ -103,68 +360,114 @@ class Plugin(PluginInterface):
         return None
 
     def get_repo_info(self, repo_full_name):
-        """Get detailed repository information."""
-        repo_data = self.fetch(f"repos/{repo_full_name}")
-        if repo_data:
-            print(f"\n📁 Repository: {repo_data['full_name']}")
-            print(f"📝 Description: {repo_data.get('description', 'No description')}")
-            print(f"🌐 Language: {repo_data.get('language', 'Not specified')}")
-            print(f"⭐ Stars: {repo_data.get('stargazers_count', 0)}")
-            print(f"🍴 Forks: {repo_data.get('forks_count', 0)}")
-            print(f"👁️ Watchers: {repo_data.get('watchers_count', 0)}")
-            print(f"🐛 Open Issues: {repo_data.get('open_issues_count', 0)}")
-            print(f"📅 Created: {repo_data.get('created_at', 'Unknown')}")
-            print(f"🔄 Updated: {repo_data.get('updated_at', 'Unknown')}")
-            print(f"🌍 URL: {repo_data.get('html_url', 'N/A')}")
-            
-            if repo_data.get('topics'):
-                print(f"🏷️ Topics: {', '.join(repo_data['topics'])}")
-            
-            print(f"🔓 Private: {'Yes' if repo_data.get('private') else 'No'}")
-            print(f"📜 License: {repo_data.get('license', {}).get('name', 'No license') if repo_data.get('license') else 'No license'}")
-            
-            return repo_data
-        return None
+        """Get detailed repository information.
+        
+        Answered from the repository index while the entry is fresh.
+        """
+        repo = self.repo_index.get(repo_full_name)
+        registry.inc('fetcher_cache_requests_total', cache='github_repo_index',
+                     result='miss' if repo is None else 'hit')
+        if repo is None:
+            repo_data = self.fetch(f"repos/{repo_full_name}")
+            if not repo_data:
+                return None
+            repo = Repo.from_api(repo_data)
+            self.repo_index.update([repo])
+        
+        print(f"\n📁 Repository: {repo.full_name}")
+        print(f"📝 Description: {repo.description or 'No description'}")
+        print(f"🌐 Language: {repo.language or 'Not specified'}")
+        print(f"⭐ Stars: {repo.stargazers_count}")
+        print(f"🍴 Forks: {repo.forks_count}")
+        print(f"👁️ Watchers: {repo.watchers_count}")
+        # GitHub counts open pull requests as issues
+        print(f"🐛 Open Issues + PRs: {repo.open_issues_count}")
+        print(f"📅 Created: {repo.created_at or 'Unknown'}")
+        print(f"🔄 Updated: {repo.updated_at or 'Unknown'}")
+        print(f"🌍 URL: {repo.html_url or 'N/A'}")
+        
+        if repo.topics:
+            print(f"🏷️ Topics: {', '.join(repo.topics)}")
+        
+        print(f"🔓 Private: {'Yes' if repo.private else 'No'}")
+        print(f"📜 License: {repo.license or 'No license'}")
+        
+        return repo
 
-    def list_issues(self, repo_full_name, state='open'):
-        """List issues for a repository."""
+    def _print_issue(self, issue):
+        print(f"\n#{issue.number} - {issue.title}")
+        print(f"👤 Author: {issue.user}")
+        print(f"📅 Created: {issue.created_at}")
+        print(f"🏷️ State: {issue.state}")
+        
+        if issue.labels:
+            print(f"🔖 Labels: {', '.join(issue.labels)}")
+        
+        if issue.assignee:
+            print(f"👥 Assignee: {issue.assignee}")
+        
+        # Show first 100 chars of body
+        body = issue.body
+        if body:
+            preview = body[:100] + "..." if len(body) > 100 else body
+            print(f"📝 Preview: {preview}")
+        
+        print(f"🔗 URL: {issue.html_url}")
+
+    def list_issues(self, repo_full_name, state='open', with_comments=False):
+        """List issues for a repository, optionally with every comment thread."""
         issues = self.fetch(f"repos/{repo_full_name}/issues", {"state": state})
         if issues:
+            issues = [Issue.from_api(issue, repo=repo_full_name) for issue in issues]
+            get_index().add(issue_doc(issue) for issue in issues)
             print(f"\n🐛 Issues for {repo_full_name} (State: {state}):")
             print("=" * 60)
             
-            for issue in issues:
-                # Skip pull requests (they appear in issues API)
-                if 'pull_request' in issue:
-                    continue
-                    
-                print(f"\n#{issue['number']} - {issue['title']}")
-                print(f"👤 Author: {issue['user']['login']}")
-                print(f"📅 Created: {issue['created_at']}")
-                print(f"🏷️ State: {issue['state']}")
-                
-                if issue.get('labels'):
-                    labels = [label['name'] for label in issue['labels']]
-                    print(f"🔖 Labels: {', '.join(labels)}")
-                
-                if issue.get('assignee'):
-                    print(f"👥 Assignee: {issue['assignee']['login']}")
-                
-                # Show first 100 chars of body
-                body = issue.get('body', '')
-                if body:
-                    preview = body[:100] + "..." if len(body) > 100 else body
-                    print(f"📝 Preview: {preview}")
-                
-                print(f"🔗 URL: {issue['html_url']}")
+            # Skip pull requests (they appear in issues API)
+            issues = [issue for issue in issues if not issue.is_pull_request]
+            if not with_comments:
+                for issue in issues:
+                    self._print_issue(issue)
+                return issues
             
+            for issue, comments in self.iter_issue_threads(repo_full_name, issues):
+                self._print_issue(issue)
+                self._print_comments(comments)
             return issues
         return None
 
+    def iter_issue_threads(self, repo_full_name, issues):
+        """Yield (issue, comments) in listing order while every thread is fetched concurrently.
+
+        Each issue is yielded as soon as it and the issues before it are
+        complete. Issues without comments cost no request. Comments are None
+        for a thread that could not be fetched completely.
+        """
+        fetch = bind_context(self.fetch_comments)
+        with ThreadPoolExecutor(max_workers=FANOUT_WORKERS) as executor:
+            futures = [
+                (issue, executor.submit(fetch, repo_full_name, issue.number) if issue.comments else None)
+                for issue in issues
+            ]
+            for issue, future in futures:
+                try:
+                    yield issue, future.result() if future is not None else []
+                except RuntimeError:
+                    yield issue, None
+
     def get_issue_details(self, repo_full_name, issue_number):
         """Get detailed information about a specific issue."""
         issue = self.fetch(f"repos/{repo_full_name}/issues/{issue_number}")
+        # The issue says how many comments it has: threads without any cost no request
+        try:
+            comments = self.fetch_comments(repo_full_name, issue_number) if issue and issue.get('comments') else []
+        except RuntimeError:
+            comments = None
+        return self._print_issue_details(repo_full_name, issue, comments)
+
+    def _print_issue_details(self, repo_full_name, issue, comments):
         if issue:
+            get_index().add([issue_doc(Issue.from_api(issue, repo=repo_full_name))])
             print(f"\n🐛 Issue #{issue['number']}: {issue['title']}")
             print("=" * 80)
             print(f"📝 Repository: {repo_full_name}")
@@ -196,37 +499,61 @@ class Plugin(PluginInterface):
                 print(issue['body'])
                 print("-" * 40)
             
-            # Get comments if any
-            if issue.get('comments', 0) > 0:
-                self.get_issue_comments(repo_full_name, issue_number)
+            self._print_comments(comments)
             
             return issue
         return None
 
+    def fetch_comments(self, repo_full_name, issue_number):
+        """Every comment of an issue, following pagination; indexed for local search.
+
+        Raises RuntimeError when a page fails: a partial thread is neither
+        returned nor indexed.
+        """
+        comments = [
+            comment
+            for page in self.fetch_pages(f"repos/{repo_full_name}/issues/{issue_number}/comments")
+            for comment in page
+        ]
+        if comments:
+            get_index().add(comment_doc(repo_full_name, issue_number, comment) for comment in comments)
+        return comments
+
+    def _print_comments(self, comments):
+        if comments is None:
+            print("\n❌ Failed to fetch the comments of this issue")
+            return
+        if not comments:
+            return
+        print(f"\n💬 Comments ({len(comments)}):")
+        print("=" * 50)
+        
+        for i, comment in enumerate(comments, 1):
+            print(f"\nComment #{i}")
+            print(f"👤 Author: {comment['user']['login']}")
+            print(f"📅 Posted: {comment['created_at']}")
+            if comment['created_at'] != comment['updated_at']:
+                print(f"🔄 Updated: {comment['updated_at']}")
+            print(f"💬 Content:")
+            print("-" * 30)
+            print(comment['body'])
+            print("-" * 30)
+
     def get_issue_comments(self, repo_full_name, issue_number):
         """Get comments for a specific issue."""
-        comments = self.fetch(f"repos/{repo_full_name}/issues/{issue_number}/comments")
+        try:
+            comments = self.fetch_comments(repo_full_name, issue_number)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return None
         if comments:
-            print(f"\n💬 Comments ({len(comments)}):")
-            print("=" * 50)
-            
-            for i, comment in enumerate(comments, 1):
-                print(f"\nComment #{i}")
-                print(f"👤 Author: {comment['user']['login']}")
-                print(f"📅 Posted: {comment['created_at']}")
-                if comment['created_at'] != comment['updated_at']:
-                    print(f"🔄 Updated: {comment['updated_at']}")
-                print(f"💬 Content:")
-                print("-" * 30)
-                print(comment['body'])
-                print("-" * 30)
-            
+            self._print_comments(comments)
             return comments
         return None
 
     def create_issue(self, repo_full_name, title, body="", labels=None):
         """Create a new issue in a repository."""
-        if not self.headers.get('Authorization'):
+        if not self.tokens.authenticated:
             print("❌ Authentication required to create issues. Please set GITHUB_TOKEN.")
             return None
         
@@ -240,7 +567,7 @@ class Plugin(PluginInterface):
         if labels:
             issue_data["labels"] = labels if isinstance(labels, list) else [labels]
         
-        response = requests.post(url, json=issue_data, headers=self.headers)
+        response = self.session.post(url, json=issue_data, headers=self.headers)
         
         if response.status_code == 201:
             issue = response.json()
@@ -254,6 +581,242 @@ class Plugin(PluginInterface):
             print(f"Response: {response.text}")
             return None
 
+    def export(self, kind, target, path, state='open'):
+        """Export every issue of a repository or every repository of a user."""
+        if kind == "issues":
+            build = lambda item: Issue.from_api(item, repo=target)
+            pages = index_pages(self.fetch_pages(f"repos/{target}/issues", {"state": state}),
+                                lambda item: issue_doc(build(item)))
+        elif kind == "repos":
+            pages = self.fetch_pages(f"users/{target}/repos")
+            build = Repo.from_api
+        else:
+            print(f"❌ Unknown export type: {kind}. Use 'issues' or 'repos'")
+            return None
+        
+        print(f"\n📤 Exporting {kind} for {target}...")
+        with priority(BULK):
+            exporter = export_pages(pages, path, build)
+        print(f"✅ Exported {exporter.rows_written} {kind} to {exporter.path} ({exporter.format})")
+        return exporter.path
+
+    def _resolve_repos(self, target):
+        """Expand a fan-out target into a list of owner/repo names.
+
+        Accepts a comma-separated list, `org:name` for every repository of an
+        organization, or `@path` for a file with one repository per line.
+        """
+        if target.startswith("org:"):
+            try:
+                return [repo.full_name for repo in self.fetch_org_repos(target[4:]) or []]
+            except RuntimeError as e:
+                # Never fan out over part of an organization
+                print(f"❌ {e}")
+                return []
+        if target.startswith("@"):
+            with open(target[1:]) as f:
+                return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        return [repo.strip() for repo in target.split(",") if repo.strip()]
+
+    def _repo_summary(self, repo_full_name, state='open', limit=5):
+        """Fetch the open issue + PR count and most recent issues of one repository.
+
+        The issues listing includes pull requests, so pages are followed until
+        `limit` real issues are collected. Raises on any upstream error so the
+        fan-out can report it per repository.
+        """
+        response = self.session.get(f"{self.api_url}/repos/{repo_full_name}", headers=self.headers)
+        response.raise_for_status()
+        repo = Repo.from_api(response.json())
+        
+        fetched, recent = [], []
+        url = f"{self.api_url}/repos/{repo_full_name}/issues"
+        params = {"state": state, "per_page": limit}
+        while url and len(recent) < limit:
+            response = self.session.get(url, params=params, headers=self.headers)
+            response.raise_for_status()
+            page = [Issue.from_api(item, repo=repo_full_name) for item in response.json()]
+            fetched.extend(page)
+            recent.extend(issue for issue in page if not issue.is_pull_request)
+            # The next link already carries the query string
+            url = response.links.get('next', {}).get('url')
+            params = None
+        get_index().add(issue_doc(issue) for issue in fetched)
+        
+        return {
+            "repo": repo_full_name,
+            # GitHub's open_issues_count includes open pull requests
+            "open_issues_and_prs": repo.open_issues_count,
+            "recent": recent[:limit]
+        }
+
+    def iter_fanout(self, repos, state='open', limit=5):
+        """Fetch summaries for many repositories concurrently.
+
+        Yields (repo, summary, error) tuples in completion order, so callers can
+        stream results while slower repositories are still in flight.
+        """
+        # Workers run at bulk priority, queued behind interactive requests
+        with priority(BULK):
+            summary = bind_context(self._repo_summary)
+        with ThreadPoolExecutor(max_workers=FANOUT_WORKERS) as executor:
+            futures = {executor.submit(summary, repo, state, limit): repo for repo in repos}
+            for future in as_completed(futures):
+                repo = futures[future]
+                try:
+                    yield repo, future.result(), None
+                except Exception as e:
+                    yield repo, None, e
+
+    def fanout(self, target, state='open', limit=5):
+        """Print issue summaries for many repositories as they arrive."""
+        repos = self._resolve_repos(target)
+        if not repos:
+            print("❌ No repositories to fetch")
+            return None
+        
+        print(f"\n🌐 Fetching {len(repos)} repositories ({FANOUT_WORKERS} concurrent)...")
+        summaries = {}
+        failures = {}
+        
+        for done, (repo, summary, error) in enumerate(self.iter_fanout(repos, state, int(limit)), 1):
+            progress = f"[{done}/{len(repos)}]"
+            if error is not None:
+                failures[repo] = str(error)
+                print(f"\n{progress} ❌ {repo}: {error}")
+                continue
+            
+            summaries[repo] = summary
+            print(f"\n{progress} ✅ {repo}: {summary['open_issues_and_prs']} open issues + PRs")
+            for issue in summary['recent']:
+                print(f"   #{issue.number} {issue.title} ({issue.user}, {issue.created_at})")
+        
+        total = sum(summary['open_issues_and_prs'] for summary in summaries.values())
+        print(f"\n📊 {len(summaries)}/{len(repos)} repositories, {total} open issues + PRs")
+        if failures:
+            print(f"⚠️ Failed ({len(failures)}): {', '.join(sorted(failures))}")
+        
+        return {"summaries": summaries, "failures": failures}
+
+    def watch(self, target, duration=0, output_format='text'):
+        """Stream changes of many repositories until `duration` seconds pass (0 = forever)."""
+        repos = self._resolve_repos(target)
+        if not repos:
+            print("❌ No repositories to watch")
+            return None
+        
+        watcher = Watcher([RepoWatch(self, repo) for repo in repos], workers=FANOUT_WORKERS)
+        print(f"\n👀 Watching {len(repos)} repositories (Ctrl+C to stop)...", flush=True)
+        try:
+            with priority(BULK):
+                watcher.run(change_printer(output_format), duration=float(duration) or None)
+        except KeyboardInterrupt:
+            pass
+        print(f"\n📊 {watcher.polls} polls, {watcher.changes} changes")
+        return watcher.changes
+
+    def _load_history(self, repo_full_name, since=None):
+        """Issues and comments of a repository.
+
+        With `since`, every open issue is loaded (GitHub's `since` filters by
+        update time, which would drop long-open quiet issues) but only closed
+        issues and comments updated after it. Raises RuntimeError when any
+        listing page fails, so a repository is loaded completely or not at all.
+        """
+        listings = [{'state': 'all'}]
+        comment_params = {'sort': 'created', 'direction': 'asc'}
+        if since:
+            listings = [{'state': 'open'}, {'state': 'closed', 'since': since}]
+            comment_params['since'] = since
+        issues = [
+            Issue.from_api(item, repo=repo_full_name)
+            for params in listings
+            for page in self.fetch_pages(f"repos/{repo_full_name}/issues", params)
+            for item in page
+        ]
+        # One repository-wide listing instead of a request per issue
+        comments = [
+            (repo_full_name, int(comment['issue_url'].rsplit('/', 1)[1]),
+             (comment.get('user') or {}).get('login'), comment.get('created_at'))
+            for page in self.fetch_pages(f"repos/{repo_full_name}/issues/comments", comment_params)
+            for comment in page
+        ]
+        return issues, comments
+
+    def issue_analytics(self, target, days=90):
+        """Print issue and pull request statistics of many repositories."""
+        if analytics.np is None:
+            print("❌ analytics needs NumPy: pip install numpy")
+            return None
+        repos = self._resolve_repos(target)
+        if not repos:
+            print("❌ No repositories to analyze")
+            return None
+        
+        days = float(days)
+        since_epoch = time.time() - days * 86400 if days else None
+        since = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(since_epoch)) if days else None
+        window = f"last {days:g} days" if days else "all time"
+        print(f"\n📥 Loading issues and comments of {len(repos)} repositories ({window})...")
+        
+        start = time.perf_counter()
+        issues, comments, failures = [], [], {}
+        with priority(BULK):
+            load = bind_context(self._load_history)
+        with ThreadPoolExecutor(max_workers=FANOUT_WORKERS) as executor:
+            futures = {executor.submit(load, repo, since): repo for repo in repos}
+            for future in as_completed(futures):
+                try:
+                    repo_issues, repo_comments = future.result()
+                except Exception as e:
+                    failures[futures[future]] = str(e)
+                    continue
+                issues.extend(repo_issues)
+                comments.extend(repo_comments)
+        loaded = time.perf_counter()
+        
+        columns = analytics.IssueColumns.build(issues, comments)
+        report = list(analytics.issue_report(columns, time.time(), since_epoch))
+        computed = time.perf_counter()
+        
+        print(f"📈 {len(columns)} issues/PRs, {len(comments)} comments")
+        print(f"⚡ Loaded in {(loaded - start) * 1000:.0f} ms, computed in {(computed - loaded) * 1000:.1f} ms")
+        
+        def days_text(summary):
+            if not summary['count']:
+                return "n/a"
+            return f"median {summary['median_days']}d · p90 {summary['p90_days']}d"
+        
+        excluded = f" (without {len(failures)} failed)" if failures else ""
+        for repo, kind, stats in report:
+            print(f"\n📦 {'All repositories' + excluded if repo == '*' else repo} — {kind}")
+            rate = f"{stats['close_rate']:.1%}" if stats['close_rate'] is not None else "n/a"
+            print(f"   📊 {stats['total']} total · {stats['open']} open · {stats['closed']} closed · close rate {rate}")
+            print(f"   ⏳ Open age: {days_text(stats['open_age'])}")
+            print(f"   ✅ Time to close: {days_text(stats['time_to_close'])}")
+            responded = f" · {stats['response_rate']:.1%} responded" if stats['response_rate'] is not None else ""
+            print(f"   💬 First response: {days_text(stats['first_response'])}{responded}")
+            if stats['labels']:
+                print(f"   🔖 {', '.join(f'{label} ({count})' for label, count in stats['labels'].items())}")
+        
+        if failures:
+            print(f"\n⚠️ Failed ({len(failures)}): {', '.join(sorted(failures))}")
+        return {"report": report, "failures": failures, "partial": bool(failures)}
+
+    def show_limits(self):
+        """Print every token's budget per rate limit resource, fresh from /rate_limit."""
+        self.tokens.sync(force=True)
+        now = time.time()
+        print(f"\n🚦 Rate limits ({len(self.tokens)} token(s)):")
+        for token in self.tokens.tokens:
+            print(f"\n🔑 {token.name}")
+            for resource in ('core', 'search', 'code_search', 'graphql'):
+                budget = token.budget(resource)
+                resets = max(0, int(budget.reset - now)) if budget.remaining is not None else None
+                print(f"   {resource:<12} {budget.headroom(now):>5}/{budget.limit}"
+                      + (f"  (reset in {resets}s)" if resets else ""))
+        return self.tokens.tokens
+
     def run(self, command: str, *args, **kwargs):
         """Execute a specific plugin command."""
         if command == "test":
@@ -285,12 +848,14 @@ class Plugin(PluginInterface):
             repo_name = args[0]
             self.get_repo_info(repo_name)
         elif command == "issues":
+            with_comments = "--with-comments" in args
+            args = [arg for arg in args if arg != "--with-comments"]
             if len(args) < 1:
-                print("Usage: issues [owner/repo] [state]")
+                print("Usage: issues [owner/repo] [state] [--with-comments]")
                 return
             repo_name = args[0]
             state = args[1] if len(args) > 1 else 'open'
-            self.list_issues(repo_name, state)
+            self.list_issues(repo_name, state, with_comments)
         elif command == "issue":
             if len(args) < 2:
                 print("Usage: issue [owner/repo] [issue_number]")
@@ -306,6 +871,39 @@ class Plugin(PluginInterface):
             title = args[1]
             body = args[2] if len(args) > 2 else ""
             self.create_issue(repo_name, title, body)
+        elif command == "export":
+            if len(args) < 3:
+                print("Usage: export [issues|repos] [owner/repo|username] [path] [state]")
+                return
+            state = args[3] if len(args) > 3 else 'open'
+            self.export(args[0], args[1], args[2], state)
+        elif command == "fanout":
+            if len(args) < 1:
+                print("Usage: fanout [owner/repo,...|org:name|@file] [state] [limit]")
+                return
+            state = args[1] if len(args) > 1 else 'open'
+            limit = args[2] if len(args) > 2 else 5
+            self.fanout(args[0], state, limit)
+        elif command == "org":
+            if len(args) < 1:
+                print("Usage: org [org_name]")
+                return
+            self.list_org_repos(args[0])
+        elif command == "watch":
+            if len(args) < 1:
+                print("Usage: watch [owner/repo,...|org:name|@file] [seconds] [text|json]")
+                return
+            duration = args[1] if len(args) > 1 else 0
+            output_format = args[2] if len(args) > 2 else 'text'
+            self.watch(args[0], duration, output_format)
+        elif command == "limits":
+            self.show_limits()
+        elif command == "analytics":
+            if len(args) < 1:
+                print("Usage: analytics [owner/repo,...|org:name|@file] [days]")
+                return
+            days = args[1] if len(args) > 1 else 90
+            self.issue_analytics(args[0], days)
         else:
             print(f"Unknown command: {command}")
             self.list_commands()
@@ -0,0 +1,160 @@
+"""
+Shared HTTP session factory for plugins.
+
+Every plugin makes its upstream calls through a session created here, so
+connection pooling and per-endpoint instrumentation are configured in one
+place instead of at each of the plugins' call sites.
+
+Every request gets connect/read timeouts, tightened to the active call's
+deadline (see deadline.py); a cancelled call's in-flight responses are closed.
+With FETCHER_HTTP_MODE=record/replay the transport records to or replays
+from a cassette (see cassette.py). Pool size and timeouts can be set per
+upstream endpoint (see endpoints.py).
+
+Usage:
+    self.session = create_session('github', pool_maxsize=8, endpoints=('github',))
+    response = self.session.get(url, params=params, headers=headers)
+"""
+
+import os
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cassette import RecordingAdapter, ReplayAdapter, get_cassette, http_mode
+from .deadline import CallCancelled, DeadlineExceeded, current_deadline
+from .endpoints import endpoints as endpoint_registry
+from .metrics import endpoint_label, registry
+from .tracing import tracer
+
+# Default timeouts for every upstream request (capped further by call deadlines)
+CONNECT_TIMEOUT = float(os.getenv('FETCHER_HTTP_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('FETCHER_HTTP_READ_TIMEOUT', '30'))
+
+
+def _instrument_json(response, labels):
+    """Time response.json() calls as the JSON decode phase."""
+    decode = response.json
+
+    def timed_json(**kwargs):
+        start = time.perf_counter()
+        try:
+            return decode(**kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.observe('fetcher_upstream_duration_seconds', elapsed, phase='json_decode', **labels)
+            registry.add_phase('json_decode', elapsed)
+
+    response.json = timed_json
+
+
+def _timeouts(requested, deadline, endpoint=None):
+    """(connect, read) timeouts for a request, capped by the call's deadline."""
+    if isinstance(requested, tuple):
+        connect, read = requested
+    elif requested:
+        connect, read = requested, requested
+    else:
+        connect = endpoint and endpoint.connect_timeout or CONNECT_TIMEOUT
+        read = endpoint and endpoint.read_timeout or READ_TIMEOUT
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is not None:
+        if remaining <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+        connect, read = min(connect or remaining, remaining), min(read or remaining, remaining)
+    return connect, read
+
+
+def _read_body(response, deadline):
+    """Load the body of a streamed response, aborting if the call is cancelled."""
+    deadline.on_cancel(response.close)
+    try:
+        response.content
+    except Exception as e:
+        # Closing the response from another thread surfaces as assorted errors
+        if deadline.cancelled:
+            raise CallCancelled(deadline.reason) from e
+        raise
+    finally:
+        deadline.remove_callback(response.close)
+
+
+class InstrumentedSession(requests.Session):
+    """requests.Session that records latency and status per endpoint."""
+
+    def __init__(self, plugin_name):
+        super().__init__()
+        self.plugin_name = plugin_name
+
+    def request(self, method, url, *args, **kwargs):
+        endpoint = endpoint_label(urllib.parse.urlparse(url).path)
+        labels = {"plugin": self.plugin_name, "endpoint": f"{method.upper()} {endpoint}"}
+
+        # The query string is left out of the span: Trello passes key/token there
+        span_attributes = {
+            'http.method': method.upper(),
+            'http.url': urllib.parse.urlunparse(urllib.parse.urlparse(url)._replace(query='')),
+            'http.endpoint': labels['endpoint'],
+            'fetcher.plugin': self.plugin_name
+        }
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check()
+        kwargs['timeout'] = _timeouts(kwargs.get('timeout'), deadline, endpoint_registry.for_url(url))
+        # With a deadline the body is read here, so cancel() can close it mid-read
+        stream = kwargs.pop('stream', False)
+
+        with tracer.start_span(f"HTTP {labels['endpoint']}", **span_attributes) as span:
+            start = time.perf_counter()
+            try:
+                response = super().request(method, url, *args, stream=stream or deadline is not None, **kwargs)
+                if deadline is not None and not stream:
+                    _read_body(response, deadline)
+            except (requests.RequestException, CallCancelled) as e:
+                if deadline is not None and deadline.cancelled:
+                    registry.inc('fetcher_upstream_requests_total', status='cancelled', **labels)
+                    raise CallCancelled(deadline.reason) from e
+                if isinstance(e, requests.Timeout) and deadline is not None and deadline.expired:
+                    registry.inc('fetcher_upstream_requests_total', status='timeout', **labels)
+                    raise DeadlineExceeded(f"deadline exceeded during {labels['endpoint']}") from e
+                registry.inc('fetcher_upstream_requests_total', status='error', **labels)
+                raise
+            elapsed = time.perf_counter() - start
+            if span:
+                span.set_attribute('http.status_code', response.status_code)
+                if response.status_code >= 400:
+                    span.status = 'error'
+
+        registry.inc('fetcher_upstream_requests_total', status=str(response.status_code), **labels)
+        registry.observe('fetcher_upstream_duration_seconds', elapsed, phase='upstream_wait', **labels)
+        registry.add_phase('upstream_wait', elapsed)
+        _instrument_json(response, labels)
+        return response
+
+
+def _adapter(mode, pool_maxsize):
+    if mode == 'replay':
+        return ReplayAdapter(get_cassette())
+    if mode == 'record':
+        return RecordingAdapter(get_cassette(), pool_maxsize=pool_maxsize)
+    return HTTPAdapter(pool_maxsize=pool_maxsize)
+
+
+def create_session(plugin_name, pool_maxsize=10, endpoints=()):
+    """Create an instrumented, pooled session for a plugin.
+
+    Requests under one of the named `endpoints` use that endpoint's own
+    pool size when it sets one.
+    """
+    session = InstrumentedSession(plugin_name)
+    mode = http_mode()
+    adapter = _adapter(mode, pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    for name in endpoints:
+        endpoint = endpoint_registry.get(name)
+        if endpoint.pool_maxsize:
+            session.mount(endpoint.url + '/', _adapter(mode, endpoint.pool_maxsize))
+    return session
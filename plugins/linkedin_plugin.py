@@ -13,30 +13,32 @@ Commands:
 
 import os
 import json
-import requests
-import webbrowser
-import http.server
-import socketserver
 import urllib.parse
-from threading import Thread
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from .credential_store import credentials
+from .endpoints import endpoints
+from .http_session import create_session
+from .metrics import registry
+from .oauth_callback import OAuthCallbackServer
 from .plugin_interface import PluginInterface
+from .single_flight import token_refresh
 
 # Load environment variables
 load_dotenv()
 
 class Plugin(PluginInterface):
     def __init__(self):
-        self.base_url = "https://api.linkedin.com/v2"
-        self.auth_url = "https://www.linkedin.com/oauth/v2/accessToken"
-        self.authorize_url = "https://www.linkedin.com/oauth/v2/authorization"
+        self.base_url = endpoints.url('linkedin')
+        self.auth_url = endpoints.url('linkedin_oauth', 'accessToken')
+        self.authorize_url = endpoints.url('linkedin_oauth', 'authorization')
+        self.session = create_session('linkedin', endpoints=('linkedin', 'linkedin_oauth'))
         
         # Load credentials
         self.client_id = os.getenv('LINKEDIN_CLIENT_ID')
         self.client_secret = os.getenv('LINKEDIN_CLIENT_SECRET')
-        self.access_token = os.getenv('LINKEDIN_ACCESS_TOKEN')
-        self.token_expiry = os.getenv('LINKEDIN_TOKEN_EXPIRY')
+        self.access_token = credentials.get('LINKEDIN_ACCESS_TOKEN')
+        self.token_expiry = credentials.get('LINKEDIN_TOKEN_EXPIRY')
         
         if not self.client_id or not self.client_secret:
             raise ValueError(
@@ -47,7 +49,9 @@ class Plugin(PluginInterface):
                 "\nin your .env file"
             )
             
-        self.redirect_uri = "http://127.0.0.1:3004/callback"
+        # Port registered as redirect URL in the LinkedIn app (0 = ephemeral port)
+        self.callback_port = int(os.getenv('LINKEDIN_PORT', '3004'))
+        self.redirect_uri = f"http://127.0.0.1:{self.callback_port}/callback"
         self.scopes = ['openid', 'profile', 'w_member_social', 'email']
         
         self._commands = {
@@ -61,23 +65,9 @@ class Plugin(PluginInterface):
     def _save_token_to_env(self, access_token, expires_in):
         """Save access token and expiry time to .env file."""
         expiry_time = datetime.now() + timedelta(seconds=expires_in)
-        env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
         
-        # Read current file
-        with open(env_path, 'r') as f:
-            lines = f.readlines()
-        
-        # Remove old token lines if they exist
-        lines = [l for l in lines if not l.startswith('LINKEDIN_ACCESS_TOKEN=') and 
-                not l.startswith('LINKEDIN_TOKEN_EXPIRY=')]
-        
-        # Add new values
-        lines.append(f'LINKEDIN_ACCESS_TOKEN={access_token}\n')
-        lines.append(f'LINKEDIN_TOKEN_EXPIRY={expiry_time.isoformat()}\n')
-        
-        # Save file
-        with open(env_path, 'w') as f:
-            f.writelines(lines)
+        # Written to .env in the background by the credential store
+        credentials.set(LINKEDIN_ACCESS_TOKEN=access_token, LINKEDIN_TOKEN_EXPIRY=expiry_time.isoformat())
         
         # Update instance variables
         self.access_token = access_token
@@ -85,6 +75,9 @@ class Plugin(PluginInterface):
 
     def _is_token_valid(self):
         """Check if current token is valid."""
+        # Another process may have refreshed the token since we loaded it
+        self.access_token = credentials.get('LINKEDIN_ACCESS_TOKEN', self.access_token)
+        self.token_expiry = credentials.get('LINKEDIN_TOKEN_EXPIRY', self.token_expiry)
         if not self.access_token or not self.token_expiry:
             return False
             
@@ -95,76 +88,23 @@ class Plugin(PluginInterface):
                 
             # Test token with a simple API call
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = requests.get(f"{self.base_url}/me", headers=headers)
+            response = self.session.get(f"{self.base_url}/me", headers=headers)
             return response.status_code == 200
             
         except (ValueError, TypeError):
             return False
 
-    def _start_auth_server(self):
-        """Start local server to receive OAuth callback."""
-        class CallbackHandler(http.server.BaseHTTPRequestHandler):
-            def do_GET(self):
-                self.send_response(200)
-                self.send_header('Content-type', 'text/html')
-                self.end_headers()
-                
-                query_components = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
-                
-                if 'code' in query_components:
-                    # Store the auth code
-                    self.server.auth_code = query_components['code'][0]
-                    response = """
-                    <html><body>
-                        <h1>✅ Authorization completed!</h1>
-                        <p>You can close this window and return to the terminal.</p>
-                    </body></html>
-                    """
-                else:
-                    response = """
-                    <html><body>
-                        <h1>❌ Authorization error</h1>
-                        <p>Please try again.</p>
-                    </body></html>
-                    """
-                
-                self.wfile.write(response.encode())
-                
-            def log_message(self, format, *args):
-                # Disable HTTP server logs
-                pass
-
-        port = 3004
-        self.redirect_uri = f"http://127.0.0.1:{port}/callback"
-        
-        try:
-            # Create server
-            server = socketserver.TCPServer(("127.0.0.1", port), CallbackHandler)
-            server.auth_code = None
-            server.allow_reuse_address = True
-            
-            # Start server in a thread
-            server_thread = Thread(target=server.serve_forever)
-            server_thread.daemon = False  # Change to non-daemon
-            server_thread.start()
-            print("Server started successfully on port", port)
-            
-            return server
-            
-        except Exception as e:
-            print(f"\n❌ Error starting server: {str(e)}")
-            if "Address already in use" in str(e):
-                print("\nTip: Try again in a few seconds")
-            return None
-
     def _get_user_auth(self):
         """Get user authorization through OAuth flow."""
         print("\n🔄 Starting authorization flow...")
         
         # Start local server
-        server = self._start_auth_server()
-        if not server:
+        try:
+            server = OAuthCallbackServer(port=self.callback_port).start()
+        except OSError as e:
+            print(f"\n❌ Error starting server: {str(e)}")
             return None
+        self.redirect_uri = server.redirect_uri
         
         # Construct authorization URL
         auth_params = {
@@ -172,37 +112,32 @@ class Plugin(PluginInterface):
             'client_id': self.client_id,
             'redirect_uri': self.redirect_uri,
             'scope': ' '.join(self.scopes),
-            'state': 'random_state_string'
+            'state': server.state
         }
         
-        auth_url = f"{self.authorize_url}?{'&'.join(f'{k}={v}' for k, v in auth_params.items())}"
+        auth_url = f"{self.authorize_url}?{urllib.parse.urlencode(auth_params)}"
         
         print("\n🌐 Opening browser for authorization...")
-        webbrowser.open(auth_url)
+        server.open_browser(auth_url)
         
-        # Wait for callback
+        # Wait for callback (wakes as soon as the redirect arrives)
         print("\n⏳ Waiting for authorization...")
-        timeout = 300  # 5 minutes
-        start_time = datetime.now()
-        
-        while not server.auth_code:
-            if (datetime.now() - start_time).total_seconds() > timeout:
-                print("\n❌ Authorization timeout. Please try again.")
-                server.shutdown()
-                return None
-                
-            if not Thread(target=server.serve_forever).is_alive():
-                print("\n❌ Server stopped unexpectedly. Please try again.")
-                return None
-                
-            time.sleep(1)
+        try:
+            auth_code = server.wait(timeout=300)  # 5 minutes
+        finally:
+            server.close()
         
-        auth_code = server.auth_code
-        server.shutdown()
+        if not auth_code:
+            print(f"\n❌ Authorization failed: {server.error or 'timeout'}. Please try again.")
+            return None
         
         return auth_code
 
     def _get_access_token(self):
+        """Get access token, sharing one refresh between concurrent callers."""
+        return token_refresh.do(('linkedin', self.client_id), self._refresh_access_token)
+
+    def _refresh_access_token(self):
         """Get access token from LinkedIn API."""
         if self._is_token_valid():
             return self.access_token
@@ -221,7 +156,7 @@ class Plugin(PluginInterface):
             'client_secret': self.client_secret
         }
         
-        response = requests.post(self.auth_url, data=token_data)
+        response = self.session.post(self.auth_url, data=token_data)
         
         if response.status_code == 200:
             token_info = response.json()
@@ -257,7 +192,7 @@ class Plugin(PluginInterface):
             'X-Restli-Protocol-Version': '2.0.0'
         }
         
-        response = requests.get(url, params=params, headers=headers)
+        response = self.session.get(url, params=params, headers=headers)
         
         if response.status_code == 200:
             return response.json()
@@ -267,6 +202,7 @@ class Plugin(PluginInterface):
                 print("Authentication error. Token might be expired.")
                 # Clear token and try again
                 self.access_token = None
+                registry.inc('fetcher_retries_total', plugin='linkedin', reason='unauthorized')
                 return self.fetch(endpoint, params)
             return None
 
@@ -284,7 +220,7 @@ class Plugin(PluginInterface):
             'X-Restli-Protocol-Version': '2.0.0'
         }
         
-        response = requests.post(url, json=data, headers=headers)
+        response = self.session.post(url, json=data, headers=headers)
         
         if response.status_code in [200, 201]:
             return response.json()
@@ -294,6 +230,7 @@ class Plugin(PluginInterface):
                 print("Authentication error. Token might be expired.")
                 # Clear token and try again
                 self.access_token = None
+                registry.inc('fetcher_retries_total', plugin='linkedin', reason='unauthorized')
                 return self.post(endpoint, data)
             return None
 
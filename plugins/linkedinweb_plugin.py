@@ -14,9 +14,10 @@ Commands:
 import os
 import json
 import time
-import requests
 from urllib.parse import quote
 from dotenv import load_dotenv
+from .endpoints import endpoints
+from .http_session import create_session
 from .plugin_interface import PluginInterface
 
 # Load environment variables
@@ -24,11 +25,11 @@ load_dotenv()
 
 class Plugin(PluginInterface):
     def __init__(self):
-        self.base_url = "https://www.linkedin.com"
-        self.api_url = "https://www.linkedin.com/voyager/api"
+        self.base_url = endpoints.url('linkedinweb')
+        self.api_url = endpoints.url('linkedinweb', 'voyager/api')
         self.email = os.getenv('LINKEDIN_EMAIL')
         self.password = os.getenv('LINKEDIN_PASSWORD')
-        self.session = requests.Session()
+        self.session = create_session('linkedinweb', endpoints=('linkedinweb',))
         self.csrf_token = None
         self._is_authenticated = False
         
@@ -0,0 +1,234 @@
+"""
+In-process metrics for tool calls and upstream requests.
+
+Counters and latency histograms are kept in a global `registry` (like the
+global plugin `manager`). The MCP server records every tool call, the shared
+HTTP session records every upstream request, and the registry can be read as
+a dict (`metrics` MCP method) or rendered in the Prometheus text format.
+
+Per-call phase timings (upstream wait, JSON decode) are accumulated through
+a context variable, so the MCP server can split a tool call's latency into
+upstream wait, JSON decode, formatting and serialization.
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Path segments followed by an identifier that should not become a label value
+_ID_AFTER = {
+    'users', 'orgs', 'boards', 'cards', 'lists', 'members', 'playlists',
+    'tracks', 'artists', 'albums', 'issues', 'comments', 'profile', 'actions'
+}
+
+_current_call = contextvars.ContextVar('fetcher_call_timings', default=None)
+
+
+def endpoint_label(path):
+    """Reduce a request path to a low-cardinality endpoint template.
+
+    repos/octocat/hello/issues/12 -> repos/:owner/:repo/issues/:id
+    """
+    segments = [segment for segment in path.split('/') if segment]
+    result = []
+    i = 0
+    while i < len(segments):
+        segment = segments[i]
+        if segment == 'repos':
+            placeholders = [':owner', ':repo'][:len(segments) - i - 1]
+            result.append(segment)
+            result.extend(placeholders)
+            i += 1 + len(placeholders)
+            continue
+        if segment.isdigit():
+            result.append(':id')
+        elif result and result[-1] in _ID_AFTER and segment != 'me':
+            result.append(':id')
+        else:
+            result.append(segment)
+        i += 1
+    return '/'.join(result)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    """Format label pairs as a Prometheus label set."""
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q):
+        """Estimate a quantile from the bucket counts."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        for bound, count in zip(self.buckets, self.counts):
+            if count >= target:
+                return bound
+        return float('inf')
+
+
+class CallTimings:
+    """Phase durations accumulated during one tool call."""
+
+    def __init__(self):
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def get(self, phase):
+        return self.phases.get(phase, 0.0)
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters and histograms."""
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        """Set the HELP text of a metric."""
+        self._help[name] = text
+
+    def inc(self, name, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextlib.contextmanager
+    def track_call(self):
+        """Collect phase timings of everything run inside the block."""
+        timings = CallTimings()
+        token = _current_call.set(timings)
+        try:
+            yield timings
+        finally:
+            _current_call.reset(token)
+
+    def add_phase(self, phase, seconds):
+        """Add time to the current call's phase, if a call is being tracked."""
+        timings = _current_call.get()
+        if timings is not None:
+            timings.add(phase, seconds)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """Return all metrics as JSON-serializable data."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": hist.count,
+                        "sum": round(hist.sum, 6),
+                        "p50": hist.quantile(0.5),
+                        "p95": hist.quantile(0.95),
+                        "p99": hist.quantile(0.99)
+                    }
+                    for key, hist in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms, "cache_hit_rate": self.cache_hit_rate()}
+
+    def cache_hit_rate(self):
+        """Hit rate per cache, from fetcher_cache_requests_total."""
+        totals = {}
+        for key, value in self._counters.get('fetcher_cache_requests_total', {}).items():
+            labels = dict(key)
+            hits, total = totals.get(labels.get('cache'), (0, 0))
+            if labels.get('result') == 'hit':
+                hits += value
+            totals[labels.get('cache')] = (hits, total + value)
+        return {cache: round(hits / total, 4) for cache, (hits, total) in totals.items() if total}
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', str(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+registry.describe('fetcher_tool_calls_total', 'MCP tool calls by tool and status')
+registry.describe('fetcher_tool_duration_seconds', 'MCP tool call latency by phase')
+registry.describe('fetcher_upstream_requests_total', 'Upstream HTTP requests by plugin, endpoint and status')
+registry.describe('fetcher_upstream_duration_seconds', 'Upstream HTTP latency by plugin, endpoint and phase')
+registry.describe('fetcher_cache_requests_total', 'Cache lookups by cache and result')
+registry.describe('fetcher_retries_total', 'Retried upstream operations by plugin and reason')
@@ -0,0 +1,158 @@
+"""
+Event-driven OAuth redirect receiver shared by the Spotify and LinkedIn plugins.
+
+The server binds the configured callback port (or an ephemeral one with
+port 0) and wakes the waiter through a threading.Event the moment the
+redirect arrives, instead of polling an attribute every second. A busy
+port is reported as an error rather than hunted down in the process table.
+
+Usage:
+    with OAuthCallbackServer(port=3003) as callback:
+        params['redirect_uri'] = callback.redirect_uri
+        params['state'] = callback.state
+        callback.open_browser(f"{authorize_url}?{urllib.parse.urlencode(params)}")
+        code = callback.wait(timeout=300)
+
+From a coroutine, `await callback.wait_async(300)` waits in a worker thread
+so the event loop keeps serving other requests.
+"""
+
+import asyncio
+import html
+import http.server
+import secrets
+import sys
+import threading
+import urllib.parse
+import webbrowser
+
+from .context import bind_context
+from .deadline import current_deadline
+
+SUCCESS_PAGE = """
+<html><body>
+    <h1>✅ Autorização concluída! / Authorization completed!</h1>
+    <p>Você pode fechar esta janela. / You can close this window and return to the terminal.</p>
+</body></html>
+"""
+
+ERROR_PAGE = """
+<html><body>
+    <h1>❌ Erro na autorização / Authorization error</h1>
+    <p>{error}</p>
+</body></html>
+"""
+
+
+class _ReusableHTTPServer(http.server.HTTPServer):
+    # Rebind right away when a previous flow left the port in TIME_WAIT
+    allow_reuse_address = True
+
+
+class OAuthCallbackServer:
+    """One-shot local HTTP server that captures an OAuth authorization code."""
+
+    def __init__(self, port=0, host='127.0.0.1', path='/callback'):
+        self.path = path
+        self.state = secrets.token_urlsafe(16)
+        self.code = None
+        self.error = None
+        self._received = threading.Event()
+
+        try:
+            self._server = _ReusableHTTPServer((host, port), self._handler_class())
+        except OSError as e:
+            raise OSError(
+                f"Porta {port} em uso / Port {port} is already in use for the OAuth callback "
+                f"(is another authorization pending?): {e}"
+            ) from e
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def redirect_uri(self):
+        return f"http://{self._server.server_address[0]}:{self.port}{self.path}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open_browser(self, url):
+        """Open the authorization page, also logging the URL for headless hosts."""
+        print(f"🌐 Autorize em / Authorize at: {url}", file=sys.stderr)
+        webbrowser.open(url)
+
+    def wait(self, timeout=300):
+        """Block until the redirect arrives; return the code or None on timeout/error.
+
+        Also returns early when the active call is cancelled or its deadline
+        comes first.
+        """
+        deadline = current_deadline()
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+            deadline.on_cancel(self._received.set)
+        try:
+            self._received.wait(timeout)
+        finally:
+            if deadline is not None:
+                deadline.remove_callback(self._received.set)
+        if self.code is None and deadline is not None and deadline.cancelled:
+            self.error = deadline.reason
+        return self.code
+
+    async def wait_async(self, timeout=300):
+        """Await the redirect without blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, bind_context(self.wait), timeout)
+
+    def _handler_class(self):
+        callback = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urllib.parse.urlparse(self.path)
+                if parsed.path != callback.path:
+                    # Browsers also ask for /favicon.ico
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                query = urllib.parse.parse_qs(parsed.query)
+                if query.get('state', [None])[0] != callback.state:
+                    # Not the redirect we are waiting for: keep waiting
+                    self.send_response(400)
+                    self.send_header('Content-type', 'text/html; charset=utf-8')
+                    self.end_headers()
+                    self.wfile.write(ERROR_PAGE.format(error="state mismatch").encode())
+                    return
+                if 'code' in query:
+                    callback.code = query['code'][0]
+                else:
+                    callback.error = query.get('error_description', query.get('error', ['no code']))[0]
+
+                self.send_response(200 if callback.code else 400)
+                self.send_header('Content-type', 'text/html; charset=utf-8')
+                self.end_headers()
+                page = SUCCESS_PAGE if callback.code else ERROR_PAGE.format(error=html.escape(callback.error))
+                self.wfile.write(page.encode())
+                callback._received.set()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,77 @@
+"""
+Per-call capture of plugin output.
+
+Plugins report results with print(). contextlib.redirect_stdout swaps the
+process-wide sys.stdout, so two commands running at once in different
+threads would mix their output. capture_output() installs a proxy once and
+routes writes to a target kept in a context variable instead, so worker
+threads started through bind_context() print into their caller's capture.
+
+Writes made outside any capture (threads started without the caller's
+context, such as background cache refreshes) go to the proxy's default
+stream. Servers that speak a protocol on stdout call route_uncaptured()
+to send those to stderr and write their own messages to the stream it
+returns.
+
+Usage:
+    buffer = io.StringIO()
+    with capture_output(buffer):
+        plugin.run(command, *args)
+    text = buffer.getvalue()
+"""
+
+import contextlib
+import contextvars
+import sys
+import threading
+
+_target = contextvars.ContextVar('fetcher_output_target', default=None)
+
+
+class _ContextStdout:
+    """sys.stdout replacement that writes to the current context's target."""
+
+    def __init__(self, default):
+        self._default = default
+        self._stdout = default
+
+    def _current(self):
+        return _target.get() or self._default
+
+    def write(self, text):
+        return self._current().write(text)
+
+    def flush(self):
+        return self._current().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._current(), name)
+
+
+_install_lock = threading.Lock()
+
+
+def _proxy():
+    """Install the context proxy as sys.stdout if it is not already."""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ContextStdout):
+            sys.stdout = _ContextStdout(sys.stdout)
+        return sys.stdout
+
+
+def route_uncaptured(stream):
+    """Send prints made outside capture_output() to `stream`; returns the real stdout."""
+    proxy = _proxy()
+    proxy._default = stream
+    return proxy._stdout
+
+
+@contextlib.contextmanager
+def capture_output(target):
+    """Send everything printed in the current context (and contexts bound from it) to `target`."""
+    _proxy()
+    token = _target.set(target)
+    try:
+        yield target
+    finally:
+        _target.reset(token)
@@ -1,11 +1,32 @@
 import os
 import importlib
+import io
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+
+# Load .env before this module or any plugin reads its settings at import time
+load_dotenv()
+
+from .context import bind_context
+from .deadline import Deadline, current_deadline, deadline_scope
+from .output_capture import capture_output
 from .plugin_interface import PluginInterface
+from .tracing import tracer
+
+# Calls run_many lets run at once against a single plugin
+PLUGIN_CONCURRENCY = int(os.getenv('FETCHER_PLUGIN_CONCURRENCY', '4'))
+
+# Seconds run_many waits for each call once it has started
+RUN_MANY_TIMEOUT = float(os.getenv('FETCHER_RUN_MANY_TIMEOUT', '30'))
 
 class PluginManager:
     def __init__(self):
         self.plugins = {}
+        self._semaphores = {}
+        self._semaphores_lock = threading.Lock()
 
     def load_plugins(self):
         plugin_dir = os.path.dirname(__file__)
@@ -35,7 +56,8 @@ class PluginManager:
             if command is None:
                 self.plugins[plugin_name].list_commands()
             else:
-                self.plugins[plugin_name].run(command, *args, **kwargs)
+                with tracer.start_span(f"{plugin_name}.{command}", **{'fetcher.plugin': plugin_name, 'fetcher.command': command}):
+                    self.plugins[plugin_name].run(command, *args, **kwargs)
         else:
             print(f"Plugin '{plugin_name}' not found")
             print("Available plugins:")
@@ -46,12 +68,112 @@ class PluginManager:
         if plugin_name in self.plugins:
             plugin = self.plugins[plugin_name]
             if hasattr(plugin, command):
-                return getattr(plugin, command)(*args, **kwargs)
+                with tracer.start_span(f"{plugin_name}.{command}", **{'fetcher.plugin': plugin_name, 'fetcher.command': command}):
+                    return getattr(plugin, command)(*args, **kwargs)
             else:
                 print(f"Command '{command}' not found in plugin '{plugin_name}'")
         else:
             print(f"Plugin '{plugin_name}' not found")
 
+    def execute(self, plugin_name, command, *args):
+        """Run a command with its output captured; return a JSON-serializable result."""
+        result = {"plugin": plugin_name, "command": command, "args": list(args)}
+        start = time.perf_counter()
+        output = io.StringIO()
+        try:
+            if plugin_name not in self.plugins:
+                raise ValueError(f"Plugin '{plugin_name}' not found")
+            with capture_output(output), \
+                    tracer.start_span(f"{plugin_name}.{command}", **{'fetcher.plugin': plugin_name, 'fetcher.command': command}):
+                value = self.plugins[plugin_name].run(command, *args)
+            result.update(status="ok", result=None if value is None else str(value))
+        except Exception as e:
+            result.update(status="error", error=str(e))
+        result["output"] = output.getvalue()
+        result["elapsed"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def _semaphore(self, plugin_name, limit):
+        with self._semaphores_lock:
+            if plugin_name not in self._semaphores:
+                self._semaphores[plugin_name] = threading.BoundedSemaphore(limit)
+            return self._semaphores[plugin_name]
+
+    def run_many(self, calls, timeout=RUN_MANY_TIMEOUT, max_per_plugin=PLUGIN_CONCURRENCY):
+        """Run (plugin, command, args) calls concurrently, yielding results as they complete.
+
+        Each plugin runs at most `max_per_plugin` calls at once (shared by
+        every run_many caller), and a call that runs longer than `timeout`
+        seconds is reported as timed out and cancelled: its next HTTP request
+        fails fast and an in-flight response is closed.
+        Calls may also be dicts with plugin/command/args and an own timeout.
+        Every result carries the `index` of its call.
+        """
+        specs = []
+        for call in calls:
+            if isinstance(call, dict):
+                specs.append((call["plugin"], call["command"], list(call.get("args") or []), call.get("timeout", timeout)))
+            else:
+                plugin_name, command, *rest = call
+                specs.append((plugin_name, command, list(rest[0]) if rest else [], timeout))
+        if not specs:
+            return
+
+        started = {}
+        parent = current_deadline()
+        deadlines = {}
+
+        def run_call(index, plugin_name, command, args, call_timeout):
+            with self._semaphore(plugin_name, max_per_plugin):
+                # Timing out cancels the call, stopping its HTTP requests
+                deadline = deadlines[index] = Deadline(timeout=call_timeout, parent=parent)
+                started[index] = time.monotonic()
+                try:
+                    with deadline_scope(deadline):
+                        return self.execute(plugin_name, command, *args)
+                finally:
+                    deadline.detach()
+
+        executor = ThreadPoolExecutor(max_workers=min(len(specs), 32), thread_name_prefix='run-many')
+        try:
+            futures = {
+                executor.submit(bind_context(run_call), index, plugin_name, command, args, call_timeout): index
+                for index, (plugin_name, command, args, call_timeout) in enumerate(specs)
+            }
+            pending = set(futures)
+            while pending:
+                # Wait until the next completion or the nearest deadline of a started call
+                now = time.monotonic()
+                expiries = [
+                    started[futures[future]] + specs[futures[future]][3]
+                    for future in pending
+                    if futures[future] in started and specs[futures[future]][3]
+                ]
+                queued = any(futures[future] not in started for future in pending)
+                wait_for = max(0.0, min(expiries) - now) if expiries else None
+                if queued:
+                    wait_for = 0.1 if wait_for is None else min(wait_for, 0.1)
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield dict(future.result(), index=futures[future])
+
+                now = time.monotonic()
+                for future in list(pending):
+                    index = futures[future]
+                    plugin_name, command, args, call_timeout = specs[index]
+                    if index in started and call_timeout and now - started[index] >= call_timeout:
+                        pending.discard(future)
+                        if index in deadlines:
+                            deadlines[index].cancel("timeout")
+                        yield {
+                            "index": index, "plugin": plugin_name, "command": command, "args": args,
+                            "status": "timeout", "error": f"Timed out after {call_timeout}s",
+                            "output": "", "elapsed": round(now - started[index], 3)
+                        }
+        finally:
+            executor.shutdown(wait=False)
+
     def load(self):
         self.load_plugins()
 
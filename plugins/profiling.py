@@ -0,0 +1,79 @@
+"""
+Opt-in cProfile profiling of single command invocations.
+
+Profiling is enabled for one call by `fetcher.py --profile ...`, by
+`"_meta": {"profile": true}` on an MCP tools/call request, or for every call
+with FETCHER_PROFILE=1. Each profiled call writes a .prof file to
+FETCHER_PROFILE_DIR (default: <cache dir>/profiles) and logs a top-N summary
+of hot functions at debug level.
+
+cProfile only sees the calling thread, so time spent in fan-out worker
+threads shows up as waiting in the executor.
+
+Inspect a profile with:
+    python3 -m pstats <file>.prof
+"""
+
+import contextlib
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import time
+
+from .storage import cache_path
+
+logger = logging.getLogger(__name__)
+
+TOP_FUNCTIONS = int(os.getenv('FETCHER_PROFILE_TOP', '25'))
+
+
+class ProfileResult:
+    """Where a profile was written and its top-N summary."""
+
+    def __init__(self):
+        self.path = None
+        self.summary = None
+
+
+def should_profile(requested=False):
+    """True if profiling was requested for this call or enabled globally."""
+    return bool(requested) or os.getenv('FETCHER_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+
+def _profile_path(name):
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+    filename = f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{time.perf_counter_ns() % 1000000}.prof"
+    directory = os.getenv('FETCHER_PROFILE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, filename)
+    return cache_path('profiles', filename)
+
+
+@contextlib.contextmanager
+def profile_call(name, top=TOP_FUNCTIONS):
+    """Profile the enclosed block and yield a ProfileResult filled in on exit."""
+    result = ProfileResult()
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiler is already active in this interpreter
+        logger.warning(f"⚠️  Profiling skipped for {name}: {e}")
+        yield result
+        return
+
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        result.path = _profile_path(name)
+        profiler.dump_stats(result.path)
+
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(top)
+        result.summary = output.getvalue().strip()
+        logger.debug(f"📊 Profile for {name} saved to {result.path}\n{result.summary}")
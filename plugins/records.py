@@ -0,0 +1,194 @@
+"""
+Compact record types for high-volume entities.
+
+Plugins build these from API responses instead of holding on to the raw
+nested dicts, which carry dozens of keys per entity. Every record uses
+__slots__ and interns the values that repeat across a result set (logins,
+labels, states, languages, artist names, list ids), so tens of thousands of
+issues or cards fit in a fraction of the memory.
+
+Usage:
+    issues = [Issue.from_api(item, repo="owner/repo") for item in payload]
+    issues[0].user, issues[0].labels
+    issues[0].to_dict()
+"""
+
+import sys
+
+
+def _intern(value):
+    """Intern a string value, leaving None and other types untouched."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def _intern_tuple(values):
+    """Intern every string of an iterable and freeze it into a tuple."""
+    return tuple(sys.intern(value) for value in values if value)
+
+
+def _login(user):
+    """Extract the interned login of a GitHub user object."""
+    return _intern(user.get('login')) if user else None
+
+
+class Record:
+    """Base class for slotted records."""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def to_dict(self):
+        """Return the record as a plain dict."""
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, tuple) and value and isinstance(value[0], Record):
+                value = [item.to_dict() for item in value]
+            result[name] = value
+        return result
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:3])
+        return f"{self.__class__.__name__}({fields})"
+
+
+class Issue(Record):
+    """A GitHub issue or pull request."""
+
+    __slots__ = (
+        'repo', 'number', 'title', 'state', 'user', 'labels', 'assignee',
+        'comments', 'created_at', 'updated_at', 'closed_at', 'body',
+        'html_url', 'is_pull_request'
+    )
+
+    @classmethod
+    def from_api(cls, data, repo=None):
+        """Build an issue from a `repos/{repo}/issues` item."""
+        return cls(
+            repo=_intern(repo),
+            number=data.get('number'),
+            title=data.get('title'),
+            state=_intern(data.get('state')),
+            user=_login(data.get('user')),
+            labels=_intern_tuple(label.get('name') for label in data.get('labels') or ()),
+            assignee=_login(data.get('assignee')),
+            comments=data.get('comments', 0),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at'),
+            closed_at=data.get('closed_at'),
+            body=data.get('body'),
+            html_url=data.get('html_url'),
+            is_pull_request='pull_request' in data
+        )
+
+
+class Repo(Record):
+    """A GitHub repository."""
+
+    __slots__ = (
+        'full_name', 'name', 'owner', 'description', 'language',
+        'stargazers_count', 'forks_count', 'watchers_count',
+        'open_issues_count', 'topics', 'private', 'license',
+        'created_at', 'updated_at', 'html_url'
+    )
+
+    @classmethod
+    def from_api(cls, data):
+        """Build a repository from a `repos`, `users/{user}/repos` or search item."""
+        license_info = data.get('license') or {}
+        return cls(
+            full_name=data.get('full_name'),
+            name=data.get('name'),
+            owner=_login(data.get('owner')),
+            description=data.get('description'),
+            language=_intern(data.get('language')),
+            stargazers_count=data.get('stargazers_count', 0),
+            forks_count=data.get('forks_count', 0),
+            watchers_count=data.get('watchers_count', 0),
+            open_issues_count=data.get('open_issues_count', 0),
+            topics=_intern_tuple(data.get('topics') or ()),
+            private=bool(data.get('private')),
+            license=_intern(license_info.get('name')),
+            created_at=data.get('created_at'),
+            updated_at=data.get('updated_at'),
+            html_url=data.get('html_url')
+        )
+
+
+class Track(Record):
+    """A Spotify track."""
+
+    __slots__ = ('id', 'name', 'artists', 'album', 'duration_ms', 'url', 'played_at')
+
+    @classmethod
+    def from_api(cls, data, played_at=None):
+        """Build a track from a Spotify track object."""
+        return cls(
+            id=data.get('id'),
+            name=data.get('name'),
+            artists=_intern_tuple(artist.get('name') for artist in data.get('artists') or ()),
+            album=_intern((data.get('album') or {}).get('name')),
+            duration_ms=data.get('duration_ms'),
+            url=(data.get('external_urls') or {}).get('spotify'),
+            played_at=played_at
+        )
+
+
+class Playlist(Record):
+    """A Spotify playlist, optionally carrying its tracks."""
+
+    __slots__ = ('id', 'name', 'description', 'owner', 'tracks_total', 'url', 'tracks')
+
+    @classmethod
+    def from_api(cls, data):
+        """Build a playlist from a Spotify playlist object."""
+        tracks_info = data.get('tracks') or {}
+        tracks = tuple(
+            Track.from_api(item['track'])
+            for item in tracks_info.get('items') or ()
+            if item.get('track')
+        )
+        return cls(
+            id=data.get('id'),
+            name=data.get('name'),
+            description=data.get('description'),
+            owner=_intern((data.get('owner') or {}).get('display_name')),
+            tracks_total=tracks_info.get('total', 0),
+            url=(data.get('external_urls') or {}).get('spotify'),
+            tracks=tracks
+        )
+
+
+class Card(Record):
+    """A Trello card."""
+
+    __slots__ = (
+        'id', 'name', 'desc', 'id_list', 'id_board', 'labels', 'due',
+        'closed', 'date_last_activity', 'url'
+    )
+
+    @classmethod
+    def from_api(cls, data):
+        """Build a card from a Trello card object."""
+        return cls(
+            id=data.get('id'),
+            name=data.get('name'),
+            desc=data.get('desc'),
+            id_list=_intern(data.get('idList')),
+            id_board=_intern(data.get('idBoard')),
+            labels=_intern_tuple(label.get('name') for label in data.get('labels') or ()),
+            due=data.get('due'),
+            closed=bool(data.get('closed')),
+            date_last_activity=data.get('dateLastActivity'),
+            url=data.get('url')
+        )
@@ -0,0 +1,75 @@
+"""
+Compact, persisted index of GitHub repositories.
+
+Repository listings (org enumerations, user listings) feed the index, and
+later `repo` lookups are answered from it while the entry is fresh. The
+index is kept in memory as slotted Repo records and stored on disk as one
+positional row per repository, so thousands of repositories stay small.
+"""
+
+import json
+import sys
+import threading
+import time
+
+from .records import Repo
+from .storage import atomic_write, cache_path, load_json
+
+INDEX_VERSION = 1
+
+
+class RepoIndex:
+    """Repository records keyed by lowercase full name, with a freshness TTL."""
+
+    def __init__(self, path=None, ttl=3600):
+        self.path = path or cache_path('github', 'repo_index.json')
+        self.ttl = ttl
+        self._repos = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        data = load_json(self.path)
+        if not data or data.get('version') != INDEX_VERSION or data.get('fields') != list(Repo.__slots__):
+            return
+        for row in data['rows']:
+            fetched_at, values = row[0], row[1:]
+            fields = dict(zip(Repo.__slots__, values))
+            fields['topics'] = tuple(sys.intern(topic) for topic in fields['topics'] or ())
+            for name in ('owner', 'language', 'license'):
+                if fields[name]:
+                    fields[name] = sys.intern(fields[name])
+            repo = Repo(**fields)
+            self._repos[repo.full_name.lower()] = (fetched_at, repo)
+
+    def save(self):
+        """Persist the index to disk."""
+        with self._lock:
+            rows = [
+                [fetched_at] + [getattr(repo, name) for name in Repo.__slots__]
+                for fetched_at, repo in self._repos.values()
+            ]
+        data = {'version': INDEX_VERSION, 'fields': list(Repo.__slots__), 'rows': rows}
+        atomic_write(self.path, json.dumps(data, separators=(',', ':')))
+
+    def update(self, repos, save=True):
+        """Add or refresh repositories in the index."""
+        now = time.time()
+        with self._lock:
+            for repo in repos:
+                self._repos[repo.full_name.lower()] = (now, repo)
+        if save:
+            self.save()
+
+    def get(self, full_name):
+        """Return the indexed repository if it is still fresh, otherwise None."""
+        entry = self._repos.get(full_name.lower())
+        if entry is None:
+            return None
+        fetched_at, repo = entry
+        if time.time() - fetched_at > self.ttl:
+            return None
+        return repo
+
+    def __len__(self):
+        return len(self._repos)
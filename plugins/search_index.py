@@ -0,0 +1,354 @@
+"""
+Local full-text index over fetched GitHub issues, Trello cards and Spotify playlists.
+
+The plugins feed every issue, card and playlist they fetch into this index,
+so questions like "which issue mentioned X" are answered locally (BM25
+ranked, in milliseconds) instead of through another GitHub search call or a
+Trello board refetch. Documents are replaced when fetched again; the index
+is persisted under the cache directory shortly after it changes (one write
+for a burst of fetches, off the fetching threads) and reloaded when another
+process changes it.
+
+Usage:
+    get_index().add(issue_doc(issue) for issue in issues)
+    get_index().search("timeout retry", type='issue', repo='owner/repo', limit=10)
+"""
+
+import atexit
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+from .storage import atomic_write, cache_path, load_json
+
+INDEX_VERSION = 1
+
+# BM25 parameters; title terms count TITLE_WEIGHT times
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2
+
+# Seconds to wait for more changes before writing the index out together
+SAVE_DELAY = float(os.getenv('FETCHER_SEARCH_SAVE_DELAY', '2'))
+
+# Metadata fields usable as query filters (`field:value`)
+FILTER_FIELDS = ('type', 'source', 'repo', 'state', 'label', 'board', 'list', 'author')
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the this to was were will with "
+    "o os as um uma de da do das dos e em no na nos nas para por com que se".split()
+)
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords."""
+    if not text:
+        return []
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def issue_doc(issue):
+    """Index document for a GitHub Issue record."""
+    return {
+        'id': f"github:{issue.repo}#{issue.number}",
+        'type': 'pull' if issue.is_pull_request else 'issue',
+        'source': 'github',
+        'title': issue.title,
+        'text': issue.body,
+        'repo': issue.repo,
+        'state': issue.state,
+        'label': list(issue.labels or ()),
+        'author': issue.user,
+        'updated_at': issue.updated_at,
+        'url': issue.html_url
+    }
+
+
+def comment_doc(repo, number, comment):
+    """Index document for a GitHub issue comment (API or webhook comment object)."""
+    return {
+        'id': f"github:{repo}#{number}/comment/{comment['id']}",
+        'type': 'comment',
+        'source': 'github',
+        'title': f"Comment on {repo}#{number}",
+        'text': comment.get('body'),
+        'repo': repo,
+        'author': (comment.get('user') or {}).get('login'),
+        'updated_at': comment.get('updated_at') or comment.get('created_at'),
+        'url': comment.get('html_url')
+    }
+
+
+def card_doc(card, list_name=None):
+    """Index document for a Trello Card record."""
+    return {
+        'id': f"trello:{card.id}",
+        'type': 'card',
+        'source': 'trello',
+        'title': card.name,
+        'text': card.desc,
+        'board': card.id_board,
+        'list': list_name or card.id_list,
+        'state': 'closed' if card.closed else 'open',
+        'label': list(card.labels or ()),
+        'updated_at': card.date_last_activity,
+        'url': card.url
+    }
+
+
+def playlist_doc(playlist):
+    """Index document for a Spotify Playlist record (with its tracks, when loaded)."""
+    tracks = " ".join(
+        f"{track.name} {' '.join(track.artists or ())} {track.album or ''}" for track in playlist.tracks or ()
+    )
+    return {
+        'id': f"spotify:{playlist.id}",
+        'type': 'playlist',
+        'source': 'spotify',
+        'title': playlist.name,
+        'text': f"{playlist.description or ''} {tracks}".strip(),
+        'author': playlist.owner,
+        'url': playlist.url
+    }
+
+
+class SearchIndex:
+    """BM25 inverted index of small documents keyed by id."""
+
+    def __init__(self, path=None, delay=SAVE_DELAY):
+        self.path = path or cache_path('search', 'index.json')
+        self.delay = delay
+        self._docs = {}
+        self._postings = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._mtime = None
+        # Changes not written yet: id -> document, or None when removed
+        self._unsaved = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        with self._lock:
+            self._reload_if_changed()
+        atexit.register(self.flush)
+
+    def _reload_if_changed(self):
+        """Re-read the index file when another process saved it (caller holds the lock)."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        data = load_json(self.path)
+        self._mtime = mtime
+        if not data or data.get('version') != INDEX_VERSION:
+            return
+        self._docs, self._postings, self._lengths, self._total_length = {}, {}, {}, 0
+        for doc in data['docs']:
+            self._insert(doc)
+        # Keep this process's changes that are not on disk yet
+        for key, doc in self._unsaved.items():
+            if doc is not None:
+                self._insert(doc)
+            elif key in self._docs:
+                self._remove(key)
+
+    def _terms(self, doc):
+        terms = Counter(tokenize(doc.get('text')))
+        for token in tokenize(doc.get('title')):
+            terms[token] += TITLE_WEIGHT
+        return terms
+
+    def _insert(self, doc):
+        key = doc['id']
+        if key in self._docs:
+            self._remove(key)
+        terms = self._terms(doc)
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[key] = count
+        self._docs[key] = doc
+        self._lengths[key] = sum(terms.values())
+        self._total_length += self._lengths[key]
+
+    def _remove(self, key):
+        doc = self._docs.pop(key)
+        for term in self._terms(doc):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(key)
+
+    def _put(self, doc):
+        """Insert a changed document and remember it for the next save (caller holds the lock)."""
+        if self._docs.get(doc['id']) == doc:
+            return False
+        self._insert(doc)
+        self._unsaved[doc['id']] = doc
+        return True
+
+    def _schedule_save(self):
+        """Save once no more changes arrive for `delay` seconds (caller holds the lock)."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def add(self, docs, save=True):
+        """Add or replace documents; returns how many were indexed.
+
+        Unchanged documents are skipped. With save=True the index is written
+        shortly after, together with other changes; with save=False the
+        caller saves.
+        """
+        count = changed = 0
+        with self._lock:
+            self._reload_if_changed()
+            for doc in docs:
+                changed += self._put(doc)
+                count += 1
+            if changed and save:
+                self._schedule_save()
+        return count
+
+    def get(self, key):
+        """A copy of an indexed document, or None."""
+        with self._lock:
+            self._reload_if_changed()
+            doc = self._docs.get(key)
+            return dict(doc) if doc is not None else None
+
+    def update(self, key, fields, default=None, save=True):
+        """Change fields of a document in place; indexes `default` merged with fields if it is unknown.
+
+        Returns False when the document is unknown and no default was given.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            doc = self._docs.get(key)
+            if doc is None and default is None:
+                return False
+            if self._put(dict(doc if doc is not None else default, **fields, id=key)) and save:
+                self._schedule_save()
+        return True
+
+    def remove(self, keys, save=True):
+        """Drop documents; returns how many existed."""
+        removed = 0
+        with self._lock:
+            self._reload_if_changed()
+            for key in keys:
+                if key in self._docs:
+                    self._remove(key)
+                    self._unsaved[key] = None
+                    removed += 1
+            if removed and save:
+                self._schedule_save()
+        return removed
+
+    def save(self):
+        """Persist the documents now (postings are rebuilt on load)."""
+        with self._save_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                docs = list(self._docs.values())
+                unsaved, self._unsaved = self._unsaved, {}
+            # Documents are replaced, never mutated, so the snapshot is serialized without the lock
+            try:
+                atomic_write(self.path, json.dumps({'version': INDEX_VERSION, 'docs': docs}, separators=(',', ':')))
+            except BaseException:
+                with self._lock:
+                    self._unsaved = dict(unsaved, **self._unsaved)
+                raise
+            with self._lock:
+                self._mtime = os.stat(self.path).st_mtime_ns
+
+    def flush(self):
+        """Write pending changes now, if there are any."""
+        if self._unsaved or self._timer is not None:
+            self.save()
+
+    def search(self, query, limit=10, since=None, **filters):
+        """BM25-ranked documents matching `query` and the metadata filters.
+
+        Filters compare case-insensitively against the field (any element of
+        list fields such as label); `since` keeps documents updated at or
+        after an ISO date. An empty query lists matching documents by recency.
+        """
+        filters = {name: str(value).lower() for name, value in filters.items() if value}
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+
+        def accepted(doc):
+            if since and (doc.get('updated_at') or '') < since:
+                return False
+            for name, wanted in filters.items():
+                value = doc.get(name)
+                values = value if isinstance(value, list) else [value]
+                if not any(item is not None and str(item).lower() == wanted for item in values):
+                    return False
+            return True
+
+        with self._lock:
+            self._reload_if_changed()
+            terms = tokenize(query)
+            if not terms:
+                docs = (doc for doc in self._docs.values() if accepted(doc))
+                recent = heapq.nlargest(limit, docs, key=lambda doc: doc.get('updated_at') or '')
+                return [dict(doc, score=0.0) for doc in recent]
+
+            total = len(self._docs)
+            average = self._total_length / total if total else 0
+            scores = {}
+            for term in set(terms):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    norm = K1 * (1 - B + B * self._lengths[key] / average)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+            ranked = heapq.nlargest(
+                limit,
+                ((score, key) for key, score in scores.items() if accepted(self._docs[key]))
+            )
+            return [dict(self._docs[key], score=round(score, 4)) for score, key in ranked]
+
+    def __len__(self):
+        return len(self._docs)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def index_pages(pages, to_doc):
+    """Pass pages of raw API items through, indexing each item; saves once at the end."""
+    index = get_index()
+    try:
+        for page in pages:
+            index.add((to_doc(item) for item in page), save=False)
+            yield page
+    finally:
+        # Also when the consumer stops early or fails: keep what was indexed
+        index.flush()
+
+
+def get_index():
+    """The process-wide SearchIndex, loaded on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
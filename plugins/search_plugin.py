@@ -0,0 +1,101 @@
+"""
+Search Plugin for Fetcher
+
+Searches the local index of everything the other plugins fetched (GitHub
+issues, Trello cards, Spotify playlists) without calling any API.
+
+Commands:
+    test - Show index statistics
+    local - Search fetched items: local [query] [field:value ...] [limit:N] [since:YYYY-MM-DD]
+
+Filters: type (issue, pull, comment, card, playlist), source, repo, state, label,
+board, list, author. Example:
+    local "login timeout" type:issue repo:owner/repo label:bug limit:5
+"""
+
+import time
+
+from .plugin_interface import PluginInterface
+from .search_index import FILTER_FIELDS, get_index
+
+
+class Plugin(PluginInterface):
+    def __init__(self):
+        self._commands = {
+            "test": "Show local search index statistics",
+            "local": "Search fetched issues, cards and playlists: local [query] [field:value ...] [limit:N] [since:YYYY-MM-DD]"
+        }
+
+    def list_commands(self):
+        """List all available plugin commands."""
+        print("Available commands:")
+        for cmd, desc in self._commands.items():
+            print(f"  - {cmd}: {desc}")
+
+    def _parse(self, args):
+        """Split arguments into query words and field:value filters."""
+        words, filters, limit, since = [], {}, 10, None
+        # MCP clients may send the whole query as one argument
+        for arg in (part for arg in args for part in arg.split()):
+            name, sep, value = arg.partition(':')
+            if sep and name == 'limit' and value.isdigit():
+                limit = int(value)
+            elif sep and name == 'since':
+                since = value
+            elif sep and name in FILTER_FIELDS:
+                filters[name] = value
+            else:
+                words.append(arg)
+        return " ".join(words), filters, limit, since
+
+    def search_local(self, *args):
+        """Search the local index and print ranked results."""
+        query, filters, limit, since = self._parse(args)
+        start = time.perf_counter()
+        try:
+            results = get_index().search(query, limit=limit, since=since, **filters)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if not results:
+            print(f"\n🔍 Nenhum resultado / No results for '{query}' ({len(get_index())} indexed items)")
+            print("💡 Fetch issues, boards or playlists first to add them to the index")
+            return []
+
+        print(f"\n🔍 {len(results)} result(s) for '{query}' ({elapsed_ms:.1f} ms):")
+        for i, doc in enumerate(results, 1):
+            where = doc.get('repo') or doc.get('board') or doc.get('author') or doc['source']
+            print(f"\n{i}. [{doc['type']}] {doc.get('title') or '(untitled)'}")
+            print(f"   📍 {where}" + (f" · {doc['state']}" if doc.get('state') else ""))
+            if doc.get('label'):
+                print(f"   🔖 {', '.join(doc['label'])}")
+            if doc.get('updated_at'):
+                print(f"   🔄 {doc['updated_at']}")
+            if doc.get('url'):
+                print(f"   🔗 {doc['url']}")
+            if query:
+                print(f"   ⭐ Score: {doc['score']}")
+        return results
+
+    def test(self):
+        """Show index statistics."""
+        index = get_index()
+        print("Testing search plugin...")
+        print(f"\n📚 Indexed items: {len(index)}")
+        print(f"💾 Index file: {index.path}")
+
+    def run(self, command: str, *args, **kwargs):
+        """Execute a specific plugin command."""
+        if command == "test":
+            self.test()
+        elif command == "local":
+            self.search_local(*args)
+        else:
+            print(f"Unknown command: {command}")
+            self.list_commands()
+
+def plugin():
+    """Create and return a new plugin instance."""
+    return Plugin()
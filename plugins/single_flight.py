@@ -0,0 +1,74 @@
+"""
+Collapse concurrent calls for the same key into one execution.
+
+When several tool calls need the same token refresh at once, only the first
+caller (the leader) runs it; the others block until it finishes and get the
+same result or exception. A waiting caller still honours its own deadline:
+it stops waiting (and raises) when its call is cancelled or out of time.
+
+Usage:
+    token = token_refresh.do(('spotify', self.client_id), self._refresh_access_token)
+"""
+
+import threading
+
+from .deadline import current_deadline
+
+# Seconds a follower waits between checks of its deadline
+WAIT_SLICE = 0.1
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'owner')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.owner = threading.get_ident()
+
+
+class SingleFlight:
+    """At most one in-flight call per key; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.owner == threading.get_ident():
+                # Re-entered from inside the leader's own call: waiting would deadlock
+                return fn(*args, **kwargs)
+            deadline = current_deadline()
+            while not call.done.wait(WAIT_SLICE if deadline is not None else None):
+                deadline.check()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self, key):
+        """True while a call for `key` is running."""
+        with self._lock:
+            return key in self._calls
+
+
+# Shared by plugins so each credential has at most one refresh in flight
+token_refresh = SingleFlight()
@@ -5,40 +5,45 @@ Just run 'spotify me' to see your profile
 
 import base64
 import getpass
-import http.server
 import json
 import os
 import re
-import socket
-import socketserver
 import threading
 import time
 import urllib.parse
 import uuid
-import webbrowser
 from datetime import datetime, timedelta
-from threading import Thread
 
-import psutil
-import requests
 from dotenv import load_dotenv
 
+from .credential_store import credentials
+from .endpoints import endpoints
+from .http_session import create_session
+from .metrics import registry
+from .oauth_callback import OAuthCallbackServer
 from .plugin_interface import PluginInterface
+from .records import Playlist, Track
+from .search_index import get_index, playlist_doc
+from .single_flight import token_refresh
+from .swr_cache import swr
 
 # Load environment variables
 load_dotenv()
 
+SPOTIFY_ENDPOINTS = ('spotify', 'spotify_accounts', 'spotify_web', 'spotify_clienttoken', 'spotify_spclient')
+
 class Plugin(PluginInterface):
     def __init__(self):
-        self.base_url = "https://api.spotify.com/v1"
-        self.auth_url = "https://accounts.spotify.com/api/token"
-        self.authorize_url = "https://accounts.spotify.com/authorize"
+        self.base_url = endpoints.url('spotify')
+        self.auth_url = endpoints.url('spotify_accounts', 'api/token')
+        self.authorize_url = endpoints.url('spotify_accounts', 'authorize')
+        self.session = create_session('spotify', endpoints=SPOTIFY_ENDPOINTS)
         
         # Load credentials
         self.client_id = os.getenv('SPOTIFY_CLIENT_ID')
         self.client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
-        self.access_token = os.getenv('SPOTIFY_ACCESS_TOKEN')
-        self.token_expiry = os.getenv('SPOTIFY_TOKEN_EXPIRY')
+        self.access_token = credentials.get('SPOTIFY_ACCESS_TOKEN')
+        self.token_expiry = credentials.get('SPOTIFY_TOKEN_EXPIRY')
         self.client_token = os.getenv('SPOTIFY_CLIENT_TOKEN')  # Add client token
         
         if not self.client_id or not self.client_secret:
@@ -50,7 +55,9 @@ class Plugin(PluginInterface):
                 "\nin your .env file"
             )
             
-        self.redirect_uri = "http://127.0.0.1:3003/callback"
+        # Porta registrada no Spotify Developer Dashboard (0 = porta efêmera)
+        self.callback_port = int(os.getenv('SPOTIFY_PORT', '3003'))
+        self.redirect_uri = f"http://127.0.0.1:{self.callback_port}/callback"
         
         # Expanded command list
         self._commands = {
@@ -73,23 +80,9 @@ class Plugin(PluginInterface):
     def _save_token_to_env(self, access_token, expires_in):
         """Save access token and expiry time to .env file."""
         expiry_time = datetime.now() + timedelta(seconds=expires_in)
-        env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
-        
-        # Ler o arquivo atual
-        with open(env_path, 'r') as f:
-            lines = f.readlines()
-        
-        # Remover linhas antigas do token se existirem
-        lines = [l for l in lines if not l.startswith('SPOTIFY_ACCESS_TOKEN=') and 
-                not l.startswith('SPOTIFY_TOKEN_EXPIRY=')]
-        
-        # Adicionar novos valores
-        lines.append(f'SPOTIFY_ACCESS_TOKEN={access_token}\n')
-        lines.append(f'SPOTIFY_TOKEN_EXPIRY={expiry_time.isoformat()}\n')
         
-        # Salvar arquivo
-        with open(env_path, 'w') as f:
-            f.writelines(lines)
+        # Gravado em segundo plano pelo credential store / written in the background
+        credentials.set(SPOTIFY_ACCESS_TOKEN=access_token, SPOTIFY_TOKEN_EXPIRY=expiry_time.isoformat())
         
         # Atualizar variáveis da instância
         self.access_token = access_token
@@ -97,6 +90,9 @@ class Plugin(PluginInterface):
         
     def _is_token_valid(self):
         """Check if current token is valid."""
+        # Another process may have refreshed the token since we loaded it
+        self.access_token = credentials.get('SPOTIFY_ACCESS_TOKEN', self.access_token)
+        self.token_expiry = credentials.get('SPOTIFY_TOKEN_EXPIRY', self.token_expiry)
         if not self.access_token or not self.token_expiry:
             return False
             
@@ -107,101 +103,23 @@ class Plugin(PluginInterface):
                 
             # Testar o token com uma chamada simples à API
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = requests.get(f"{self.base_url}/me", headers=headers)
+            response = self.session.get(f"{self.base_url}/me", headers=headers)
             return response.status_code == 200
             
         except (ValueError, TypeError):
             return False
 
-    def _start_auth_server(self):
-        """Start local server to receive OAuth callback."""
-        class CallbackHandler(http.server.BaseHTTPRequestHandler):
-            def do_GET(self):
-                self.send_response(200)
-                self.send_header('Content-type', 'text/html')
-                self.end_headers()
-                
-                query_components = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
-                
-                if 'code' in query_components:
-                    # Store the auth code
-                    self.server.auth_code = query_components['code'][0]
-                    response = """
-                    <html><body>
-                        <h1>✅ Autorização concluída!</h1>
-                        <p>Você pode fechar esta janela e voltar ao terminal.</p>
-                    </body></html>
-                    """
-                else:
-                    response = """
-                    <html><body>
-                        <h1>❌ Erro na autorização</h1>
-                        <p>Por favor, tente novamente.</p>
-                    </body></html>
-                    """
-                
-                self.wfile.write(response.encode())
-                
-            def log_message(self, format, *args):
-                # Desabilita logs do servidor HTTP
-                pass
-
-        port = 3003  # Porta fixa que está configurada no Spotify Developer Dashboard
-        self.redirect_uri = f"http://127.0.0.1:{port}/callback"
-        
-        # Tentar matar qualquer processo que esteja usando a porta
-        try:
-            import psutil
-            for proc in psutil.process_iter():
-                try:
-                    connections = proc.connections()
-                    for conn in connections:
-                        if hasattr(conn, 'laddr') and isinstance(conn.laddr, tuple) and len(conn.laddr) >= 2:
-                            if conn.laddr[1] == port:
-                                print(f"\n🔄 Finalizando processo anterior na porta {port}...")
-                                proc.terminate()
-                                time.sleep(1)  # Esperar processo terminar
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
-        except Exception as e:
-            # Se psutil falhar, tentar socket
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(('127.0.0.1', port))
-                    s.close()
-            except socket.error:
-                print(f"\n⚠️ A porta {port} está em uso. Por favor, aguarde um momento e tente novamente.")
-                time.sleep(5)  # Dar tempo para o processo anterior terminar
-        
-        try:
-            # Create server
-            server = socketserver.TCPServer(("127.0.0.1", port), CallbackHandler)
-            server.auth_code = None
-            server.allow_reuse_address = True  # Permite reusar a porta se ela ainda estiver em TIME_WAIT
-            
-            # Start server in a thread
-            server_thread = Thread(target=server.serve_forever)
-            server_thread.daemon = True
-            server_thread.start()
-            
-            return server
-            
-        except Exception as e:
-            print(f"\n❌ Erro ao iniciar servidor: {str(e)}")
-            if "Address already in use" in str(e):
-                print("\nDica: Tente novamente em alguns segundos")
-            return None
-
     def _get_user_auth(self):
         """Get user authorization through OAuth flow."""
         print("\n🔄 Iniciando fluxo de autorização...")
         
         # Start local server
         try:
-            server = self._start_auth_server()
-        except Exception as e:
+            server = OAuthCallbackServer(port=self.callback_port).start()
+        except OSError as e:
             print(f"\n❌ Erro ao iniciar servidor local: {str(e)}")
             return None
+        self.redirect_uri = server.redirect_uri
         
         # Build authorization URL
         # Escopos oficiais do Spotify: https://developer.spotify.com/documentation/web-api/concepts/scopes
@@ -225,7 +143,8 @@ class Plugin(PluginInterface):
             'response_type': 'code',
             'redirect_uri': self.redirect_uri,
             'scope': scope,
-            'show_dialog': 'true'  # Força mostrar diálogo de autorização
+            'show_dialog': 'true',  # Força mostrar diálogo de autorização
+            'state': server.state
         }
         auth_url = f"{self.authorize_url}?{urllib.parse.urlencode(params)}"
         
@@ -237,22 +156,16 @@ class Plugin(PluginInterface):
         
         # Open browser for auth
         print("\n🌐 Abrindo navegador para autorização...")
-        webbrowser.open(auth_url)
+        server.open_browser(auth_url)
         
-        # Wait for callback
-        start_time = time.time()
-        while not server.auth_code and time.time() - start_time < 300:  # 5 min timeout
-            time.sleep(1)
-        
-        # Shutdown server
+        # Wait for callback (wakes as soon as the redirect arrives)
         try:
-            server.shutdown()
-            server.server_close()
-        except Exception as e:
-            print(f"\n⚠️ Erro ao fechar servidor: {str(e)}")
+            auth_code = server.wait(timeout=300)  # 5 min timeout
+        finally:
+            server.close()
         
-        if not server.auth_code:
-            print("\n❌ Timeout na autorização")
+        if not auth_code:
+            print(f"\n❌ Autorização não concluída: {server.error or 'timeout'}")
             return None
             
         # Exchange code for tokens
@@ -264,35 +177,22 @@ class Plugin(PluginInterface):
         }
         data = {
             'grant_type': 'authorization_code',
-            'code': server.auth_code,
+            'code': auth_code,
             'redirect_uri': self.redirect_uri
         }
         
         try:
-            response = requests.post('https://accounts.spotify.com/api/token', headers=headers, data=data)
+            response = self.session.post(self.auth_url, headers=headers, data=data)
             print(f"\nDebug token request:")
             print(f"Status code: {response.status_code}")
             print(f"Response: {response.text}")
             
             if response.status_code == 200:
                 data = response.json()
-                self.access_token = data['access_token']
                 
                 # Save tokens to env
-                env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
-                with open(env_path, 'r') as f:
-                    lines = f.readlines()
-                
-                # Remove old tokens
-                lines = [l for l in lines if not l.startswith(('SPOTIFY_ACCESS_TOKEN=', 'SPOTIFY_REFRESH_TOKEN='))]
-                
-                # Add new tokens
-                lines.append(f'SPOTIFY_ACCESS_TOKEN={data["access_token"]}\n')
-                if 'refresh_token' in data:
-                    lines.append(f'SPOTIFY_REFRESH_TOKEN={data["refresh_token"]}\n')
-                
-                with open(env_path, 'w') as f:
-                    f.writelines(lines)
+                self._save_token_to_env(data['access_token'], data.get('expires_in', 3600))
+                credentials.set(SPOTIFY_REFRESH_TOKEN=data.get('refresh_token'))
                 
                 print("\n✅ Autorização concluída!")
                 return self.access_token
@@ -307,6 +207,14 @@ class Plugin(PluginInterface):
             return None
 
     def _get_access_token(self):
+        """Get access token, sharing one refresh between concurrent callers.
+
+        Without this, calls arriving as the token expires would each POST a
+        refresh or even start their own OAuth callback server.
+        """
+        return token_refresh.do(('spotify', self.client_id), self._refresh_access_token)
+
+    def _refresh_access_token(self):
         """Get access token from Spotify API."""
         if not self.client_id or not self.client_secret:
             print("\n❌ SPOTIFY_CLIENT_ID e SPOTIFY_CLIENT_SECRET precisam estar definidos no .env")
@@ -319,13 +227,13 @@ class Plugin(PluginInterface):
                 'Authorization': f'Bearer {self.access_token}',
                 'Accept': 'application/json'
             }
-            response = requests.get('https://api.spotify.com/v1/me', headers=headers)
+            response = self.session.get(f"{self.base_url}/me", headers=headers)
             if response.status_code == 200:
                 return self.access_token
 
         # Token expirado ou não existe
         # Primeiro tenta refresh token
-        refresh_token = os.getenv('SPOTIFY_REFRESH_TOKEN')
+        refresh_token = credentials.get('SPOTIFY_REFRESH_TOKEN')
         if refresh_token:
             auth = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
             headers = {
@@ -336,18 +244,36 @@ class Plugin(PluginInterface):
                 'grant_type': 'refresh_token',
                 'refresh_token': refresh_token
             }
-            response = requests.post('https://accounts.spotify.com/api/token', headers=headers, data=data)
+            response = self.session.post(self.auth_url, headers=headers, data=data)
             if response.status_code == 200:
                 data = response.json()
-                self.access_token = data['access_token']
-                os.environ['SPOTIFY_ACCESS_TOKEN'] = self.access_token
-                if 'refresh_token' in data:  # Nem sempre retorna um novo refresh token
-                    os.environ['SPOTIFY_REFRESH_TOKEN'] = data['refresh_token']
+                self._save_token_to_env(data['access_token'], data.get('expires_in', 3600))
+                # Nem sempre retorna um novo refresh token
+                credentials.set(SPOTIFY_REFRESH_TOKEN=data.get('refresh_token'))
                 return self.access_token
 
         # Se não tem refresh token ou falhou, inicia fluxo OAuth
         return self._get_user_auth()
 
+    def _get_cached(self, name, path):
+        """GET a rarely-changing endpoint through the stale-while-revalidate cache.
+
+        Returns (data, error_response); error_response is only set when the
+        request ran in this call and failed.
+        """
+        failed = []
+
+        def fetch():
+            headers = {'Authorization': f'Bearer {self.access_token}'}
+            response = self.session.get(f"{self.base_url}{path}", headers=headers)
+            if response.status_code == 200:
+                return response.json()
+            failed.append(response)
+            return None
+
+        data = swr.get(name, fetch)
+        return data, failed[0] if failed else None
+
     def _get_user_id(self):
         """Get user ID from Spotify API."""
         if not self.access_token:
@@ -360,7 +286,7 @@ class Plugin(PluginInterface):
             'Accept': 'application/json'
         }
 
-        response = requests.get('https://api.spotify.com/v1/me', headers=headers)
+        response = self.session.get(f"{self.base_url}/me", headers=headers)
         
         if response.status_code == 200:
             data = response.json()
@@ -379,11 +305,9 @@ class Plugin(PluginInterface):
                 print("Failed to get access token")
                 return
 
-        headers = {'Authorization': f'Bearer {self.access_token}'}
-        response = requests.get(f"{self.base_url}/me", headers=headers)
+        user, response = self._get_cached('spotify.me', '/me')
 
-        if response.status_code == 200:
-            user = response.json()
+        if user is not None:
             print("\nYour Spotify Profile:")
             print(f"Name: {user.get('display_name')}")
             print(f"Email: {user.get('email')}")
@@ -393,13 +317,16 @@ class Plugin(PluginInterface):
             
             if user.get('images'):
                 print(f"Profile Image: {user['images'][0].get('url')}")
-        elif response.status_code == 401:
+        elif response is not None and response.status_code == 401:
             print("Token expired, getting new one...")
             self.access_token = None
+            registry.inc('fetcher_retries_total', plugin='spotify', reason='unauthorized')
             self.get_user_info()
-        else:
+        elif response is not None:
             print(f"Error: {response.status_code}")
             print(response.text)
+        else:
+            print("Error: failed to fetch profile")
 
     def search(self, query_type, query):
         """Search for tracks, artists, or albums."""
@@ -420,7 +347,7 @@ class Plugin(PluginInterface):
         }
         
         headers = {'Authorization': f'Bearer {self.access_token}'}
-        response = requests.get(f"{self.base_url}/search", headers=headers, params=params)
+        response = self.session.get(f"{self.base_url}/search", headers=headers, params=params)
 
         if response.status_code == 200:
             data = response.json()
@@ -459,20 +386,23 @@ class Plugin(PluginInterface):
             return
 
         headers = {'Authorization': f'Bearer {self.access_token}'}
-        response = requests.get(f"{self.base_url}/me/top/{item_type}", headers=headers)
+        response = self.session.get(f"{self.base_url}/me/top/{item_type}", headers=headers)
 
         if response.status_code == 200:
             items = response.json()['items']
+            if item_type == 'tracks':
+                items = [Track.from_api(item) for item in items]
             print(f"\n🌟 Your Top {item_type.title()}:")
             for i, item in enumerate(items, 1):
                 if item_type == 'tracks':
-                    print(f"\n{i}. 🎵 {item['name']}")
-                    print(f"   👤 {', '.join(artist['name'] for artist in item['artists'])}")
-                    print(f"   💿 {item['album']['name']}")
+                    print(f"\n{i}. 🎵 {item.name}")
+                    print(f"   👤 {', '.join(item.artists)}")
+                    print(f"   💿 {item.album}")
                 else:  # artists
                     print(f"\n{i}. 👤 {item['name']}")
                     print(f"   👥 Followers: {item['followers']['total']:,}")
                     print(f"   🎭 Genres: {', '.join(item['genres'])}")
+            return items
         else:
             print(f"\n❌ Error: {response.status_code}")
             print(response.text)
@@ -485,18 +415,21 @@ class Plugin(PluginInterface):
                 return
 
         headers = {'Authorization': f'Bearer {self.access_token}'}
-        response = requests.get(f"{self.base_url}/me/player/recently-played", headers=headers)
+        response = self.session.get(f"{self.base_url}/me/player/recently-played", headers=headers)
 
         if response.status_code == 200:
-            items = response.json()['items']
+            tracks = [
+                Track.from_api(item['track'], played_at=item['played_at'])
+                for item in response.json()['items']
+            ]
             print("\n🕒 Recently Played Tracks:")
-            for i, item in enumerate(items, 1):
-                track = item['track']
-                played_at = datetime.fromisoformat(item['played_at'].replace('Z', '+00:00'))
-                print(f"\n{i}. 🎵 {track['name']}")
-                print(f"   👤 {', '.join(artist['name'] for artist in track['artists'])}")
-                print(f"   💿 {track['album']['name']}")
+            for i, track in enumerate(tracks, 1):
+                played_at = datetime.fromisoformat(track.played_at.replace('Z', '+00:00'))
+                print(f"\n{i}. 🎵 {track.name}")
+                print(f"   👤 {', '.join(track.artists)}")
+                print(f"   💿 {track.album}")
                 print(f"   ⏰ Played: {played_at.strftime('%Y-%m-%d %H:%M:%S')}")
+            return tracks
         else:
             print(f"\n❌ Error: {response.status_code}")
             print(response.text)
@@ -508,20 +441,23 @@ class Plugin(PluginInterface):
             if not self.access_token:
                 return
 
-        headers = {'Authorization': f'Bearer {self.access_token}'}
-        response = requests.get(f"{self.base_url}/me/playlists", headers=headers)
+        data, response = self._get_cached('spotify.playlists', '/me/playlists')
 
-        if response.status_code == 200:
-            items = response.json()['items']
+        if data is not None:
+            playlists = [Playlist.from_api(item) for item in data['items']]
+            get_index().add(playlist_doc(playlist) for playlist in playlists)
             print("\n📋 Your Playlists:")
-            for i, playlist in enumerate(items, 1):
-                print(f"\n{i}. 📝 {playlist['name']}")
-                print(f"   ℹ️ {playlist['description']}" if playlist['description'] else "   ℹ️ No description")
-                print(f"   🎵 Tracks: {playlist['tracks']['total']}")
-                print(f"   🔗 ID: {playlist['id']}")
-        else:
+            for i, playlist in enumerate(playlists, 1):
+                print(f"\n{i}. 📝 {playlist.name}")
+                print(f"   ℹ️ {playlist.description}" if playlist.description else "   ℹ️ No description")
+                print(f"   🎵 Tracks: {playlist.tracks_total}")
+                print(f"   🔗 ID: {playlist.id}")
+            return playlists
+        elif response is not None:
             print(f"\n❌ Error: {response.status_code}")
             print(response.text)
+        else:
+            print("\n❌ Error: failed to fetch playlists")
 
     def get_playlist(self, playlist_id):
         """Get playlist details."""
@@ -533,22 +469,23 @@ class Plugin(PluginInterface):
         url = f"{self.base_url}/playlists/{playlist_id}"
         headers = {'Authorization': f'Bearer {self.access_token}'}
         
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
         
         if response.status_code == 200:
-            playlist = response.json()
-            print(f"\n📝 Playlist: {playlist['name']}")
-            print(f"ℹ️ {playlist['description']}")
-            print(f"👤 Created by: {playlist['owner']['display_name']}")
-            print(f"🎵 Total tracks: {playlist['tracks']['total']}")
-            print(f"🔗 URL: {playlist['external_urls']['spotify']}\n")
+            playlist = Playlist.from_api(response.json())
+            get_index().add([playlist_doc(playlist)])
+            print(f"\n📝 Playlist: {playlist.name}")
+            print(f"ℹ️ {playlist.description}")
+            print(f"👤 Created by: {playlist.owner}")
+            print(f"🎵 Total tracks: {playlist.tracks_total}")
+            print(f"🔗 URL: {playlist.url}\n")
             
             print("Tracks:\n")
-            for i, item in enumerate(playlist['tracks']['items'], 1):
-                track = item['track']
-                print(f"{i}. 🎵 {track['name']}")
-                print(f"   👤 {', '.join(artist['name'] for artist in track['artists'])}")
-                print(f"   💿 {track['album']['name']}\n")
+            for i, track in enumerate(playlist.tracks, 1):
+                print(f"{i}. 🎵 {track.name}")
+                print(f"   👤 {', '.join(track.artists)}")
+                print(f"   💿 {track.album}\n")
+            return playlist
         else:
             print(f"\n❌ Error: {response.status_code}")
             print(response.text)
@@ -562,7 +499,7 @@ class Plugin(PluginInterface):
 
         # Primeiro, precisamos do ID do usuário
         headers = {'Authorization': f'Bearer {self.access_token}'}
-        response = requests.get(f"{self.base_url}/me", headers=headers)
+        response = self.session.get(f"{self.base_url}/me", headers=headers)
         
         if response.status_code != 200:
             print("\n❌ Error getting user profile")
@@ -578,7 +515,7 @@ class Plugin(PluginInterface):
             'public': True
         }
         
-        response = requests.post(url, headers=headers, json=data)
+        response = self.session.post(url, headers=headers, json=data)
         
         if response.status_code == 201:
             playlist = response.json()
@@ -615,7 +552,7 @@ class Plugin(PluginInterface):
         }
         data = {'uris': track_uris}
         
-        response = requests.post(url, headers=headers, json=data)
+        response = self.session.post(url, headers=headers, json=data)
         
         if response.status_code == 201:
             print(f"\n✅ Successfully added {len(track_ids)} track(s) to the playlist!")
@@ -624,7 +561,7 @@ class Plugin(PluginInterface):
             tracks_info = []
             for track_id in track_ids:
                 track_url = f"{self.base_url}/tracks/{track_id}"
-                track_response = requests.get(track_url, headers=headers)
+                track_response = self.session.get(track_url, headers=headers)
                 if track_response.status_code == 200:
                     track = track_response.json()
                     tracks_info.append(f"🎵 {track['name']} - {', '.join(artist['name'] for artist in track['artists'])}")
@@ -651,7 +588,7 @@ class Plugin(PluginInterface):
         
         # Get current playlist details if we're only updating one field
         if name is None or description is None:
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers)
             if response.status_code == 200:
                 current = response.json()
                 if name is None:
@@ -667,7 +604,7 @@ class Plugin(PluginInterface):
             'description': description
         }
         
-        response = requests.put(url, headers=headers, json=data)
+        response = self.session.put(url, headers=headers, json=data)
         
         if response.status_code == 200:
             print(f"\n✅ Playlist updated successfully!")
@@ -684,20 +621,21 @@ class Plugin(PluginInterface):
             if not self.access_token:
                 return
 
-        headers = {'Authorization': f'Bearer {self.access_token}'}
-        response = requests.get(f"{self.base_url}/me/following?type=artist", headers=headers)
+        data, response = self._get_cached('spotify.following', '/me/following?type=artist')
 
-        if response.status_code == 200:
-            artists = response.json()['artists']['items']
+        if data is not None:
+            artists = data['artists']['items']
             print("\n🎭 Artists you follow:")
             for i, artist in enumerate(artists, 1):
                 print(f"\n{i}. 👤 {artist['name']}")
                 print(f"   👥 Followers: {artist['followers']['total']:,}")
                 print(f"   🎭 Genres: {', '.join(artist['genres'])}")
                 print(f"   🔗 {artist['external_urls']['spotify']}")
-        else:
+        elif response is not None:
             print(f"\n❌ Error: {response.status_code}")
             print(response.text)
+        else:
+            print("\n❌ Error: failed to fetch followed artists")
 
     def get_recommendations(self):
         """Get track recommendations."""
@@ -708,7 +646,7 @@ class Plugin(PluginInterface):
 
         # Primeiro, pegamos as top tracks do usuário para usar como seed
         headers = {'Authorization': f'Bearer {self.access_token}'}
-        top_tracks = requests.get(f"{self.base_url}/me/top/tracks?limit=5", headers=headers)
+        top_tracks = self.session.get(f"{self.base_url}/me/top/tracks?limit=5", headers=headers)
 
         if top_tracks.status_code != 200:
             print("\n❌ Error getting top tracks for recommendations")
@@ -721,7 +659,7 @@ class Plugin(PluginInterface):
             'limit': 10
         }
 
-        response = requests.get(f"{self.base_url}/recommendations", headers=headers, params=params)
+        response = self.session.get(f"{self.base_url}/recommendations", headers=headers, params=params)
 
         if response.status_code == 200:
             tracks = response.json()['tracks']
@@ -755,7 +693,7 @@ class Plugin(PluginInterface):
         print(f"\n📊 Top Charts - {country.title()}\n")
         
         for chart_name, playlist_id in charts[country].items():
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/playlists/{playlist_id}",
                 headers={"Authorization": f"Bearer {self.access_token}"}
             )
@@ -822,8 +760,8 @@ class Plugin(PluginInterface):
                 'user-agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36'
             }
 
-            response = requests.post(
-                "https://clienttoken.spotify.com/v1/clienttoken",
+            response = self.session.post(
+                endpoints.url('spotify_clienttoken', 'clienttoken'),
                 headers=headers,
                 json=data
             )
@@ -852,10 +790,10 @@ class Plugin(PluginInterface):
         print("\n🔄 Fazendo login no Web Player...")
         
         try:
-            session = requests.Session()
+            session = create_session('spotify', endpoints=SPOTIFY_ENDPOINTS)
             
             # Primeiro request - Login com email/senha
-            login_url = "https://accounts.spotify.com/login/password"
+            login_url = endpoints.url('spotify_accounts', 'login/password')
             
             headers = {
                 'accept': 'application/json',
@@ -888,7 +826,7 @@ class Plugin(PluginInterface):
                 return None
                 
             # Segundo request - Obter token de acesso
-            token_url = "https://open.spotify.com/get_access_token"
+            token_url = endpoints.url('spotify_web', 'get_access_token')
             
             headers = {
                 'accept': 'application/json',
@@ -961,7 +899,7 @@ class Plugin(PluginInterface):
             print("\n❌ Não foi possível obter seu ID do Spotify")
             return False
 
-        session = requests.Session()
+        session = create_session('spotify', endpoints=SPOTIFY_ENDPOINTS)
         
         print("\n🔄 Iniciando processo de alteração de nome...")
         
@@ -986,7 +924,7 @@ class Plugin(PluginInterface):
         }
 
         # Endpoint do Web Player para alterar nome
-        profile_url = f"https://spclient.wg.spotify.com/identity/v3/profile/{user_id}"
+        profile_url = endpoints.url('spotify_spclient', f"identity/v3/profile/{user_id}")
         
         # Dados no formato do Web Player
         update_data = {
@@ -0,0 +1,46 @@
+"""
+Local storage helpers shared by plugin caches and indexes.
+
+Everything lives under FETCHER_CACHE_DIR (default: ~/.cache/fetcher).
+"""
+
+import json
+import os
+import tempfile
+
+
+def cache_path(*parts):
+    """Return a path inside the cache directory, creating parent directories."""
+    base = os.getenv('FETCHER_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'fetcher'))
+    path = os.path.join(base, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def atomic_write(path, data):
+    """Write text or bytes to `path` through a temp file and rename.
+
+    Readers never observe a partially written file.
+    """
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def load_json(path, default=None):
+    """Load a JSON file, returning `default` when it is missing or corrupt."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
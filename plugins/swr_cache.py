@@ -0,0 +1,120 @@
+"""
+Stale-while-revalidate cache for slow-changing upstream data.
+
+Commands such as `github me`, `trello boards` or `spotify playlists` change
+rarely but are asked for constantly. Their fetches go through the global
+`swr` cache:
+
+- younger than `fresh` seconds: returned as is
+- older, but within `fresh + max_stale`: returned at once while one
+  background refresh (single-flight per key) fetches the new value
+- missing or older than that: fetched before returning; concurrent callers
+  share the same fetch
+
+Only non-None results are cached, so failed fetches are retried next time.
+Values live in process memory (the MCP server or the fetcher daemon).
+
+Policies are "fresh:max_stale" seconds per plugin.command, overridable with
+FETCHER_SWR_<PLUGIN>_<COMMAND> (e.g. FETCHER_SWR_TRELLO_BOARDS=60:3600);
+FETCHER_SWR=0 disables the cache. At most FETCHER_SWR_MAX_ENTRIES values are
+kept (the least recently refreshed go first), since keys such as search
+queries are unbounded.
+
+Usage:
+    boards = swr.get('trello.boards', lambda: self.fetch("members/me/boards"))
+"""
+
+import os
+import threading
+import time
+
+from .metrics import registry
+from .single_flight import SingleFlight
+
+DEFAULT_POLICIES = {
+    'github.me': (300, 86400),
+    'github.search': (60, 600),
+    'trello.boards': (60, 3600),
+    'spotify.me': (300, 86400),
+    'spotify.following': (300, 86400),
+    'spotify.playlists': (60, 3600)
+}
+
+MAX_ENTRIES = int(os.getenv('FETCHER_SWR_MAX_ENTRIES', '1024'))
+
+
+def policy(name):
+    """(fresh, max_stale) seconds for a plugin.command."""
+    configured = os.getenv('FETCHER_SWR_' + name.replace('.', '_').replace('-', '_').upper())
+    if configured:
+        fresh, _, max_stale = configured.partition(':')
+        return float(fresh), float(max_stale or 0)
+    return DEFAULT_POLICIES.get(name, (0, 0))
+
+
+class SWRCache:
+    """In-memory stale-while-revalidate cache keyed by plugin.command (+ args)."""
+
+    def __init__(self):
+        self.enabled = os.getenv('FETCHER_SWR', '1').lower() not in ('0', 'false', 'no')
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def get(self, name, fetch, *args):
+        """Return the value of `fetch()` for name+args, serving stale data while refreshing."""
+        fresh, max_stale = policy(name)
+        if not self.enabled or not (fresh or max_stale):
+            return fetch()
+
+        key = (name,) + args
+        with self._lock:
+            entry = self._entries.get(key)
+        age = time.monotonic() - entry[0] if entry else None
+
+        if entry and age < fresh:
+            registry.inc('fetcher_cache_requests_total', cache='swr', result='hit')
+            return entry[1]
+        if entry and age < fresh + max_stale:
+            registry.inc('fetcher_cache_requests_total', cache='swr', result='stale')
+            self._refresh_in_background(key, fetch)
+            return entry[1]
+
+        registry.inc('fetcher_cache_requests_total', cache='swr', result='miss')
+        return self._flights.do(key, self._refresh, key, fetch)
+
+    def _refresh(self, key, fetch):
+        value = fetch()
+        if value is not None:
+            with self._lock:
+                if key not in self._entries and len(self._entries) >= MAX_ENTRIES:
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+                self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def _refresh_in_background(self, key, fetch):
+        if self._flights.in_flight(key):
+            return
+        # A new thread starts with an empty context: the refresh is not bound
+        # to the deadline or trace of the call that triggered it
+        thread = threading.Thread(target=self._background, args=(key, fetch), daemon=True)
+        thread.start()
+
+    def _background(self, key, fetch):
+        try:
+            self._flights.do(key, self._refresh, key, fetch)
+        except Exception:
+            # The stale value keeps being served; the next caller retries
+            registry.inc('fetcher_retries_total', plugin=key[0].split('.')[0], reason='swr_refresh_failed')
+
+    def invalidate(self, name=None):
+        """Drop cached values (all, or those of one plugin.command)."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == name]:
+                    del self._entries[key]
+
+
+swr = SWRCache()
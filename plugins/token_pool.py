@@ -0,0 +1,407 @@
+"""
+Pool of GitHub tokens and scheduler for their rate limits.
+
+One token caps every command at its 5000 requests/hour. The pool holds
+several (GITHUB_TOKENS, comma-separated, plus GITHUB_TOKEN) and, optionally,
+GitHub App installation tokens, and is attached to the GitHub session as its
+`auth`, so every request picks a token:
+
+- GitHub limits each token per resource: core, search (30/min), code search
+  and GraphQL. Every token keeps one budget per resource, read from
+  `/rate_limit` before the first search or GraphQL request and then kept up
+  to date from the X-RateLimit-* headers of its responses.
+- A request goes to the token with the most headroom for its resource and
+  is counted against it right away, so concurrent workers spread out. When
+  no token has budget left, requests queue per resource until the window
+  resets instead of collecting 403s; a burst of searches waits for the
+  search window while core requests keep flowing.
+- Queued requests are served by priority. Bulk work (fan-outs, exports,
+  watches, under `priority(BULK)`) also leaves the last requests of each
+  window to interactive commands.
+- A repository (or organization) that answers 404 under one token is tried
+  with the others; the token that can see it is remembered, and later
+  requests for that resource always use it.
+- Requests that act as a user (`/user`, writes such as creating an issue)
+  always use the primary token, the first one configured.
+
+Installation tokens (GITHUB_APP_ID, GITHUB_APP_PRIVATE_KEY as PEM text or a
+file path, GITHUB_APP_INSTALLATION_IDS) are minted with an app JWT, which
+needs the optional PyJWT package with its crypto extra, and renewed before
+they expire. Without any token the pool sends anonymous requests.
+
+Usage:
+    session.auth = pool_from_env(session, api_url)
+    with priority(BULK):
+        ...
+"""
+
+import calendar
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.auth import AuthBase
+
+from .deadline import current_deadline
+from .metrics import registry
+
+try:
+    import jwt
+except ImportError:
+    jwt = None
+
+# Budget per resource assumed before GitHub reports one: (limit with a token, anonymous limit, window seconds)
+DEFAULT_LIMITS = {
+    'core': (5000, 60, 3600),
+    'search': (30, 10, 60),
+    'code_search': (10, 0, 60),
+    'graphql': (5000, 0, 3600)
+}
+
+# Resources whose budgets are read from /rate_limit before their first request
+SYNCED_RESOURCES = {'search', 'code_search', 'graphql'}
+
+# Seconds before expiry an installation token is renewed
+APP_TOKEN_MARGIN = 300
+
+# Seconds past X-RateLimit-Reset (whole seconds) before a window counts as reset
+RESET_SLACK = 1
+
+# Request priorities: lower is served first
+INTERACTIVE = 0
+BULK = 10
+
+# Paths whose answer depends on which user the token belongs to
+_USER_PATH = re.compile(r"^/(user|notifications)(/|$)")
+_RESOURCE_PATH = re.compile(r"^/(?:repos/([^/]+/[^/]+)|orgs/([^/]+))")
+
+_priority = contextvars.ContextVar('fetcher_github_priority', default=INTERACTIVE)
+
+registry.describe('fetcher_github_token_requests_total', 'GitHub requests sent per pooled token and rate limit resource')
+registry.describe('fetcher_github_rate_wait_seconds', 'Time GitHub requests waited for rate limit budget')
+
+
+@contextlib.contextmanager
+def priority(level):
+    """Run the enclosed GitHub requests (and work bound to this context) at a priority."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def rate_resource(path):
+    """The rate limit resource a request path counts against."""
+    if path.startswith('/search/code'):
+        return 'code_search'
+    if path.startswith('/search/'):
+        return 'search'
+    if path.endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+
+class Budget:
+    """Rate limit window of one token for one resource."""
+
+    __slots__ = ('limit', 'remaining', 'reset', 'window', 'estimated')
+
+    def __init__(self, limit, window=3600):
+        self.limit = limit
+        self.remaining = None
+        self.reset = 0
+        self.window = window
+        # True while the window was opened locally and GitHub has not reported its reset yet
+        self.estimated = False
+
+    def headroom(self, now):
+        """Requests left in the current window (the full limit once it reset)."""
+        if self.remaining is None or now >= self.reset + RESET_SLACK:
+            return self.limit
+        return self.remaining
+
+    def take(self, now):
+        if self.remaining is None or now >= self.reset + RESET_SLACK:
+            # New window (GitHub starts it with the first request); corrected by the response
+            self.remaining, self.reset, self.estimated = self.limit, now + self.window, True
+        self.remaining -= 1
+
+    def update(self, limit, remaining, reset, now):
+        self.limit = limit
+        if now >= reset + RESET_SLACK:
+            # Late response from a window that is over
+            return
+        if self.remaining is not None and (self.estimated or reset == self.reset):
+            # Requests sent after this response left are already counted; keep the lowest count
+            remaining = min(remaining, self.remaining)
+        self.remaining, self.reset, self.estimated = remaining, reset, False
+
+
+class PoolToken:
+    """One credential of the pool and its last known budget per resource."""
+
+    __slots__ = ('name', 'value', 'budgets', 'expires_at', 'renew', '_renew_lock')
+
+    def __init__(self, name, value=None, renew=None):
+        self.name = name
+        self.value = value
+        self.renew = renew
+        self.expires_at = None
+        self._renew_lock = threading.Lock()
+        anonymous = value is None and renew is None
+        self.budgets = {
+            resource: Budget(anonymous_limit if anonymous else limit, window)
+            for resource, (limit, anonymous_limit, window) in DEFAULT_LIMITS.items()
+        }
+
+    def budget(self, resource):
+        if resource not in self.budgets:
+            self.budgets[resource] = Budget(DEFAULT_LIMITS['core'][0])
+        return self.budgets[resource]
+
+    def authorization(self):
+        """Authorization header value, renewing an expiring installation token first."""
+        if self.renew is not None and (self.expires_at is None or self.expires_at - APP_TOKEN_MARGIN < time.time()):
+            with self._renew_lock:
+                if self.expires_at is None or self.expires_at - APP_TOKEN_MARGIN < time.time():
+                    self.value, self.expires_at = self.renew()
+        return f"token {self.value}" if self.value else None
+
+
+class TokenPool(AuthBase):
+    """requests auth that spreads GitHub requests over tokens and queues them per rate limit resource."""
+
+    def __init__(self, tokens, api_url='', session=None, reserve=10):
+        self.tokens = list(tokens) or [PoolToken('anonymous')]
+        self.primary = self.tokens[0]
+        self.api_url = api_url
+        self.session = session
+        self.reserve = reserve
+        self.base_path = urllib.parse.urlparse(api_url).path.rstrip('/')
+        self._affinity = {}
+        self._queues = {}
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._synced = False
+        self._sync_lock = threading.Lock()
+
+    def _path(self, url):
+        path = urllib.parse.urlparse(url).path
+        return path[len(self.base_path):] if path.startswith(self.base_path) else path
+
+    def resource_key(self, url):
+        """The repository or organization a request URL is about, if any."""
+        match = _RESOURCE_PATH.match(self._path(url))
+        if match is None:
+            return None
+        return match.group(1).lower() if match.group(1) else f"org:{match.group(2).lower()}"
+
+    @property
+    def authenticated(self):
+        return self.primary.value is not None or self.primary.renew is not None
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def _candidates(self, method, url, exclude):
+        if method.upper() != 'GET' or _USER_PATH.match(self._path(url)):
+            return [self.primary]
+        pinned = self._affinity.get(self.resource_key(url))
+        if pinned is not None and pinned not in exclude:
+            return [pinned]
+        return [token for token in self.tokens if token not in exclude] or self.tokens
+
+    def acquire(self, method='GET', url='', exclude=()):
+        """Pick the token for a request, waiting in the resource's queue while no token has budget.
+
+        The request is counted against the chosen token right away.
+        """
+        resource = rate_resource(self._path(url))
+        if resource in SYNCED_RESOURCES and not self._synced:
+            self.sync()
+        level = _priority.get()
+        start = time.monotonic()
+        with self._cond:
+            queue = self._queues.setdefault(resource, [])
+            ticket = (level, next(self._sequence))
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    now = time.time()
+                    wait = 1.0
+                    if queue[0] == ticket:
+                        candidates = self._candidates(method, url, exclude)
+                        budgets = [token.budget(resource) for token in candidates]
+                        # Bulk work leaves a tenth of each window (at most `reserve`) to interactive calls
+                        ready = [
+                            (budget.headroom(now), token) for token, budget in zip(candidates, budgets)
+                            if budget.headroom(now) > (min(self.reserve, budget.limit // 10) if level >= BULK else 0)
+                        ]
+                        if ready or not any(budget.limit for budget in budgets):
+                            token = max(ready, key=lambda item: item[0])[1] if ready else candidates[0]
+                            heapq.heappop(queue)
+                            token.budget(resource).take(now)
+                            self._cond.notify_all()
+                            break
+                        wait = min(max(0.0, min(budget.reset for budget in budgets) + RESET_SLACK - now), wait)
+                    deadline = current_deadline()
+                    if deadline is not None:
+                        # Raises once the call is cancelled or out of time
+                        deadline.check()
+                    self._cond.wait(wait)
+            except BaseException:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._cond.notify_all()
+                raise
+        waited = time.monotonic() - start
+        if waited > 0.01:
+            registry.observe('fetcher_github_rate_wait_seconds', waited, resource=resource)
+        registry.inc('fetcher_github_token_requests_total', token=token.name, resource=resource)
+        return token
+
+    def record(self, token, response):
+        """Update a token's budget from the rate limit headers of its response."""
+        headers = response.headers
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        resource = headers.get('X-RateLimit-Resource') or rate_resource(self._path(response.request.url))
+        with self._cond:
+            budget = token.budget(resource)
+            budget.update(int(headers.get('X-RateLimit-Limit', budget.limit)), int(headers['X-RateLimit-Remaining']),
+                          int(headers.get('X-RateLimit-Reset', 0)), time.time())
+            self._cond.notify_all()
+
+    def sync(self, force=False):
+        """Read every token's budgets from /rate_limit, which does not count against them."""
+        with self._sync_lock:
+            if self._synced and not force or self.session is None:
+                return
+            for token in self.tokens:
+                try:
+                    response = self.session.get(f"{self.api_url}/rate_limit",
+                                                auth=_HeaderAuth(token.authorization()))
+                except requests.RequestException:
+                    continue
+                if not response.ok:
+                    continue
+                with self._cond:
+                    for resource, data in (response.json().get('resources') or {}).items():
+                        token.budget(resource).update(data['limit'], data['remaining'], data['reset'], time.time())
+                    self._cond.notify_all()
+            self._synced = True
+
+    def pin(self, resource, token):
+        with self._cond:
+            self._affinity[resource] = token
+
+    def __call__(self, request):
+        token = self.acquire(request.method, request.url)
+        self._authorize(request, token)
+        request.register_hook('response', self._make_hook(token))
+        return request
+
+    def _authorize(self, request, token):
+        value = token.authorization()
+        if value:
+            request.headers['Authorization'] = value
+        else:
+            request.headers.pop('Authorization', None)
+
+    def _make_hook(self, token):
+        def handle_response(response, **kwargs):
+            self.record(token, response)
+            return self._retry_not_found(response, token, kwargs)
+        return handle_response
+
+    def _retry_not_found(self, response, token, send_kwargs):
+        """Retry a 404 on a repository/org with the other tokens; pin the one that sees it."""
+        resource = self.resource_key(response.request.url)
+        if (response.status_code != 404 or resource is None or len(self.tokens) < 2
+                or response.request.method != 'GET' or self._affinity.get(resource) is token):
+            return response
+
+        tried = [token]
+        while len(tried) < len(self.tokens):
+            candidate = self.acquire('GET', response.request.url, exclude=tried)
+            tried.append(candidate)
+            request = response.request.copy()
+            self._authorize(request, candidate)
+            request.hooks = {'response': []}
+            response.content
+            response.close()
+            retry = response.connection.send(request, **send_kwargs)
+            retry.history.append(response)
+            retry.request = request
+            self.record(candidate, retry)
+            response = retry
+            if retry.status_code != 404:
+                if retry.ok:
+                    self.pin(resource, candidate)
+                break
+        return response
+
+
+class _HeaderAuth(AuthBase):
+    """Sets (or, for None, removes) the Authorization header of one request."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, request):
+        if self.value:
+            request.headers['Authorization'] = self.value
+        else:
+            request.headers.pop('Authorization', None)
+        return request
+
+
+def _app_jwt(app_id, private_key):
+    now = int(time.time())
+    return jwt.encode({'iat': now - 60, 'exp': now + 540, 'iss': str(app_id)}, private_key, algorithm='RS256')
+
+
+def installation_token_renewer(session, api_url, app_id, private_key, installation_id):
+    """Return a callable minting a fresh installation token: () -> (token, expires_at)."""
+    def renew():
+        response = session.post(f"{api_url}/app/installations/{installation_id}/access_tokens",
+                                auth=_HeaderAuth(f"Bearer {_app_jwt(app_id, private_key)}"),
+                                headers={'Accept': 'application/vnd.github+json'})
+        response.raise_for_status()
+        data = response.json()
+        return data['token'], calendar.timegm(time.strptime(data['expires_at'], '%Y-%m-%dT%H:%M:%SZ'))
+    return renew
+
+
+def pool_from_env(session, api_url, reserve=10):
+    """Build the pool from GITHUB_TOKEN, GITHUB_TOKENS and the GITHUB_APP_* settings."""
+    values = []
+    for value in [os.getenv('GITHUB_TOKEN', '')] + os.getenv('GITHUB_TOKENS', '').split(','):
+        value = value.strip()
+        if value and value not in values:
+            values.append(value)
+    tokens = [PoolToken(f"token{i}", value) for i, value in enumerate(values, 1)]
+
+    app_id = os.getenv('GITHUB_APP_ID')
+    installations = [i.strip() for i in os.getenv('GITHUB_APP_INSTALLATION_IDS', '').split(',') if i.strip()]
+    private_key = os.getenv('GITHUB_APP_PRIVATE_KEY', '')
+    if app_id and installations and private_key:
+        if jwt is None:
+            print("⚠️ GitHub App tokens need PyJWT: pip install 'pyjwt[crypto]' (ignoring GITHUB_APP_ID)")
+        else:
+            if not private_key.lstrip().startswith('-----BEGIN') and os.path.exists(private_key):
+                with open(private_key) as f:
+                    private_key = f.read()
+            for installation_id in installations:
+                renew = installation_token_renewer(session, api_url, app_id, private_key.replace('\\n', '\n'),
+                                                   installation_id)
+                tokens.append(PoolToken(f"app:{installation_id}", renew=renew))
+    return TokenPool(tokens, api_url, session, reserve)
@@ -0,0 +1,304 @@
+"""
+Span-based tracing across MCP request -> plugin -> HTTP.
+
+A span is opened in MCPServer.handle_request, around PluginManager.run and
+every plugin's run(), and around each outgoing HTTP call made through the
+shared session. The current span lives in a context variable, so child spans
+find their parent automatically (worker threads get it via bind_context).
+
+Tracing is off unless an exporter is configured:
+    FETCHER_TRACE_FILE=spans.jsonl         one finished span per line
+    FETCHER_OTLP_ENDPOINT=http://127.0.0.1:4318
+                                           OTLP/HTTP JSON to {endpoint}/v1/traces
+
+Local tooling:
+    python3 -m plugins.tracing collect [port] [spans.jsonl]   OTLP collector stand-in
+    python3 -m plugins.tracing summarize spans.jsonl          trace trees, N+1 and serial waits
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+import urllib.request
+
+_current_span = contextvars.ContextVar('fetcher_current_span', default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'start_ns', 'end_ns', 'attributes', 'status', 'error')
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = 'ok'
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': round((self.end_ns - self.start_ns) / 1e6, 3),
+            'attributes': self.attributes,
+            'status': self.status,
+            'error': self.error
+        }
+
+
+class FileExporter:
+    """Append finished spans to a JSON lines file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_span(span):
+    data = {
+        'traceId': span.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': 1,
+        'startTimeUnixNano': str(span.start_ns),
+        'endTimeUnixNano': str(span.end_ns),
+        'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()],
+        'status': {'code': 2, 'message': span.error or ''} if span.status == 'error' else {'code': 1}
+    }
+    if span.parent_id:
+        data['parentSpanId'] = span.parent_id
+    return data
+
+
+class OTLPExporter:
+    """Batch spans and POST them as OTLP/HTTP JSON from a background thread.
+
+    Uses urllib instead of the plugin session so exporting never traces itself.
+    """
+
+    def __init__(self, endpoint, batch_size=100, interval=1.0):
+        self.url = endpoint.rstrip('/') + '/v1/traces'
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+        # Short CLI runs exit before the next batch would be sent
+        atexit.register(self.flush)
+
+    def export(self, span):
+        self._queue.put(span)
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._send(batch)
+
+    def flush(self):
+        """Send whatever is still queued."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._send(batch)
+
+    def _send(self, spans):
+        payload = {
+            'resourceSpans': [{
+                'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': 'fetcher'}}]},
+                'scopeSpans': [{'scope': {'name': 'fetcher'}, 'spans': [_otlp_span(span) for span in spans]}]
+            }]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload, default=str).encode(),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError as e:
+            print(f"⚠️ Failed to export {len(spans)} spans to {self.url}: {e}", file=sys.stderr)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the configured exporters."""
+
+    def __init__(self):
+        self.exporters = []
+        if os.getenv('FETCHER_TRACE_FILE'):
+            self.exporters.append(FileExporter(os.environ['FETCHER_TRACE_FILE']))
+        if os.getenv('FETCHER_OTLP_ENDPOINT'):
+            self.exporters.append(OTLPExporter(os.environ['FETCHER_OTLP_ENDPOINT']))
+
+    @property
+    def enabled(self):
+        return bool(self.exporters)
+
+    @contextlib.contextmanager
+    def start_span(self, name, **attributes):
+        """Run the enclosed block as a child of the current span.
+
+        Yields None when tracing is disabled, so callers should guard
+        set_attribute calls with `if span`.
+        """
+        if not self.exporters:
+            yield None
+            return
+
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = 'error'
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            for exporter in self.exporters:
+                exporter.export(span)
+
+
+def current_span():
+    """Return the active span, or None."""
+    return _current_span.get()
+
+
+tracer = Tracer()
+
+
+def _collect(port, path):
+    """Minimal OTLP/HTTP JSON receiver writing spans to a JSON lines file."""
+    import http.server
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            count = 0
+            with open(path, 'a') as f:
+                for resource in body.get('resourceSpans', []):
+                    for scope in resource.get('scopeSpans', []):
+                        for item in scope.get('spans', []):
+                            start, end = int(item['startTimeUnixNano']), int(item['endTimeUnixNano'])
+                            f.write(json.dumps({
+                                'trace_id': item['traceId'],
+                                'span_id': item['spanId'],
+                                'parent_id': item.get('parentSpanId'),
+                                'name': item['name'],
+                                'start_ns': start,
+                                'end_ns': end,
+                                'duration_ms': round((end - start) / 1e6, 3),
+                                'attributes': {
+                                    attr['key']: next(iter(attr['value'].values()))
+                                    for attr in item.get('attributes', [])
+                                },
+                                'status': 'error' if item.get('status', {}).get('code') == 2 else 'ok',
+                                'error': item.get('status', {}).get('message') or None
+                            }) + "\n")
+                            count += 1
+            print(f"📥 {count} spans", file=sys.stderr)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"🛰️ OTLP stand-in listening on http://127.0.0.1:{port}/v1/traces -> {path}", file=sys.stderr)
+    http.server.ThreadingHTTPServer(('127.0.0.1', port), Handler).serve_forever()
+
+
+def _summarize(path):
+    """Print each trace as a tree and flag N+1 patterns and serial waits."""
+    traces = {}
+    with open(path) as f:
+        for line in f:
+            span = json.loads(line)
+            traces.setdefault(span['trace_id'], []).append(span)
+
+    for trace_id, spans in traces.items():
+        children = {}
+        for span in spans:
+            children.setdefault(span['parent_id'], []).append(span)
+        for siblings in children.values():
+            siblings.sort(key=lambda span: span['start_ns'])
+
+        def show(span, depth):
+            print(f"{'  ' * depth}{span['name']} {span['duration_ms']:.1f}ms"
+                  f"{' ❌' if span['status'] == 'error' else ''}")
+            kids = children.get(span['span_id'], [])
+            http_kids = [kid for kid in kids if 'http.endpoint' in kid['attributes']]
+            endpoints = {}
+            for kid in http_kids:
+                endpoints[kid['attributes']['http.endpoint']] = endpoints.get(kid['attributes']['http.endpoint'], 0) + 1
+            for endpoint, count in endpoints.items():
+                if count > 2:
+                    print(f"{'  ' * (depth + 1)}⚠️ N+1: {count} x {endpoint}")
+            serial = sum(1 for a, b in zip(http_kids, http_kids[1:]) if b['start_ns'] >= a['end_ns'])
+            if serial >= 2:
+                print(f"{'  ' * (depth + 1)}⚠️ {serial + 1} HTTP calls run one after another")
+            for kid in kids:
+                show(kid, depth + 1)
+
+        print(f"\nTrace {trace_id}")
+        known = {span['span_id'] for span in spans}
+        for root in (span for span in spans if span['parent_id'] not in known):
+            show(root, 1)
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "collect":
+        _collect(int(sys.argv[2]) if len(sys.argv) > 2 else 4318, sys.argv[3] if len(sys.argv) > 3 else 'spans.jsonl')
+    elif command == "summarize" and len(sys.argv) > 2:
+        _summarize(sys.argv[2])
+    else:
+        print("Usage: python3 -m plugins.tracing [collect [port] [file] | summarize [file]]")
+        sys.exit(1)
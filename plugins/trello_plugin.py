@@ -11,22 +11,93 @@ Commands:
     list - Get list information: list [list_id]
     add_comment - Add a comment to a card: add_comment [card_id] [comment]
     move_card - Move a card to a different list: move_card [card_id] [list_id]
+    export - Export the cards of a board or list: export [board|list] [id] [path]
+    watch - Stream board activity: watch [board_id,...] [seconds] [text|json]
+    flow - List dwell time, WIP and throughput of a board (needs NumPy): flow [board_id] [days] [done_list]
 """
 
 import os
 import json
-import requests
+import time
 from dotenv import load_dotenv
+from . import analytics
+from .action_store import ActionStore
+from .endpoints import endpoints
+from .export import export_pages
+from .http_session import create_session
 from .plugin_interface import PluginInterface
+from .records import Card
+from .search_index import card_doc, get_index, index_pages
+from .swr_cache import swr
+from .watch import Watcher, change_printer
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Actions requested per poll; older ones are paged in with `before`
+WATCH_PAGE_SIZE = 50
+
+
+class BoardWatch:
+    """Watch source for one board: new actions since the last seen action id."""
+
+    source = 'trello'
+
+    def __init__(self, plugin, board_id):
+        self.plugin = plugin
+        self.board_id = board_id
+        self.name = board_id
+        self.min_interval = 0
+        self._since = None
+
+    def _actions(self, params):
+        actions = self.plugin.fetch(f"boards/{self.board_id}/actions", params)
+        if actions is None:
+            raise RuntimeError(f"failed to fetch actions of board {self.board_id}")
+        return actions
+
+    def poll(self):
+        if self._since is None:
+            # Baseline: the newest action, or the current time on a board without any
+            latest = self._actions({'limit': 1})
+            self._since = latest[0]['id'] if latest else time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            if latest and latest[0].get('data', {}).get('board'):
+                self.name = latest[0]['data']['board'].get('name') or self.name
+            return []
+
+        actions = self._actions({'since': self._since, 'limit': WATCH_PAGE_SIZE})
+        page = actions
+        while len(page) == WATCH_PAGE_SIZE:
+            page = self._actions({'since': self._since, 'before': page[-1]['id'], 'limit': WATCH_PAGE_SIZE})
+            actions.extend(page)
+        if not actions:
+            return []
+        # Newest first from the API
+        self._since = actions[0]['id']
+        return [self._change(action) for action in reversed(actions)]
+
+    def _change(self, action):
+        data = action.get('data') or {}
+        card = (data.get('card') or {}).get('name')
+        who = (action.get('memberCreator') or {}).get('fullName') or 'someone'
+        kind = action.get('type')
+        if kind == 'updateCard' and data.get('listAfter'):
+            summary = f"'{card}' moved {data['listBefore'].get('name')} → {data['listAfter'].get('name')}"
+        elif kind == 'createCard':
+            summary = f"'{card}' created in {(data.get('list') or {}).get('name')}"
+        elif kind == 'commentCard':
+            summary = f"comment on '{card}': {(data.get('text') or '')[:80]}"
+        else:
+            summary = f"{kind}" + (f" '{card}'" if card else "")
+        return {'source': 'trello', 'target': self.name, 'kind': 'action', 'summary': f"{summary} by {who}",
+                'id': action['id'], 'type': kind, 'at': action.get('date')}
+
 class Plugin(PluginInterface):
     def __init__(self):
-        self.base_url = os.getenv('TRELLO_BASE_URL', 'https://api.trello.com/1')
+        self.base_url = endpoints.url('trello')
         self.api_key = os.getenv('TRELLO_API_KEY')
         self.token = os.getenv('TRELLO_TOKEN')
+        self.session = create_session('trello', endpoints=('trello',))
         
         self._commands = {
             "test": "Test connection and show user information",
@@ -35,7 +106,10 @@ class Plugin(PluginInterface):
             "card": "Get card information: card [card_id]",
             "list": "Get list information: list [list_id]",
             "add_comment": "Add a comment to a card: add_comment [card_id] [comment]",
-            "move_card": "Move a card to a different list: move_card [card_id] [list_id]"
+            "move_card": "Move a card to a different list: move_card [card_id] [list_id]",
+            "export": "Export cards to Parquet/Arrow/CSV: export [board|list] [id] [path]",
+            "watch": "Stream board activity: watch [board_id,...] [seconds] [text|json]",
+            "flow": "List dwell time, WIP, throughput, lead/cycle time: flow [board_id] [days] [done_list]"
         }
 
     def list_commands(self):
@@ -54,7 +128,7 @@ class Plugin(PluginInterface):
         if params:
             default_params.update(params)
             
-        response = requests.get(url, params=default_params)
+        response = self.session.get(url, params=default_params)
         
         if response.status_code == 200:
             return response.json()
@@ -64,6 +138,25 @@ class Plugin(PluginInterface):
                 print("Authentication error. Please check if TRELLO_API_KEY and TRELLO_TOKEN environment variables are properly set.")
             return None
 
+    def fetch_pages(self, endpoint, params=None, limit=1000):
+        """Yield pages of a collection endpoint, paginating backwards with `before`.
+
+        Trello ids start with a creation timestamp, so the smallest id of a page
+        is the cursor for the next one. Raises RuntimeError when a page fails.
+        """
+        params = dict(params or {}, limit=limit)
+        
+        while True:
+            page = self.fetch(endpoint, params)
+            if page is None:
+                raise RuntimeError(f"failed to fetch a page of {endpoint}")
+            if not page:
+                return
+            yield page
+            if len(page) < limit:
+                return
+            params['before'] = min(item['id'] for item in page)
+
     def post(self, endpoint, data=None):
         """Make a POST request to Trello API."""
         url = f"{self.base_url}/{endpoint}"
@@ -72,7 +165,7 @@ class Plugin(PluginInterface):
             'token': self.token
         }
         
-        response = requests.post(url, params=default_params, json=data)
+        response = self.session.post(url, params=default_params, json=data)
         
         if response.status_code in [200, 201]:
             return response.json()
@@ -90,7 +183,7 @@ class Plugin(PluginInterface):
             'token': self.token
         }
         
-        response = requests.put(url, params=default_params, json=data)
+        response = self.session.put(url, params=default_params, json=data)
         
         if response.status_code in [200, 201]:
             return response.json()
@@ -113,8 +206,8 @@ class Plugin(PluginInterface):
         return None
 
     def list_boards(self):
-        """List all boards for the authenticated user."""
-        boards = self.fetch("members/me/boards")
+        """List all boards for the authenticated user (stale-while-revalidate cached)."""
+        boards = swr.get('trello.boards', lambda: self.fetch("members/me/boards"))
         if boards:
             print("\nYour Boards:")
             for board in boards:
@@ -136,9 +229,12 @@ class Plugin(PluginInterface):
                     print(f"- {lst['name']} (ID: {lst['id']})")
             
             if 'cards' in board:
+                board['cards'] = [Card.from_api(card) for card in board['cards']]
+                list_names = {lst['id']: lst['name'] for lst in board.get('lists', [])}
+                get_index().add(card_doc(card, list_names.get(card.id_list)) for card in board['cards'])
                 print("\nCards:")
                 for card in board['cards']:
-                    print(f"- {card['name']} (ID: {card['id']})")
+                    print(f"- {card.name} (ID: {card.id})")
             return board
         return None
 
@@ -146,6 +242,7 @@ class Plugin(PluginInterface):
         """Get detailed information about a card."""
         card = self.fetch(f"cards/{card_id}")
         if card:
+            get_index().add([card_doc(Card.from_api(card))])
             print(f"\nCard: {card['name']}")
             print(f"Description: {card.get('desc', 'No description')}")
             print(f"Due Date: {card.get('due', 'No due date')}")
@@ -161,9 +258,11 @@ class Plugin(PluginInterface):
             print(f"Closed: {'Yes' if list_data.get('closed', False) else 'No'}")
             
             if 'cards' in list_data:
+                list_data['cards'] = [Card.from_api(card) for card in list_data['cards']]
+                get_index().add(card_doc(card, list_data['name']) for card in list_data['cards'])
                 print("\nCards in this list:")
                 for card in list_data['cards']:
-                    print(f"- {card['name']} (ID: {card['id']})")
+                    print(f"- {card.name} (ID: {card.id})")
             return list_data
         return None
 
@@ -183,6 +282,96 @@ class Plugin(PluginInterface):
             return True
         return False
 
+    def export_cards(self, kind, target_id, path):
+        """Export every card of a board or list."""
+        if kind not in ("board", "list"):
+            print(f"❌ Unknown export type: {kind}. Use 'board' or 'list'")
+            return None
+        
+        print(f"\n📤 Exporting cards of {kind} {target_id}...")
+        pages = index_pages(self.fetch_pages(f"{kind}s/{target_id}/cards"),
+                            lambda item: card_doc(Card.from_api(item)))
+        exporter = export_pages(pages, path, Card.from_api)
+        print(f"✅ Exported {exporter.rows_written} cards to {exporter.path} ({exporter.format})")
+        return exporter.path
+
+    def watch(self, board_ids, duration=0, output_format='text'):
+        """Stream new actions of boards until `duration` seconds pass (0 = forever)."""
+        boards = [board.strip() for board in board_ids.split(",") if board.strip()]
+        watcher = Watcher([BoardWatch(self, board) for board in boards])
+        print(f"\n👀 Watching {len(boards)} boards (Ctrl+C to stop)...", flush=True)
+        try:
+            watcher.run(change_printer(output_format), duration=float(duration) or None)
+        except KeyboardInterrupt:
+            pass
+        print(f"\n📊 {watcher.polls} polls, {watcher.changes} changes")
+        return watcher.changes
+
+    def card_flow(self, board_id, days=30, done_list=None):
+        """Sync a board's card actions and print per-list dwell time, WIP and throughput."""
+        if analytics.np is None:
+            print("❌ flow needs NumPy: pip install numpy")
+            return None
+        lists = self.fetch(f"boards/{board_id}/lists", {'filter': 'all', 'fields': 'name,pos,closed'})
+        if lists is None:
+            return None
+        lists.sort(key=lambda lst: lst.get('pos') or 0)
+        names = {lst['id']: lst['name'] for lst in lists}
+        if done_list:
+            wanted = done_list.lower()
+            done_id = next((lst['id'] for lst in lists if wanted in (lst['id'].lower(), lst['name'].lower())), None)
+            if done_id is None:
+                print(f"❌ No list '{done_list}' on board {board_id}")
+                return None
+        
+        store = ActionStore(board_id)
+        print(f"\n🔄 Syncing actions of board {board_id} ({len(store)} stored)...")
+        start = time.perf_counter()
+        try:
+            added = store.sync(self.fetch)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return None
+        synced = time.perf_counter()
+        
+        now = time.time()
+        flow = analytics.CardFlow.build(store.rows, now)
+        days = float(days)
+        since = now - days * analytics.DAY if days else (int(flow.start.min()) if len(flow) else now)
+        
+        if not done_list:
+            # The rightmost open list cards ever reached
+            reached = [lst['id'] for lst in lists if not lst.get('closed') and lst['id'] in flow.lists.codes]
+            done_id = reached[-1] if reached else None
+        report = analytics.flow_report(flow, since, flow.lists.codes.get(done_id))
+        computed = time.perf_counter()
+        
+        window = f"last {days:g} days" if days else "all time"
+        print(f"📈 {len(store)} actions (+{added} new), {report['cards']} cards ({window})")
+        print(f"⚡ Synced in {(synced - start) * 1000:.0f} ms, computed in {(computed - synced) * 1000:.1f} ms")
+        
+        def days_text(summary):
+            if not summary['count']:
+                return "n/a"
+            return f"median {summary['median_days']}d · p90 {summary['p90_days']}d"
+        
+        # Board order first, then lists that were deleted since (known only by id)
+        order = [lst['id'] for lst in lists if lst['id'] in flow.lists.codes]
+        order += [list_id for list_id in flow.lists.names if list_id not in names]
+        print("\n📋 Lists:")
+        for list_id in order:
+            stats = report['lists'][flow.lists.codes[list_id]]
+            print(f"   {names.get(list_id, list_id)}: WIP {stats['wip']} (avg {stats['average_wip']})"
+                  f" · dwell {days_text(stats['dwell'])} · age {days_text(stats['age'])}")
+        
+        throughput = report['throughput']
+        if throughput:
+            print(f"\n✅ Done list '{names[done_id]}': {throughput['done']} cards"
+                  f" ({throughput['per_week']}/week) · weekly {', '.join(map(str, throughput['weekly']))}")
+            print(f"   ⏱️ Lead time: {days_text(throughput['lead_time'])}")
+            print(f"   🔁 Cycle time: {days_text(throughput['cycle_time'])}")
+        return report
+
     def test(self):
         """Run basic plugin tests."""
         print("Testing Trello plugin...")
@@ -225,6 +414,25 @@ class Plugin(PluginInterface):
                 print("Usage: move_card [card_id] [list_id]")
                 return
             self.move_card(args[0], args[1])
+        elif command == "export":
+            if len(args) < 3:
+                print("Usage: export [board|list] [id] [path]")
+                return
+            self.export_cards(args[0], args[1], args[2])
+        elif command == "watch":
+            if len(args) < 1:
+                print("Usage: watch [board_id,...] [seconds] [text|json]")
+                return
+            duration = args[1] if len(args) > 1 else 0
+            output_format = args[2] if len(args) > 2 else 'text'
+            self.watch(args[0], duration, output_format)
+        elif command == "flow":
+            if len(args) < 1:
+                print("Usage: flow [board_id] [days] [done_list]")
+                return
+            days = args[1] if len(args) > 1 else 30
+            done_list = args[2] if len(args) > 2 else None
+            self.card_flow(args[0], days, done_list)
         else:
             print(f"Unknown command: {command}")
             self.list_commands()
@@ -0,0 +1,120 @@
+"""
+Long-running watch loop with per-source adaptive polling.
+
+A source is any object with a `name`, a `poll()` method returning the
+changes since its previous poll (dicts with at least `source`, `target`,
+`kind` and `summary`) and a `min_interval` attribute the upstream may raise
+(GitHub's X-Poll-Interval). The first poll of a source only records a
+baseline, so the stream carries diffs, not the current state.
+
+Each source is polled on its own schedule: the interval halves (down to its
+floor) after a poll that found changes and grows by half after a quiet one
+(up to FETCHER_WATCH_MAX_INTERVAL), so busy sources are followed closely and
+idle ones cost a conditional request every few minutes. Failing sources back
+off to the maximum interval.
+
+Usage:
+    Watcher(sources, workers=8).run(print_change, duration=600)
+"""
+
+import heapq
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .context import bind_context
+from .deadline import sleep as deadline_sleep
+
+INITIAL_INTERVAL = float(os.getenv('FETCHER_WATCH_INTERVAL', '60'))
+MIN_INTERVAL = float(os.getenv('FETCHER_WATCH_MIN_INTERVAL', '10'))
+MAX_INTERVAL = float(os.getenv('FETCHER_WATCH_MAX_INTERVAL', '300'))
+
+KIND_ICONS = {
+    'issue_opened': '🆕',
+    'issue_changed': '✏️',
+    'issue_updated': '🔄',
+    'event': '📣',
+    'action': '📋',
+    'error': '⚠️'
+}
+
+
+def change_printer(output_format='text'):
+    """Return an emit() callback printing one line per change (text or json)."""
+    def emit(change):
+        if output_format == 'json':
+            print(json.dumps(change, ensure_ascii=False), flush=True)
+        else:
+            stamp = time.strftime('%H:%M:%S')
+            icon = KIND_ICONS.get(change['kind'], '•')
+            print(f"{stamp} {icon} {change['target']}: {change['summary']}", flush=True)
+    return emit
+
+
+class Watcher:
+    """Polls sources concurrently, each at its own adaptive interval."""
+
+    def __init__(self, sources, workers=4, initial_interval=INITIAL_INTERVAL,
+                 min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        self.sources = list(sources)
+        self.workers = workers
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.intervals = {}
+        self.polls = 0
+        self.changes = 0
+
+    def _next_interval(self, source, changed, failed):
+        floor = max(self.min_interval, getattr(source, 'min_interval', 0) or 0)
+        interval = self.intervals.get(source.name, self.initial_interval)
+        if failed:
+            interval = self.max_interval
+        elif changed:
+            interval = interval / 2
+        else:
+            interval = interval * 1.5
+        interval = min(max(interval, floor), max(self.max_interval, floor))
+        self.intervals[source.name] = interval
+        return interval
+
+    def run(self, emit, duration=None):
+        """Poll until `duration` seconds have passed (forever when None/0)."""
+        end = time.monotonic() + duration if duration else None
+        now = time.monotonic()
+        # Stagger the baseline polls so they do not all hit the upstream at once
+        spread = min(self.initial_interval, 1.0) / max(len(self.sources), 1)
+        schedule = [(now + i * spread, i, source) for i, source in enumerate(self.sources)]
+        heapq.heapify(schedule)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while schedule:
+                now = time.monotonic()
+                if end is not None and now >= end:
+                    break
+                if schedule[0][0] > now:
+                    wake = schedule[0][0] if end is None else min(schedule[0][0], end)
+                    deadline_sleep(wake - now)
+                    continue
+
+                due = []
+                while schedule and schedule[0][0] <= now:
+                    due.append(heapq.heappop(schedule))
+                futures = {pool.submit(bind_context(source.poll)): (order, source) for _, order, source in due}
+                for future in as_completed(futures):
+                    order, source = futures[future]
+                    self.polls += 1
+                    try:
+                        changes = future.result()
+                        failed = False
+                    except Exception as e:
+                        changes, failed = [], True
+                        emit({'source': getattr(source, 'source', ''), 'target': source.name,
+                              'kind': 'error', 'summary': str(e)})
+                    for change in changes:
+                        emit(change)
+                    self.changes += len(changes)
+                    interval = self._next_interval(source, bool(changes), failed)
+                    heapq.heappush(schedule, (time.monotonic() + interval, order, source))
+        return self.changes
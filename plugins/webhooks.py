@@ -0,0 +1,346 @@
+"""
+Local receiver for GitHub and Trello webhooks.
+
+Instead of waiting for the next poll, upstream changes are pushed here and
+applied directly to the local state: the search index (issues, comments,
+cards), the GitHub repository index and the stale-while-revalidate cache.
+Reads stay fresh without any upstream call.
+
+Deliveries are authenticated before anything is applied:
+
+    POST /github   X-Hub-Signature-256 = HMAC-SHA256(GITHUB_WEBHOOK_SECRET, body)
+    POST /trello   X-Trello-Webhook    = base64 HMAC-SHA1(TRELLO_WEBHOOK_SECRET, body + callback URL)
+    HEAD /trello   200, so Trello accepts the callback URL when the webhook is created
+
+A source without a configured secret is rejected. The callback URL is
+TRELLO_WEBHOOK_CALLBACK_URL (the public URL registered with Trello), or the
+URL the request was addressed to.
+
+With FETCHER_WEBHOOK_CAPTURE set, verified deliveries are appended to that
+JSON Lines file; `replay` re-sends such a file, signed with the configured
+secrets, so changes to the appliers can be checked against real payloads.
+
+Usage:
+    FETCHER_WEBHOOK_PORT=8765 python3 mcp_server.py     # receiver inside the MCP server
+    python -m plugins.webhooks serve [port]              # standalone receiver
+    python -m plugins.webhooks replay captured.jsonl [url]
+"""
+
+import base64
+import hashlib
+import hmac
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+from .metrics import registry
+from .records import Issue, Repo
+from .repo_index import RepoIndex
+from .search_index import comment_doc, get_index, issue_doc
+from .swr_cache import swr
+
+DEFAULT_PORT = 8765
+
+# Trello action types that change the board list answered by `trello boards`
+BOARD_ACTIONS = {'createBoard', 'updateBoard', 'addMemberToBoard', 'removeMemberFromBoard'}
+
+registry.describe('fetcher_webhooks_total', 'Webhook deliveries by source, event and result')
+
+
+def github_signature(secret, body):
+    """X-Hub-Signature-256 value for a body."""
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def trello_signature(secret, body, callback_url):
+    """X-Trello-Webhook value for a body delivered to callback_url."""
+    digest = hmac.new(secret.encode(), body + callback_url.encode(), hashlib.sha1).digest()
+    return base64.b64encode(digest).decode()
+
+
+class WebhookApplier:
+    """Applies verified webhook payloads to the local indexes and caches.
+
+    Each apply method returns short descriptions of what was changed.
+    """
+
+    def __init__(self, repo_index=None):
+        self._repo_index = repo_index
+
+    @property
+    def repo_index(self):
+        if self._repo_index is None:
+            self._repo_index = RepoIndex(ttl=int(os.getenv('GITHUB_REPO_INDEX_TTL', '3600')))
+        return self._repo_index
+
+    def apply_github(self, event, payload):
+        applied = []
+        repository = payload.get('repository') or {}
+        repo = repository.get('full_name')
+        if repo and event != 'ping':
+            self.repo_index.update([Repo.from_api(repository)])
+            applied.append(f"repo {repo}")
+
+        index = get_index()
+        action = payload.get('action')
+        if event in ('issues', 'issue_comment', 'pull_request') and repo:
+            item = payload.get('issue') or payload.get('pull_request')
+            if event == 'pull_request':
+                # Pull request objects lack the marker issue listings carry
+                item = dict(item, pull_request={})
+            issue = Issue.from_api(item, repo=repo)
+            if event == 'issues' and action == 'deleted':
+                index.remove([issue_doc(issue)['id']])
+                applied.append(f"removed {repo}#{issue.number}")
+            else:
+                index.add([issue_doc(issue)])
+                applied.append(f"{repo}#{issue.number}")
+
+            if event == 'issue_comment':
+                doc = comment_doc(repo, issue.number, payload['comment'])
+                if action == 'deleted':
+                    index.remove([doc['id']])
+                    applied.append(f"removed comment {payload['comment']['id']}")
+                else:
+                    index.add([doc])
+                    applied.append(f"comment {payload['comment']['id']}")
+        return applied
+
+    def apply_trello(self, payload):
+        applied = []
+        action = payload.get('action') or {}
+        kind = action.get('type')
+        data = action.get('data') or {}
+        board = data.get('board') or {}
+        card = data.get('card') or {}
+        index = get_index()
+
+        if kind in BOARD_ACTIONS:
+            swr.invalidate('trello.boards')
+            applied.append('boards')
+
+        if card.get('id'):
+            key = f"trello:{card['id']}"
+            if kind == 'deleteCard':
+                index.remove([key])
+                applied.append(f"removed card {card['id']}")
+            else:
+                fields = {'updated_at': action.get('date')}
+                if 'name' in card:
+                    fields['title'] = card['name']
+                if 'desc' in card:
+                    fields['text'] = card['desc']
+                if 'closed' in card:
+                    fields['state'] = 'closed' if card['closed'] else 'open'
+                if data.get('listAfter') or data.get('list'):
+                    fields['list'] = (data.get('listAfter') or data.get('list')).get('name')
+                label = (data.get('label') or {}).get('name')
+                if label and kind in ('addLabelToCard', 'removeLabelFromCard'):
+                    labels = set((index.get(key) or {}).get('label') or ())
+                    labels = labels | {label} if kind == 'addLabelToCard' else labels - {label}
+                    fields['label'] = sorted(labels)
+                default = {
+                    'type': 'card', 'source': 'trello', 'title': card.get('name'), 'board': board.get('id'),
+                    'state': 'open', 'label': [],
+                    'url': f"https://trello.com/c/{card['shortLink']}" if card.get('shortLink') else None
+                }
+                index.update(key, fields, default=default)
+                applied.append(f"card {card['id']}")
+
+        if kind in ('commentCard', 'updateComment', 'deleteComment'):
+            # updateComment/deleteComment refer to the comment's own action id
+            comment_id = (data.get('action') or {}).get('id') or action.get('id')
+            key = f"trello:comment:{comment_id}"
+            if kind == 'deleteComment':
+                index.remove([key])
+                applied.append(f"removed comment {comment_id}")
+            else:
+                text = data.get('text') or (data.get('action') or {}).get('text')
+                index.update(key, {'text': text, 'updated_at': action.get('date')}, default={
+                    'type': 'comment', 'source': 'trello', 'title': f"Comment on {card.get('name')}",
+                    'board': board.get('id'), 'author': (action.get('memberCreator') or {}).get('fullName')
+                })
+                applied.append(f"comment {comment_id}")
+        return applied
+
+
+class WebhookReceiver:
+    """HTTP server verifying webhook deliveries and handing them to a WebhookApplier."""
+
+    def __init__(self, port=0, host='127.0.0.1', applier=None, github_secret=None,
+                 trello_secret=None, trello_callback_url=None, capture=None):
+        self.applier = applier or WebhookApplier()
+        self.github_secret = github_secret if github_secret is not None else os.getenv('GITHUB_WEBHOOK_SECRET')
+        self.trello_secret = trello_secret if trello_secret is not None else os.getenv('TRELLO_WEBHOOK_SECRET')
+        self.trello_callback_url = trello_callback_url or os.getenv('TRELLO_WEBHOOK_CALLBACK_URL')
+        self.capture = capture if capture is not None else os.getenv('FETCHER_WEBHOOK_CAPTURE')
+        self._capture_lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def _verify(self, source, body, headers, request_url):
+        if source == 'github':
+            if not self.github_secret:
+                return False
+            expected = github_signature(self.github_secret, body)
+            return hmac.compare_digest(expected, headers.get('X-Hub-Signature-256') or '')
+        if not self.trello_secret:
+            return False
+        expected = trello_signature(self.trello_secret, body, self.trello_callback_url or request_url)
+        return hmac.compare_digest(expected, headers.get('X-Trello-Webhook') or '')
+
+    def _record(self, source, event, payload):
+        if not self.capture:
+            return
+        line = json.dumps({'source': source, 'event': event, 'received_at': time.time(), 'payload': payload})
+        with self._capture_lock, open(self.capture, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def handle(self, source, body, headers, request_url):
+        """Verify and apply one delivery; returns (status, response dict)."""
+        if not self._verify(source, body, headers, request_url):
+            registry.inc('fetcher_webhooks_total', source=source, event='unknown', result='bad_signature')
+            return 401, {'error': 'invalid signature'}
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            registry.inc('fetcher_webhooks_total', source=source, event='unknown', result='bad_payload')
+            return 400, {'error': 'invalid JSON'}
+
+        if source == 'github':
+            event = headers.get('X-GitHub-Event') or 'unknown'
+        else:
+            event = (payload.get('action') or {}).get('type') or 'unknown'
+        self._record(source, event, payload)
+        try:
+            if source == 'github':
+                applied = self.applier.apply_github(event, payload)
+            else:
+                applied = self.applier.apply_trello(payload)
+        except Exception as e:
+            registry.inc('fetcher_webhooks_total', source=source, event=event, result='error')
+            return 500, {'error': str(e)}
+        registry.inc('fetcher_webhooks_total', source=source, event=event, result='applied')
+        return 200, {'event': event, 'applied': applied}
+
+    def _handler_class(self):
+        receiver = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                # Trello checks the callback URL with a HEAD request
+                self.send_response(200 if self.path.split('?')[0] == '/trello' else 404)
+                self.end_headers()
+
+            def do_POST(self):
+                source = self.path.split('?')[0].strip('/')
+                if source not in ('github', 'trello'):
+                    return self._reply(404, {'error': 'unknown webhook source'})
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                request_url = f"http://{self.headers.get('Host')}{self.path}"
+                status, response = receiver.handle(source, body, self.headers, request_url)
+                self._reply(status, response)
+
+            def _reply(self, status, response):
+                data = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def start_receiver(port, manager=None, host=None):
+    """Start a receiver that updates the caches of an already loaded PluginManager."""
+    github = manager.plugins.get('github') if manager is not None else None
+    applier = WebhookApplier(repo_index=github.repo_index if github is not None else None)
+    return WebhookReceiver(port, host or os.getenv('FETCHER_WEBHOOK_HOST', '127.0.0.1'), applier).start()
+
+
+def replay(path, url, github_secret=None, trello_secret=None, trello_callback_url=None):
+    """Send every delivery of a capture file to a receiver; returns [(status, response)]."""
+    github_secret = github_secret or os.getenv('GITHUB_WEBHOOK_SECRET') or ''
+    trello_secret = trello_secret or os.getenv('TRELLO_WEBHOOK_SECRET') or ''
+    results = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            delivery = json.loads(line)
+            source = delivery['source']
+            target = f"{url.rstrip('/')}/{source}"
+            body = json.dumps(delivery['payload']).encode()
+            headers = {'Content-Type': 'application/json'}
+            if source == 'github':
+                headers['X-GitHub-Event'] = delivery.get('event', 'unknown')
+                headers['X-Hub-Signature-256'] = github_signature(github_secret, body)
+            else:
+                callback = trello_callback_url or os.getenv('TRELLO_WEBHOOK_CALLBACK_URL') or target
+                headers['X-Trello-Webhook'] = trello_signature(trello_secret, body, callback)
+            request = urllib.request.Request(target, data=body, headers=headers, method='POST')
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    results.append((response.status, json.loads(response.read())))
+            except urllib.error.HTTPError as e:
+                results.append((e.code, json.loads(e.read() or b'{}')))
+    return results
+
+
+def main(argv):
+    if len(argv) >= 1 and argv[0] == 'serve':
+        port = int(argv[1]) if len(argv) > 1 else int(os.getenv('FETCHER_WEBHOOK_PORT', DEFAULT_PORT))
+        receiver = WebhookReceiver(port, os.getenv('FETCHER_WEBHOOK_HOST', '127.0.0.1'))
+        print(f"🪝 Webhooks em / Webhooks at {receiver.url}/github and {receiver.url}/trello")
+        try:
+            receiver.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    elif len(argv) >= 2 and argv[0] == 'replay':
+        url = argv[2] if len(argv) > 2 else f"http://127.0.0.1:{os.getenv('FETCHER_WEBHOOK_PORT', DEFAULT_PORT)}"
+        results = replay(argv[1], url)
+        for i, (status, response) in enumerate(results, 1):
+            icon = '✅' if status == 200 else '❌'
+            print(f"{icon} [{i}] {status} {response.get('event', '')}: {response.get('applied') or response.get('error')}")
+        failed = sum(status != 200 for status, _ in results)
+        print(f"\n📊 {len(results) - failed}/{len(results)} deliveries applied")
+        return 1 if failed else 0
+    else:
+        print("Usage: python -m plugins.webhooks serve [port] | replay FILE [url]")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
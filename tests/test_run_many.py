@@ -0,0 +1,73 @@
+"""
+PluginManager.run_many with more calls than a plugin's concurrency limit.
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import threading
+import time
+import unittest
+
+# Importing the plugin manager loads every plugin, and some refuse to start without credentials
+for name, value in {
+    'GITHUB_TOKEN': 'test-token', 'TRELLO_API_KEY': 'test-key', 'TRELLO_TOKEN': 'test-token',
+    'SPOTIFY_CLIENT_ID': 'test-client', 'SPOTIFY_CLIENT_SECRET': 'test-secret',
+    'LINKEDIN_CLIENT_ID': 'test-client', 'LINKEDIN_CLIENT_SECRET': 'test-secret',
+    'LINKEDIN_EMAIL': 'test@example.com', 'LINKEDIN_PASSWORD': 'test-password'
+}.items():
+    os.environ.setdefault(name, value)
+
+from plugins.deadline import CallCancelled, Deadline, current_deadline, deadline_scope
+from plugins.plugin_manager import PluginManager
+
+
+class SleepPlugin:
+    """Sleeps for the number of seconds given, waking when its call is cancelled."""
+
+    def __init__(self):
+        self.cancelled = []
+        self._lock = threading.Lock()
+
+    def run(self, command, seconds="0.05"):
+        woken = threading.Event()
+        current_deadline().on_cancel(woken.set)
+        if woken.wait(float(seconds)):
+            with self._lock:
+                self.cancelled.append(command)
+            raise CallCancelled(command)
+        return command
+
+
+class RunManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.plugin = SleepPlugin()
+        self.manager = PluginManager()
+        self.manager.plugins['sleep'] = self.plugin
+
+    def test_calls_queued_behind_the_plugin_limit_complete(self):
+        calls = [('sleep', f"call{i}", []) for i in range(7)]
+        results = list(self.manager.run_many(calls, timeout=5, max_per_plugin=2))
+        self.assertEqual(sorted(result['index'] for result in results), list(range(7)))
+        self.assertTrue(all(result['status'] == 'ok' for result in results))
+
+    def test_queued_call_that_times_out_is_cancelled(self):
+        calls = [('sleep', 'fast', ['0.05'])] * 3 + [{'plugin': 'sleep', 'command': 'slow', 'args': ['5'], 'timeout': 0.2}]
+        results = {result['index']: result for result in self.manager.run_many(calls, timeout=5, max_per_plugin=2)}
+        self.assertEqual(results[3]['status'], 'timeout')
+        deadline = time.monotonic() + 2
+        while not self.plugin.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.plugin.cancelled, ['slow'])
+
+    def test_finished_calls_leave_no_callbacks_on_the_parent(self):
+        parent = Deadline(timeout=30)
+        with deadline_scope(parent):
+            results = list(self.manager.run_many([('sleep', f"call{i}", []) for i in range(5)], max_per_plugin=2))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(parent._callbacks, [])
+
+
+if __name__ == '__main__':
+    unittest.main()